@@ -1,15 +1,39 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, g, Response
 import os
-from PIL import Image
-import pytesseract
-import mysql.connector
+import csv
+import io
+import json
+import datetime
+import decimal
+import functools
+import threading
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_bcrypt import Bcrypt
-from flasgger import Swagger, swag_from
 from flask_cors import CORS
+from db import ConnectionPool, RequestConnection
+from pagination import ListSpec, PaginationError, paginate
+from ocr_jobs import OcrJobManager, QueueFull
+from ocr_cache import OcrCache
+from roster_index import RosterIndexCache
+from moyennes import MoyenneRecomputer, moyenne_keys, recompute_moyennes
+from ref_cache import ReferenceCache
+from conditional import bump_table_versions, conditional_get, tables_validator_query
+from json_provider import init_json_provider
+from auth_tokens import ADMIN, ETUDIANT, TokenSigner, bearer_token
+from compression import init_compression
+from deliberation import (DELIBERATION_DEFAULTS, DeliberationError, apply_decisions, build_report,
+                          deliberate, deliberation_rules, load_cohort, parse_bool)
+from werkzeug.utils import secure_filename
 
+# Démarrage rapide : aucun accès à la base à l'import (pool ouvert à la première requête),
+# et PIL / pytesseract / numpy / mysql.connector ne sont importés qu'au premier usage
+# (bench/bench_startup.py vérifie le budget de démarrage)
 app = Flask(__name__)
-app.secret_key = 'secret_key'  # Clé secrète pour les sessions
+# Clé secrète des sessions et des jetons : obligatoire, fournie par la configuration
+# (SECRET_KEY) ou l'environnement, jamais dans le dépôt (create_app refuse de démarrer sans)
+app.secret_key = os.environ.get('NOTEFINDER_SECRET_KEY')
+# Valeurs publiques (anciennes versions du dépôt) : n'importe qui pourrait signer des jetons
+INSECURE_SECRET_KEYS = {'secret_key'}
 bcrypt = Bcrypt(app)
 # Configuration des cookies de session
 app.config['SESSION_COOKIE_SECURE'] = False  # Les cookies ne sont envoyés que sur HTTPS
@@ -39,6 +63,27 @@ app.config['MYSQL_USER'] = 'root'
 app.config['MYSQL_PASSWORD'] = ''
 app.config['MYSQL_DB'] = 'entite'
 
+# Pool de connexions : une connexion est empruntée par requête puis rendue au pool
+app.config['MYSQL_POOL_SIZE'] = 10  # nombre maximum de connexions ouvertes par processus
+app.config['MYSQL_POOL_TIMEOUT'] = 5  # secondes d'attente max quand le pool est saturé
+app.config['MYSQL_POOL_PING_INTERVAL'] = 30  # ping d'une connexion inutilisée depuis plus de N secondes
+app.config['MYSQL_POOL_MAX_LIFETIME'] = 3600  # recyclage des connexions après N secondes
+app.config['MYSQL_CONNECT_TIMEOUT'] = 5
+
+# Export des notes : nombre de lignes lues sur le curseur non bufferisé par paquet
+app.config['EXPORT_CHUNK_SIZE'] = 1000
+
+# Enregistrement groupé des notes : taille maximale d'un lot
+app.config['NOTE_BULK_MAX_ROWS'] = 5000
+
+# Sérialisation JSON avec orjson (si installé) et compression brotli/gzip des réponses
+app.config['JSON_FAST'] = True
+app.config['COMPRESS_MIN_SIZE'] = 1024  # octets ; en dessous la compression ne rapporte rien
+app.config['COMPRESS_GZIP_LEVEL'] = 6
+app.config['COMPRESS_BROTLI_QUALITY'] = 4  # 0-11 ; 4 : plus rapide que gzip 6 et plus compact
+init_json_provider(app)
+init_compression(app)
+
 # Configuration de Swagger
 app.config['SWAGGER'] = {
     'title': 'API Documentation',
@@ -46,18 +91,48 @@ app.config['SWAGGER'] = {
     'description': 'Documentation for the API endpoints',
     'version': '1.0.0',
 }
+# flasgger (et jsonschema) représentent la moitié du temps d'import : NOTEFINDER_SWAGGER=0
+# les retire des workers qui ne servent pas /apidocs
+app.config['SWAGGER_ENABLED'] = os.environ.get('NOTEFINDER_SWAGGER', '1') != '0'
 
-swagger = Swagger(app)
+if app.config['SWAGGER_ENABLED']:
+    from flasgger import Swagger, swag_from
+    swagger = Swagger(app)
+else:
+    def swag_from(specs):
+        return lambda view: view
 
 # ----------------------------------------------------------------------------------------
 
-# Connexion MySQL
-mysqlconn = mysql.connector.connect(
-    host=app.config['MYSQL_HOST'],
-    user=app.config['MYSQL_USER'],
-    password=app.config['MYSQL_PASSWORD'],
-    database=app.config['MYSQL_DB']
-)
+# Pool de connexions MySQL (les connexions sont ouvertes à la demande)
+def open_mysql_connection(**options):
+    # options : paramètres supplémentaires de mysql.connector (outils hors requêtes, ex. allow_local_infile)
+    import mysql.connector  # différé : ~0,1 s d'import, inutile avant la première requête
+    return mysql.connector.connect(
+        host=app.config['MYSQL_HOST'],
+        user=app.config['MYSQL_USER'],
+        password=app.config['MYSQL_PASSWORD'],
+        database=app.config['MYSQL_DB'],
+        connection_timeout=app.config['MYSQL_CONNECT_TIMEOUT'],
+        **options
+    )
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    open_mysql_connection,
+                    max_size=app.config['MYSQL_POOL_SIZE'],
+                    acquire_timeout=app.config['MYSQL_POOL_TIMEOUT'],
+                    ping_interval=app.config['MYSQL_POOL_PING_INTERVAL'],
+                    max_lifetime=app.config['MYSQL_POOL_MAX_LIFETIME']
+                )
+    return _pool
 
 # Gestion des sessions avec Flask-Login
 login_manager = LoginManager()
@@ -70,15 +145,77 @@ class User(UserMixin):
         self.email = email
         self.role = role
 
+# Jetons signés remis à la connexion (voir auth_tokens.py) : vérifiés sans accès à la base
+app.config['AUTH_TOKEN_TTL'] = 3600  # secondes
+# token_signer : construit par configure_services (clé secrète de la configuration)
+
 def fetch_data(query, params=None):
-    cursor = mysqlconn.cursor()
+    cursor = get_db_connection().cursor()
     if params:
         cursor.execute(query, params)
     else:
         cursor.execute(query)
     data = cursor.fetchall()
+    cursor.close()
     return data
 
+def fetch_one(query, params=None):
+    rows = fetch_data(query, params)
+    return rows[0] if rows else None
+
+def fetch_fields(spec, fields, where=None, params=None):
+    # Projection nommée (paramètre fields=) : objets {champ: valeur}, seules ces colonnes sont lues
+    query = f"SELECT {spec.select(fields)} FROM {spec.from_clause}"
+    if where:
+        query += f" WHERE {where}"
+    return [dict(zip(fields, row)) for row in fetch_data(query, params)]
+
+def fetch_fields_one(spec, fields, key):
+    rows = fetch_fields(spec, fields, f"{spec.pk} = %s", (key,))
+    return rows[0] if rows else None
+
+# Cache des tables de référence (filiere, grade, annee_academique, annee_etude, ue, ecue,
+# enseignant) : invalidé par les routes d'écriture de ces tables
+app.config['REFERENCE_CACHE_TTL'] = 300  # secondes ; borne l'écart entre processus
+app.config['REFERENCE_CACHE_MAX_ENTRIES'] = 512
+# reference_cache : construit par configure_services
+
+# Cache des utilisateurs connectés (load_user est appelé à chaque requête authentifiée) ;
+# invalidé par la modification / suppression d'un membre administratif
+app.config['USER_CACHE_TTL'] = 60  # secondes ; borne l'écart entre processus
+app.config['USER_CACHE_MAX_ENTRIES'] = 1024
+# user_cache : construit par configure_services
+
+def user_cache_tag(user_id):
+    # Une étiquette par membre : l'invalider ne vide pas le cache des autres utilisateurs
+    return f'membre_administratif:{user_id}'
+
+REFERENCE_TABLES = {'filiere', 'grade', 'annee_academique', 'annee_etude', 'ue', 'ecue', 'enseignant'}
+
+# Validateurs des GET conditionnels (ETag / 304, voir conditional.py)
+def table_versions(tables):
+    # Versions des tables lues (table_version) ; None si l'une manque (migration 0004 non appliquée)
+    rows = fetch_data(tables_validator_query(tables))
+    return rows if len(rows) == len(tables) else None
+
+def tables_validator(*tables):
+    # Liste : versions des tables lues ; gardées en cache pour les tables de référence
+    def load(**view_args):
+        if REFERENCE_TABLES.issuperset(tables):
+            return reference_cache.get(('validator',) + tables, tables, lambda: table_versions(tables))
+        return table_versions(tables)
+    return load
+
+def row_validator(query, tables, arg='id'):
+    # Ressource : la ligne demandée doit exister (sinon pas d'ETag, la route répond 404), puis
+    # versions des tables lues ; updated_at seul ne distingue pas deux écritures dans la même seconde
+    def load(**view_args):
+        if fetch_one(query, (view_args[arg],)) is None:
+            return None
+        versions = table_versions(tables)
+        return versions and (view_args[arg], versions)
+    return load
+
 # Chemin pour enregistrer les fichiers téléchargés
 UPLOAD_FOLDER = 'uploads/'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
@@ -88,26 +225,200 @@ app.config['ALLOWED_EXTENSIONS'] = {'jpg', 'jpeg', 'png'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+# Reconnaissance OCR côté serveur (tesseract dans un pool de processus)
+# Processus tesseract par processus serveur (None : un par cœur). Sous gunicorn, chaque worker
+# a son propre pool : gunicorn.conf.py fixe NOTEFINDER_OCR_WORKERS (cœurs // workers, au
+# moins 1) pour partager les cœurs entre les workers
+app.config['OCR_WORKERS'] = int(os.environ['NOTEFINDER_OCR_WORKERS']) if os.environ.get('NOTEFINDER_OCR_WORKERS') else None
+app.config['OCR_LANG'] = 'fra'
+app.config['OCR_TIMEOUT'] = 60  # secondes par image
+app.config['OCR_MAX_PIXELS'] = 40_000_000
+app.config['OCR_MAX_FILES'] = 20  # images par requête
+app.config['OCR_PREPROCESS'] = {}  # surcharge de ocr_preprocess.PREPROCESS_DEFAULTS
+app.config['OCR_TABLE'] = {}  # surcharge de ocr_table.TABLE_DEFAULTS
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
+
+# Traitements OCR asynchrones (table ocr_job)
+# Limites par processus : sous gunicorn, jusqu'à workers x OCR_JOB_WORKERS traitements en
+# parallèle, mais leurs images passent toutes par le pool OCR_WORKERS de leur processus
+app.config['OCR_JOB_WORKERS'] = 2  # traitements menés en parallèle
+app.config['OCR_JOB_QUEUE_SIZE'] = 20  # au-delà, les nouveaux envois reçoivent un 429
+app.config['OCR_JOB_RETENTION_DAYS'] = 30  # traitements terminés purgés ensuite (None : jamais)
+
+# Cache disque des résultats OCR (clé : SHA-256 de l'image + réglages)
+app.config['OCR_CACHE_DIR'] = os.path.join(UPLOAD_FOLDER, 'ocr_cache')
+app.config['OCR_CACHE_MAX_BYTES'] = 200 * 1024 * 1024
+
+_ocr_cache = None
+
+def get_ocr_cache():
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = OcrCache(app.config['OCR_CACHE_DIR'], app.config['OCR_CACHE_MAX_BYTES'])
+    return _ocr_cache
+
+# Rapprochement des lignes OCR avec les inscrits d'une promotion (index en mémoire)
+app.config['ROSTER_INDEX_TTL'] = 300  # secondes
+app.config['ROSTER_MAX_DISTANCE'] = 2  # chiffres mal lus tolérés dans un matricule
+
+def load_roster(annee_etude_id, annee_academique_id, semestre):
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT pe.id AS parcours_etudiant_id, e.matricule, e.nom, e.prenom
+            FROM parcours_etudiant pe
+            JOIN etudiant e ON e.matricule = pe.etudiant_matricule
+            WHERE pe.annee_etude_id = %s AND pe.annee_academique_id = %s AND pe.semestre = %s
+        """, (annee_etude_id, annee_academique_id, semestre))
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        pool.release(conn)
+    return rows
+
+# roster_indexes : construit par configure_services
+
+def roster_params(source):
+    # (annee_etude_id, annee_academique_id, semestre) ou None si incomplet
+    try:
+        values = tuple(int(source[name]) for name in ('annee_etude_id', 'annee_academique_id', 'semestre'))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return values
+
+def match_rows(rows, roster):
+    index = roster_indexes.get(*roster)
+    return [dict(row, match=index.match(row)) for row in rows]
+
+# Moyennes d'UE tenues à jour à partir des notes (moyennes.py)
+app.config['MOYENNE_UE_DELAY'] = 2  # secondes de regroupement ; 0 : recalcul dans la transaction de la note
+
+_moyenne_recomputer = None
+_moyenne_lock = threading.Lock()
+
+def get_moyenne_recomputer():
+    global _moyenne_recomputer
+    if _moyenne_recomputer is None:
+        with _moyenne_lock:
+            if _moyenne_recomputer is None:
+                _moyenne_recomputer = MoyenneRecomputer(get_pool(), delay=app.config['MOYENNE_UE_DELAY'])
+    return _moyenne_recomputer
+
+def refresh_moyennes(conn, pairs):
+    # À appeler avant le commit d'une écriture sur note, avec les (ecue_id, parcours_etudiant_id)
+    # touchés. Sans délai, les moyennes sont recalculées dans la même transaction ; sinon les
+    # clés sont renvoyées pour get_moyenne_recomputer().mark() après le commit.
+    keys = moyenne_keys(conn, pairs)
+    if not app.config['MOYENNE_UE_DELAY']:
+        recompute_moyennes(conn, keys)
+        return set()
+    return keys
+
+def ocr_settings():
+    # Importés ici : ocr_preprocess / ocr_table chargent PIL
+    from ocr_preprocess import PREPROCESS_DEFAULTS
+    from ocr_table import TABLE_DEFAULTS
+    return {
+        'lang': app.config['OCR_LANG'],
+        'timeout': app.config['OCR_TIMEOUT'],
+        'max_pixels': app.config['OCR_MAX_PIXELS'],
+        'preprocess': {**PREPROCESS_DEFAULTS, **app.config['OCR_PREPROCESS']},
+        'table': {**TABLE_DEFAULTS, **app.config['OCR_TABLE']},
+    }
+
 @login_manager.user_loader
 def load_user(user_id):
-    cursor = mysqlconn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM membre_administratif WHERE id = %s", (user_id,))
-    user = cursor.fetchone()
-    cursor.close()
+    # Sans le hash du mot de passe, inutile ici ; en cache, pas d'accès à la base
+    user = user_cache.get(
+        ('user', str(user_id)), (user_cache_tag(user_id),),
+        lambda: fetch_one("SELECT id, email, role FROM membre_administratif WHERE id = %s", (user_id,))
+    )
     if user:
-        return User(user['id'], user['email'], user['role'])
+        return User(*user)
+    return None
+
+@login_manager.request_loader
+def load_user_from_token(req):
+    # Sans session : jeton Bearer d'un membre administratif (les jetons étudiants ne donnent
+    # pas accès aux routes protégées par login_required). Le compte est relu comme pour une
+    # session (load_user) : un compte supprimé n'est plus accepté, le rôle est celui de la base
+    # (au plus USER_CACHE_TTL de retard dans les autres workers, comme pour les sessions).
+    token = bearer_token(req)
+    claims = token_signer.verify(token) if token and token_signer else None
+    if claims and claims['type'] == ADMIN:
+        return load_user(claims['sub'])
     return None
 
+def etudiant_or_admin_required(view):
+    # Routes propres à un étudiant (<matricule>) : membre administratif connecté (session ou
+    # jeton), ou jeton étudiant délivré pour ce matricule. Un étudiant ne lit que ses données.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if app.config.get('LOGIN_DISABLED') or current_user.is_authenticated:
+            return view(*args, **kwargs)
+        token = bearer_token(request)
+        claims = token_signer.verify(token) if token and token_signer else None
+        if claims and claims['type'] == ETUDIANT and str(claims['sub']) == str(kwargs.get('matricule')):
+            return view(*args, **kwargs)
+        return jsonify({'message': 'Authentification requise'}), 401
+    return wrapper
+
 # ----------------------------------------------------------------------------------------
 
-# Fonction pour obtenir une connexion MySQL
+# Fonction pour obtenir une connexion MySQL : la même connexion est réutilisée pendant
+# toute la requête et rendue au pool à la fin (conn.close() dans une route ne la ferme pas)
 def get_db_connection():
-    try:
-        conn = mysqlconn
-        return conn
-    except Exception as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
+    if 'db_conn' not in g:
+        try:
+            g.db_conn = RequestConnection(get_pool().acquire())
+        except Exception as e:
+            print(f"Error connecting to MySQL: {e}")
+            raise
+    return g.db_conn
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        get_pool().release(conn.raw)
+
+@app.route('/api/db/stats', methods=['GET'])
+@swag_from({
+    'tags': ['Base de données'],
+    'summary': 'Statistiques du pool de connexions MySQL',
+    'responses': {
+        200: {'description': 'Taille, connexions libres/utilisées, attentes et timeouts du pool'}
+    }
+})
+@login_required
+def get_db_pool_stats():
+    return jsonify(get_pool().stats()), 200
+
+@app.route('/api/cache/stats', methods=['GET'])
+@swag_from({
+    'tags': ['Base de données'],
+    'summary': 'Statistiques du cache des tables de référence',
+    'responses': {
+        200: {'description': 'Succès / échecs de lecture, invalidations et nombre d\'entrées du cache'}
+    }
+})
+@login_required
+def get_reference_cache_stats():
+    return jsonify(reference_cache.stats()), 200
+
+@app.route('/api/cache/ocr/stats', methods=['GET'])
+@swag_from({
+    'tags': ['Base de données'],
+    'summary': 'Statistiques du cache des résultats OCR (propres au processus)',
+    'responses': {
+        200: {'description': 'Succès / échecs de lecture, taux de succès et taille du cache disque'}
+    }
+})
+@login_required
+def get_ocr_cache_stats():
+    return jsonify(get_ocr_cache().stats()), 200
 
 # ----------------------------------------------------------------------------------------
 # API pour auth
@@ -133,7 +444,7 @@ def get_db_connection():
         }
     ],
     'responses': {
-        200: {'description': 'Connexion réussie'},
+        200: {'description': 'Connexion réussie (token : jeton signé à envoyer en Authorization: Bearer)'},
         400: {'description': 'Email et mot de passe requis'},
         401: {'description': 'Identifiants incorrects'}
     }
@@ -148,7 +459,7 @@ def apilogin():
     if not email or not password:
         return jsonify({'message': 'Email et mot de passe requis'}), 400
     
-    with mysqlconn.cursor(dictionary=True) as cursor:
+    with get_db_connection().cursor(dictionary=True) as cursor:
         cursor.execute("SELECT * FROM membre_administratif WHERE email = %s", (email,))
         user = cursor.fetchone()
     
@@ -158,7 +469,9 @@ def apilogin():
         return jsonify({
             'message': 'Connexion réussie',
             'success': True,
-            'user': {'id': user['id'], 'email': user['email'], 'role': user['role']}
+            'user': {'id': user['id'], 'email': user['email'], 'role': user['role']},
+            'token': token_signer.issue(ADMIN, user['id'], user['role'], email=user['email']),
+            'expires_in': token_signer.max_age
         }), 200
     else:
         return jsonify({'message': 'Identifiants incorrects', 'success': False}), 401
@@ -218,7 +531,7 @@ def apicreate_account():
     if not all([nom, prenom, email, password, role]):
         return jsonify({'message': 'Tous les champs sont requis'}), 400
     
-    with mysqlconn.cursor(dictionary=True) as cursor:
+    with get_db_connection().cursor(dictionary=True) as cursor:
         cursor.execute("SELECT * FROM membre_administratif WHERE email = %s", (email,))
         user = cursor.fetchone()
         
@@ -228,7 +541,8 @@ def apicreate_account():
         hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
         cursor.execute("INSERT INTO membre_administratif (nom, prenom, email, mot_de_passe, role) VALUES (%s, %s, %s, %s, %s)",
                        (nom, prenom, email, hashed_password, role))
-        mysqlconn.commit()
+        bump_table_versions(get_db_connection(), 'membre_administratif')
+        get_db_connection().commit()
     
     return jsonify({'message': 'Compte créé avec succès'}), 201
 
@@ -243,11 +557,12 @@ def apicreate_account():
 })
 @login_required
 def get_user_profile():
-    user_id = session.get('user_id')
+    # Session ou jeton Bearer (current_user chargé par load_user_from_token)
+    user_id = current_user.id if current_user.is_authenticated else session.get('user_id')
     if not user_id:
         return jsonify({'error': 'Utilisateur non connecté'}), 401
 
-    cursor = mysqlconn.cursor(dictionary=True)
+    cursor = get_db_connection().cursor(dictionary=True)
     cursor.execute("SELECT id, nom, prenom, email, role FROM membre_administratif WHERE id = %s", (user_id,))
     user = cursor.fetchone()
     cursor.close()
@@ -257,10 +572,35 @@ def get_user_profile():
     return jsonify({'error': 'Utilisateur non trouvé'}), 404
 
 
+MEMBRE_LIST = ListSpec(
+    columns='id, nom, prenom, email, role',
+    from_clause='membre_administratif',
+    pk='id',
+    filters={
+        'role': 'role'
+    },
+    sorts={
+        'id': 'id',
+        'nom': 'nom',
+        'prenom': 'prenom',
+        'email': 'email'
+    },
+    fields={
+        'id': 'id',
+        'nom': 'nom',
+        'prenom': 'prenom',
+        'email': 'email',
+        'role': 'role',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/membres_administratifs', methods=['GET'])
 @swag_from({
     'tags': ['Membre Administratif'],
     'summary': 'Get all administrative members',
+    'parameters': MEMBRE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'List of all administrative members',
@@ -278,20 +618,32 @@ def get_user_profile():
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Server error'
         }
     }
 })
 @login_required
+@conditional_get(tables_validator('membre_administratif'))
 def get_all_membres_administratifs():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, nom, prenom, email, role FROM membre_administratif")
-        membres = cursor.fetchall()
+        if MEMBRE_LIST.wants_page(request.args):
+            page = paginate(cursor, MEMBRE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = MEMBRE_LIST.parse_fields(request.args)
+        if fields:
+            membres = fetch_fields(MEMBRE_LIST, fields)
+        else:
+            cursor.execute("SELECT id, nom, prenom, email, role FROM membre_administratif")
+            membres = cursor.fetchall()
         cursor.close()
         return jsonify(membres), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -307,7 +659,7 @@ def get_all_membres_administratifs():
             'required': True,
             'description': 'ID of the administrative member'
         }
-    ],
+    ] + MEMBRE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Administrative member details',
@@ -322,6 +674,7 @@ def get_all_membres_administratifs():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Administrative member not found'
         },
@@ -331,18 +684,25 @@ def get_all_membres_administratifs():
     }
 })
 @login_required
+@conditional_get(row_validator("SELECT id FROM membre_administratif WHERE id = %s", ('membre_administratif',)))
 def get_membre_administratif(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nom, prenom, email, role FROM membre_administratif WHERE id = %s", (id,))
-        membre = cursor.fetchone()
-        cursor.close()
+        fields = MEMBRE_LIST.parse_fields(request.args)
+        if fields:
+            membre = fetch_fields_one(MEMBRE_LIST, fields, id)
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, nom, prenom, email, role FROM membre_administratif WHERE id = %s", (id,))
+            membre = cursor.fetchone()
+            cursor.close()
         
         if membre:
             return jsonify(membre), 200
         else:
             return jsonify({'message': 'Membre administratif not found'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -421,6 +781,7 @@ def create_membre_administratif():
         )
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'membre_administratif')
         conn.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -525,7 +886,9 @@ def update_membre_administratif(id):
         
         sql = f"UPDATE membre_administratif SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'membre_administratif')
         conn.commit()
+        user_cache.invalidate(user_cache_tag(id))
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -576,7 +939,9 @@ def supprimer_membre_administratif(id):
             return jsonify({'message': 'Membre administratif not found'}), 404
         
         cursor.execute("DELETE FROM membre_administratif WHERE id = %s", (id,))
+        bump_table_versions(conn, 'membre_administratif')
         conn.commit()
+        user_cache.invalidate(user_cache_tag(id))
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -593,10 +958,35 @@ def supprimer_membre_administratif(id):
 # API pour la table 'filiere'
 # ----------------------------------------------------------------------------------------
 
+FILIERE_LIST = ListSpec(
+    columns='*',
+    from_clause='filiere',
+    pk='id',
+    filters={
+        'code': 'code',
+        'domaine': 'domaine'
+    },
+    sorts={
+        'id': 'id',
+        'code': 'code',
+        'domaine': 'domaine'
+    },
+    fields={
+        'id': 'id',
+        'code': 'code',
+        'nom': 'nom',
+        'mention': 'mention',
+        'domaine': 'domaine',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/filieres', methods=['GET'])
 @swag_from({
     'tags': ['Filiere'],
     'summary': 'Get all filieres',
+    'parameters': FILIERE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'List of all filieres',
@@ -614,19 +1004,28 @@ def supprimer_membre_administratif(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Server error'
         }
     }
 })
+@conditional_get(tables_validator('filiere'))
 def get_all_filieres():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM filiere")
-        filieres = cursor.fetchall()
-        cursor.close()
+        if FILIERE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, FILIERE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = FILIERE_LIST.parse_fields(request.args)
+        if fields:
+            filieres = reference_cache.get(('filieres', fields), ('filiere',), lambda: fetch_fields(FILIERE_LIST, fields))
+        else:
+            filieres = reference_cache.get('filieres', ('filiere',), lambda: fetch_data("SELECT * FROM filiere"))
         return jsonify(filieres), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -642,7 +1041,7 @@ def get_all_filieres():
             'required': True,
             'description': 'ID of the filiere'
         }
-    ],
+    ] + FILIERE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Filiere details',
@@ -657,6 +1056,7 @@ def get_all_filieres():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Filiere not found'
         },
@@ -665,18 +1065,21 @@ def get_all_filieres():
         }
     }
 })
+@conditional_get(tables_validator('filiere'))
 def get_filiere(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM filiere WHERE id = %s", (id,))
-        filiere = cursor.fetchone()
-        cursor.close()
+        fields = FILIERE_LIST.parse_fields(request.args)
+        if fields:
+            filiere = reference_cache.get(('filiere', id, fields), ('filiere',), lambda: fetch_fields_one(FILIERE_LIST, fields, id))
+        else:
+            filiere = reference_cache.get(('filiere', id), ('filiere',), lambda: fetch_one("SELECT * FROM filiere WHERE id = %s", (id,)))
         
         if filiere:
             return jsonify(filiere), 200
         else:
             return jsonify({'message': 'Filiere not found'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -739,7 +1142,9 @@ def create_filiere():
         )
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'filiere')
         conn.commit()
+        reference_cache.invalidate('filiere')
         new_id = cursor.lastrowid
         cursor.close()
         
@@ -828,7 +1233,9 @@ def update_filiere(id):
         
         sql = f"UPDATE filiere SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'filiere')
         conn.commit()
+        reference_cache.invalidate('filiere')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -885,7 +1292,9 @@ def supprimer_filiere(id):
             return jsonify({'message': 'Cannot delete filiere with related annee_etude records'}), 400
         
         cursor.execute("DELETE FROM filiere WHERE id = %s", (id,))
+        bump_table_versions(conn, 'filiere')
         conn.commit()
+        reference_cache.invalidate('filiere')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -901,10 +1310,30 @@ def supprimer_filiere(id):
 # API pour la table 'grade'
 # ----------------------------------------------------------------------------------------
 
+GRADE_LIST = ListSpec(
+    columns='*',
+    from_clause='grade',
+    pk='id',
+    filters={
+        'nom': 'nom'
+    },
+    sorts={
+        'id': 'id',
+        'nom': 'nom'
+    },
+    fields={
+        'id': 'id',
+        'nom': 'nom',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/grades', methods=['GET'])
 @swag_from({
     'tags': ['Grade'],
     'summary': 'Get all grades',
+    'parameters': GRADE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'List of all grades',
@@ -919,19 +1348,28 @@ def supprimer_filiere(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Server error'
         }
     }
 })
+@conditional_get(tables_validator('grade'))
 def get_all_grades():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM grade")
-        grades = cursor.fetchall()
-        cursor.close()
+        if GRADE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, GRADE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = GRADE_LIST.parse_fields(request.args)
+        if fields:
+            grades = reference_cache.get(('grades', fields), ('grade',), lambda: fetch_fields(GRADE_LIST, fields))
+        else:
+            grades = reference_cache.get('grades', ('grade',), lambda: fetch_data("SELECT * FROM grade"))
         return jsonify(grades), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -947,7 +1385,7 @@ def get_all_grades():
             'required': True,
             'description': 'ID of the grade'
         }
-    ],
+    ] + GRADE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Grade details',
@@ -959,6 +1397,7 @@ def get_all_grades():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Grade not found'
         },
@@ -967,18 +1406,21 @@ def get_all_grades():
         }
     }
 })
+@conditional_get(tables_validator('grade'))
 def get_grade(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM grade WHERE id = %s", (id,))
-        grade = cursor.fetchone()
-        cursor.close()
+        fields = GRADE_LIST.parse_fields(request.args)
+        if fields:
+            grade = reference_cache.get(('grade', id, fields), ('grade',), lambda: fetch_fields_one(GRADE_LIST, fields, id))
+        else:
+            grade = reference_cache.get(('grade', id), ('grade',), lambda: fetch_one("SELECT * FROM grade WHERE id = %s", (id,)))
         
         if grade:
             return jsonify(grade), 200
         else:
             return jsonify({'message': 'Grade not found'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1030,7 +1472,9 @@ def create_grade():
             
         sql = "INSERT INTO grade (nom) VALUES (%s)"
         cursor.execute(sql, (data['nom'],))
+        bump_table_versions(conn, 'grade')
         conn.commit()
+        reference_cache.invalidate('grade')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -1104,7 +1548,9 @@ def update_grade(id):
         
         sql = "UPDATE grade SET nom = %s WHERE id = %s"
         cursor.execute(sql, (data['nom'], id))
+        bump_table_versions(conn, 'grade')
         conn.commit()
+        reference_cache.invalidate('grade')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1164,7 +1610,9 @@ def supprimer_grade(id):
             return jsonify({'message': 'Cannot delete grade with related annee_etude records'}), 400
         
         cursor.execute("DELETE FROM grade WHERE id = %s", (id,))
+        bump_table_versions(conn, 'grade')
         conn.commit()
+        reference_cache.invalidate('grade')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1180,10 +1628,30 @@ def supprimer_grade(id):
 # API pour la table 'annee_academique'
 # ----------------------------------------------------------------------------------------
 
+ANNEE_ACADEMIQUE_LIST = ListSpec(
+    columns='*',
+    from_clause='annee_academique',
+    pk='id',
+    filters={
+        'annee': 'annee'
+    },
+    sorts={
+        'id': 'id',
+        'annee': 'annee'
+    },
+    fields={
+        'id': 'id',
+        'annee': 'annee',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/annees-academiques', methods=['GET'])
 @swag_from({
     'tags': ['Annee Academique'],
     'summary': 'Get all academic years',
+    'parameters': ANNEE_ACADEMIQUE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'List of all academic years',
@@ -1198,19 +1666,28 @@ def supprimer_grade(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Server error'
         }
     }
 })
+@conditional_get(tables_validator('annee_academique'))
 def get_all_annees_academiques():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM annee_academique")
-        annees = cursor.fetchall()
-        cursor.close()
+        if ANNEE_ACADEMIQUE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, ANNEE_ACADEMIQUE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = ANNEE_ACADEMIQUE_LIST.parse_fields(request.args)
+        if fields:
+            annees = reference_cache.get(('annees_academiques', fields), ('annee_academique',), lambda: fetch_fields(ANNEE_ACADEMIQUE_LIST, fields))
+        else:
+            annees = reference_cache.get('annees_academiques', ('annee_academique',), lambda: fetch_data("SELECT * FROM annee_academique"))
         return jsonify(annees), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1226,7 +1703,7 @@ def get_all_annees_academiques():
             'required': True,
             'description': 'ID of the academic year'
         }
-    ],
+    ] + ANNEE_ACADEMIQUE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Academic year details',
@@ -1238,6 +1715,7 @@ def get_all_annees_academiques():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Academic year not found'
         },
@@ -1246,18 +1724,21 @@ def get_all_annees_academiques():
         }
     }
 })
+@conditional_get(tables_validator('annee_academique'))
 def get_annee_academique(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM annee_academique WHERE id = %s", (id,))
-        annee = cursor.fetchone()
-        cursor.close()
+        fields = ANNEE_ACADEMIQUE_LIST.parse_fields(request.args)
+        if fields:
+            annee = reference_cache.get(('annee_academique', id, fields), ('annee_academique',), lambda: fetch_fields_one(ANNEE_ACADEMIQUE_LIST, fields, id))
+        else:
+            annee = reference_cache.get(('annee_academique', id), ('annee_academique',), lambda: fetch_one("SELECT * FROM annee_academique WHERE id = %s", (id,)))
         
         if annee:
             return jsonify(annee), 200
         else:
             return jsonify({'message': 'Academic year not found'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1284,13 +1765,10 @@ def get_annee_academique(id):
         }
     }
 })
+@conditional_get(tables_validator('annee_academique'))
 def get_latest_annee_academique():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM annee_academique ORDER BY annee DESC LIMIT 1")
-        annee = cursor.fetchone()
-        cursor.close()
+        annee = reference_cache.get('annee_academique_latest', ('annee_academique',), lambda: fetch_one("SELECT * FROM annee_academique ORDER BY annee DESC LIMIT 1"))
         
         if annee:
             return jsonify(annee), 200
@@ -1347,7 +1825,9 @@ def create_annee_academique():
             
         sql = "INSERT INTO annee_academique (annee) VALUES (%s)"
         cursor.execute(sql, (data['annee'],))
+        bump_table_versions(conn, 'annee_academique')
         conn.commit()
+        reference_cache.invalidate('annee_academique')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -1421,7 +1901,9 @@ def update_annee_academique(id):
         
         sql = "UPDATE annee_academique SET annee = %s WHERE id = %s"
         cursor.execute(sql, (data['annee'], id))
+        bump_table_versions(conn, 'annee_academique')
         conn.commit()
+        reference_cache.invalidate('annee_academique')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1471,7 +1953,9 @@ def supprimer_annee_academique(id):
             return jsonify({'message': 'Academic year not found'}), 404
         
         cursor.execute("DELETE FROM annee_academique WHERE id = %s", (id,))
+        bump_table_versions(conn, 'annee_academique')
         conn.commit()
+        reference_cache.invalidate('annee_academique')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1487,10 +1971,39 @@ def supprimer_annee_academique(id):
 # API pour la table 'annee_etude'
 # ----------------------------------------------------------------------------------------
 
+ANNEE_ETUDE_LIST = ListSpec(
+    columns='*',
+    from_clause='annee_etude LEFT JOIN filiere ON annee_etude.filiere_id = filiere.id LEFT JOIN grade ON annee_etude.grade_id = grade.id',
+    pk='annee_etude.id',
+    filters={
+        'filiere_id': 'annee_etude.filiere_id',
+        'grade_id': 'annee_etude.grade_id',
+        'niveau': 'annee_etude.niveau'
+    },
+    sorts={
+        'id': 'annee_etude.id',
+        'code': 'annee_etude.code',
+        'niveau': 'annee_etude.niveau'
+    },
+    fields={
+        'id': 'annee_etude.id',
+        'code': 'annee_etude.code',
+        'niveau': 'annee_etude.niveau',
+        'filiere_id': 'annee_etude.filiere_id',
+        'filiere_code': 'filiere.code',
+        'filiere_nom': 'filiere.nom',
+        'grade_id': 'annee_etude.grade_id',
+        'grade': 'grade.nom',
+        'created_at': 'annee_etude.created_at',
+        'updated_at': 'annee_etude.updated_at'
+    }
+)
+
 @app.route('/api/annees-etude', methods=['GET'])
 @swag_from({
     'tags': ['Annee Etude'],
     'summary': 'Get all study years',
+    'parameters': ANNEE_ETUDE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'List of all study years',
@@ -1508,19 +2021,28 @@ def supprimer_annee_academique(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Server error'
         }
     }
 })
+@conditional_get(tables_validator('annee_etude', 'filiere', 'grade'))
 def get_all_annees_etude():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM annee_etude LEFT JOIN filiere ON annee_etude.filiere_id = filiere.id LEFT JOIN grade ON annee_etude.grade_id = grade.id")
-        annees = cursor.fetchall()
-        cursor.close()
+        if ANNEE_ETUDE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, ANNEE_ETUDE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = ANNEE_ETUDE_LIST.parse_fields(request.args)
+        if fields:
+            annees = reference_cache.get(('annees_etude', fields), ('annee_etude', 'filiere', 'grade'), lambda: fetch_fields(ANNEE_ETUDE_LIST, fields))
+        else:
+            annees = reference_cache.get('annees_etude', ('annee_etude', 'filiere', 'grade'), lambda: fetch_data("SELECT * FROM annee_etude LEFT JOIN filiere ON annee_etude.filiere_id = filiere.id LEFT JOIN grade ON annee_etude.grade_id = grade.id"))
         return jsonify(annees), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1536,7 +2058,7 @@ def get_all_annees_etude():
             'required': True,
             'description': 'ID of the study year'
         }
-    ],
+    ] + ANNEE_ETUDE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Study year details',
@@ -1551,6 +2073,7 @@ def get_all_annees_etude():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Study year not found'
         },
@@ -1559,18 +2082,21 @@ def get_all_annees_etude():
         }
     }
 })
+@conditional_get(tables_validator('annee_etude', 'filiere', 'grade'))
 def get_annee_etude(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM annee_etude LEFT JOIN filiere ON annee_etude.filiere_id = filiere.id LEFT JOIN grade ON annee_etude.grade_id = grade.id WHERE id = %s", (id,))
-        annee = cursor.fetchone()
-        cursor.close()
+        fields = ANNEE_ETUDE_LIST.parse_fields(request.args)
+        if fields:
+            annee = reference_cache.get(('annee_etude', id, fields), ('annee_etude', 'filiere', 'grade'), lambda: fetch_fields_one(ANNEE_ETUDE_LIST, fields, id))
+        else:
+            annee = reference_cache.get(('annee_etude', id), ('annee_etude', 'filiere', 'grade'), lambda: fetch_one("SELECT * FROM annee_etude LEFT JOIN filiere ON annee_etude.filiere_id = filiere.id LEFT JOIN grade ON annee_etude.grade_id = grade.id WHERE annee_etude.id = %s", (id,)))
         
         if annee:
             return jsonify(annee), 200
         else:
             return jsonify({'message': 'Study year not found'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1612,21 +2138,18 @@ def get_annee_etude(id):
         }
     }
 })
+@conditional_get(tables_validator('annee_etude', 'filiere'))
 def get_annees_etude_by_filiere(filiere_id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if filiere exists
-        cursor.execute("SELECT id FROM filiere WHERE id = %s", (filiere_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            conn.close()
+        def load():
+            # None : filière inexistante
+            if fetch_one("SELECT id FROM filiere WHERE id = %s", (filiere_id,)) is None:
+                return None
+            return fetch_data("SELECT * FROM annee_etude WHERE filiere_id = %s", (filiere_id,))
+
+        annees = reference_cache.get(('annees_etude_filiere', filiere_id), ('annee_etude', 'filiere'), load)
+        if annees is None:
             return jsonify({'message': 'Filiere not found'}), 404
-            
-        cursor.execute("SELECT * FROM annee_etude WHERE filiere_id = %s", (filiere_id,))
-        annees = cursor.fetchall()
-        cursor.close()
         
         return jsonify(annees), 200
     except Exception as e:
@@ -1710,7 +2233,9 @@ def create_annee_etude():
         )
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'annee_etude')
         conn.commit()
+        reference_cache.invalidate('annee_etude')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -1816,7 +2341,9 @@ def update_annee_etude(id):
         
         sql = f"UPDATE annee_etude SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'annee_etude')
         conn.commit()
+        reference_cache.invalidate('annee_etude')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1866,7 +2393,9 @@ def supprimer_annee_etude(id):
             return jsonify({'message': 'Study year not found'}), 404
         
         cursor.execute("DELETE FROM annee_etude WHERE id = %s", (id,))
+        bump_table_versions(conn, 'annee_etude')
         conn.commit()
+        reference_cache.invalidate('annee_etude')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -1881,10 +2410,43 @@ def supprimer_annee_etude(id):
 # API pour la table 'ecue'
 # ----------------------------------------------------------------------------------------
 
+ECUE_LIST = ListSpec(
+    columns='*',
+    from_clause='ecue LEFT JOIN ue ON ecue.ue_id = ue.id LEFT JOIN enseignant ON ecue.enseignant_id = enseignant.id',
+    pk='ecue.id',
+    filters={
+        'ue_id': 'ecue.ue_id',
+        'enseignant_id': 'ecue.enseignant_id',
+        'semestre': 'ue.semestre',
+        'annee_etude_id': 'ue.annee_etude_id'
+    },
+    sorts={
+        'id': 'ecue.id',
+        'code': 'ecue.code',
+        'nom': 'ecue.nom'
+    },
+    fields={
+        'id': 'ecue.id',
+        'code': 'ecue.code',
+        'nom': 'ecue.nom',
+        'ue_id': 'ecue.ue_id',
+        'ue_code': 'ue.code',
+        'ue_nom': 'ue.nom',
+        'semestre': 'ue.semestre',
+        'annee_etude_id': 'ue.annee_etude_id',
+        'enseignant_id': 'ecue.enseignant_id',
+        'enseignant_nom': 'enseignant.nom',
+        'enseignant_prenom': 'enseignant.prenom',
+        'created_at': 'ecue.created_at',
+        'updated_at': 'ecue.updated_at'
+    }
+)
+
 @app.route('/api/ecues', methods=['GET'])
 @swag_from({
     'tags': ['Ecue'],
     'summary': 'Obtenir tous les ECUEs',
+    'parameters': ECUE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste de tous les ECUEs',
@@ -1902,19 +2464,28 @@ def supprimer_annee_etude(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('ecue', 'ue', 'enseignant'))
 def get_all_ecues():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ecue LEFT JOIN ue ON ecue.ue_id = ue.id LEFT JOIN enseignant ON ecue.enseignant_id = enseignant.id")
-        ecues = cursor.fetchall()
-        cursor.close()
+        if ECUE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, ECUE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = ECUE_LIST.parse_fields(request.args)
+        if fields:
+            ecues = reference_cache.get(('ecues', fields), ('ecue', 'ue', 'enseignant'), lambda: fetch_fields(ECUE_LIST, fields))
+        else:
+            ecues = reference_cache.get('ecues', ('ecue', 'ue', 'enseignant'), lambda: fetch_data("SELECT * FROM ecue LEFT JOIN ue ON ecue.ue_id = ue.id LEFT JOIN enseignant ON ecue.enseignant_id = enseignant.id"))
         return jsonify(ecues), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1930,7 +2501,7 @@ def get_all_ecues():
             'required': True,
             'description': 'ID de l\'ECUE'
         }
-    ],
+    ] + ECUE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Détails de l\'ECUE',
@@ -1945,6 +2516,7 @@ def get_all_ecues():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'ECUE non trouvé'
         },
@@ -1953,18 +2525,21 @@ def get_all_ecues():
         }
     }
 })
+@conditional_get(tables_validator('ecue', 'ue', 'enseignant'))
 def get_ecue(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ecue LEFT JOIN ue ON ecue.ue_id = ue.id LEFT JOIN enseignant ON ecue.enseignant_id = enseignant.id WHERE id = %s", (id,))
-        ecue = cursor.fetchone()
-        cursor.close()
+        fields = ECUE_LIST.parse_fields(request.args)
+        if fields:
+            ecue = reference_cache.get(('ecue', id, fields), ('ecue', 'ue', 'enseignant'), lambda: fetch_fields_one(ECUE_LIST, fields, id))
+        else:
+            ecue = reference_cache.get(('ecue', id), ('ecue', 'ue', 'enseignant'), lambda: fetch_one("SELECT * FROM ecue LEFT JOIN ue ON ecue.ue_id = ue.id LEFT JOIN enseignant ON ecue.enseignant_id = enseignant.id WHERE ecue.id = %s", (id,)))
         
         if ecue:
             return jsonify(ecue), 200
         else:
             return jsonify({'message': 'ECUE non trouvé'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2020,7 +2595,9 @@ def create_ecue():
         )
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'ecue')
         conn.commit()
+        reference_cache.invalidate('ecue')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -2102,7 +2679,9 @@ def update_ecue(id):
         
         sql = f"UPDATE ecue SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'ecue')
         conn.commit()
+        reference_cache.invalidate('ecue')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -2152,7 +2731,9 @@ def suprrimer_ecue(id):
             return jsonify({'message': 'ECUE non trouvé'}), 404
         
         cursor.execute("DELETE FROM ecue WHERE id = %s", (id,))
+        bump_table_versions(conn, 'ecue')
         conn.commit()
+        reference_cache.invalidate('ecue')
         cursor.close()
         
         return jsonify({'message': 'ECUE supprimé avec succès'}), 200
@@ -2163,10 +2744,39 @@ def suprrimer_ecue(id):
 # API pour la table 'etudiant'
 # ----------------------------------------------------------------------------------------
 
+ETUDIANT_LIST = ListSpec(
+    columns='*',
+    from_clause='etudiant',
+    pk='matricule',
+    filters={
+        'sexe': 'sexe',
+        'nom': 'nom',
+        'prenom': 'prenom'
+    },
+    sorts={
+        'matricule': 'matricule',
+        'nom': 'nom',
+        'prenom': 'prenom'
+    },
+    default_sort='matricule',
+    fields={
+        'matricule': 'matricule',
+        'nom': 'nom',
+        'prenom': 'prenom',
+        'date_naissance': 'date_naissance',
+        'sexe': 'sexe',
+        'email': 'email',
+        'telephone': 'telephone',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/etudiants', methods=['GET'])
 @swag_from({
     'tags': ['Etudiant'],
     'summary': 'Obtenir tous les étudiants',
+    'parameters': ETUDIANT_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste de tous les étudiants',
@@ -2185,19 +2795,31 @@ def suprrimer_ecue(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('etudiant'))
 def get_all_etudiants():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM etudiant")
-        etudiants = cursor.fetchall()
+        if ETUDIANT_LIST.wants_page(request.args):
+            page = paginate(cursor, ETUDIANT_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = ETUDIANT_LIST.parse_fields(request.args)
+        if fields:
+            etudiants = fetch_fields(ETUDIANT_LIST, fields)
+        else:
+            cursor.execute("SELECT * FROM etudiant")
+            etudiants = cursor.fetchall()
         cursor.close()
         return jsonify(etudiants), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2213,7 +2835,7 @@ def get_all_etudiants():
             'required': True,
             'description': 'Matricule de l\'étudiant'
         }
-    ],
+    ] + ETUDIANT_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Détails de l\'étudiant',
@@ -2231,6 +2853,8 @@ def get_all_etudiants():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
+        401: {'description': 'Ni membre administratif connecté, ni jeton de cet étudiant'},
         404: {
             'description': 'Étudiant non trouvé'
         },
@@ -2239,18 +2863,209 @@ def get_all_etudiants():
         }
     }
 })
+@etudiant_or_admin_required
+@conditional_get(row_validator("SELECT matricule FROM etudiant WHERE matricule = %s", ('etudiant',), 'matricule'))
 def get_etudiant(matricule):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM etudiant WHERE matricule = %s", (matricule,))
-        etudiant = cursor.fetchone()
-        cursor.close()
+        fields = ETUDIANT_LIST.parse_fields(request.args)
+        if fields:
+            etudiant = fetch_fields_one(ETUDIANT_LIST, fields, matricule)
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM etudiant WHERE matricule = %s", (matricule,))
+            etudiant = cursor.fetchone()
+            cursor.close()
         
         if etudiant:
             return jsonify(etudiant), 200
         else:
             return jsonify({'message': 'Étudiant non trouvé'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Relevé d'un étudiant en une requête : parcours par l'index etudiant_matricule, notes par
+# l'index parcours_ecue. Le coût ne dépend que du nombre de notes de l'étudiant.
+RELEVE_QUERY = """
+    SELECT
+        e.matricule, e.nom, e.prenom,
+        pe.id AS parcours_etudiant_id, pe.semestre, pe.decision,
+        aa.id AS annee_academique_id, aa.annee,
+        ae.id AS annee_etude_id, ae.code AS annee_etude,
+        ue.id AS ue_id, ue.code AS ue_code, ue.nom AS ue_nom, ue.credit,
+        mu.moyenne, mu.verdict,
+        ecue.id AS ecue_id, ecue.code AS ecue_code, ecue.nom AS ecue_nom,
+        n.id AS note_id, n.note, n.updated_at AS note_date
+    FROM etudiant e
+    LEFT JOIN parcours_etudiant pe ON pe.etudiant_matricule = e.matricule
+    LEFT JOIN annee_academique aa ON aa.id = pe.annee_academique_id
+    LEFT JOIN annee_etude ae ON ae.id = pe.annee_etude_id
+    LEFT JOIN note n ON n.parcours_etudiant_id = pe.id
+    LEFT JOIN ecue ON ecue.id = n.ecue_id
+    LEFT JOIN ue ON ue.id = ecue.ue_id
+    LEFT JOIN moyenne_ue mu ON mu.etudiant_matricule = e.matricule
+        AND mu.ue_id = ue.id AND mu.annee_academique_id = pe.annee_academique_id
+    WHERE e.matricule = %s
+    ORDER BY aa.annee, pe.semestre, ue.code, ecue.code
+"""
+
+def build_releve(rows):
+    # Regroupe les lignes à plat : année académique > semestre > UE > ECUE
+    first = rows[0]
+    releve = {
+        'etudiant': {'matricule': first['matricule'], 'nom': first['nom'], 'prenom': first['prenom']},
+        'annees': []
+    }
+    annees, semestres, ues = {}, {}, {}
+    for row in rows:
+        if row['parcours_etudiant_id'] is None:
+            continue
+        annee = annees.get(row['annee_academique_id'])
+        if annee is None:
+            annee = {
+                'annee_academique_id': row['annee_academique_id'],
+                'annee': row['annee'],
+                'semestres': []
+            }
+            annees[row['annee_academique_id']] = annee
+            releve['annees'].append(annee)
+
+        semestre = semestres.get(row['parcours_etudiant_id'])
+        if semestre is None:
+            semestre = {
+                'parcours_etudiant_id': row['parcours_etudiant_id'],
+                'semestre': row['semestre'],
+                'annee_etude_id': row['annee_etude_id'],
+                'annee_etude': row['annee_etude'],
+                'decision': row['decision'],
+                'ues': []
+            }
+            semestres[row['parcours_etudiant_id']] = semestre
+            annee['semestres'].append(semestre)
+
+        if row['note_id'] is None or row['ue_id'] is None:
+            continue
+        ue_key = (row['parcours_etudiant_id'], row['ue_id'])
+        ue = ues.get(ue_key)
+        if ue is None:
+            ue = {
+                'ue_id': row['ue_id'],
+                'code': row['ue_code'],
+                'nom': row['ue_nom'],
+                'credit': row['credit'],
+                'moyenne': float(row['moyenne']) if row['moyenne'] is not None else None,
+                'verdict': row['verdict'],
+                'ecues': []
+            }
+            ues[ue_key] = ue
+            semestre['ues'].append(ue)
+        ue['ecues'].append({
+            'ecue_id': row['ecue_id'],
+            'code': row['ecue_code'],
+            'nom': row['ecue_nom'],
+            'note_id': row['note_id'],
+            'note': float(row['note']) if row['note'] is not None else None,
+            'date': row['note_date']
+        })
+    return releve
+
+@app.route('/api/etudiants/<string:matricule>/releve', methods=['GET'])
+@swag_from({
+    'tags': ['Etudiant'],
+    'summary': 'Relevé de notes d\'un étudiant',
+    'description': 'Notes de l\'étudiant regroupées par année académique, semestre, UE et ECUE, en une seule requête.',
+    'parameters': [
+        {
+            'name': 'matricule',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': 'Matricule de l\'étudiant'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Relevé de l\'étudiant',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'etudiant': {
+                        'type': 'object',
+                        'properties': {
+                            'matricule': {'type': 'string'},
+                            'nom': {'type': 'string'},
+                            'prenom': {'type': 'string'}
+                        }
+                    },
+                    'annees': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'annee_academique_id': {'type': 'integer'},
+                                'annee': {'type': 'string'},
+                                'semestres': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'object',
+                                        'properties': {
+                                            'parcours_etudiant_id': {'type': 'integer'},
+                                            'semestre': {'type': 'integer'},
+                                            'annee_etude': {'type': 'string'},
+                                            'decision': {'type': 'string'},
+                                            'ues': {
+                                                'type': 'array',
+                                                'items': {
+                                                    'type': 'object',
+                                                    'properties': {
+                                                        'code': {'type': 'string'},
+                                                        'nom': {'type': 'string'},
+                                                        'credit': {'type': 'integer'},
+                                                        'moyenne': {'type': 'number'},
+                                                        'verdict': {'type': 'string'},
+                                                        'ecues': {
+                                                            'type': 'array',
+                                                            'items': {
+                                                                'type': 'object',
+                                                                'properties': {
+                                                                    'code': {'type': 'string'},
+                                                                    'nom': {'type': 'string'},
+                                                                    'note': {'type': 'number'},
+                                                                    'date': {'type': 'string', 'format': 'date-time'}
+                                                                }
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        401: {'description': 'Ni membre administratif connecté, ni jeton de cet étudiant'},
+        404: {'description': 'Étudiant non trouvé'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@etudiant_or_admin_required
+def get_releve_etudiant(matricule):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(RELEVE_QUERY, (matricule,))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        if not rows:
+            return jsonify({'message': 'Étudiant non trouvé'}), 404
+        return jsonify(build_releve(rows)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2305,7 +3120,9 @@ def create_etudiant():
         values = (data['nom'], data['prenom'], data['matricule'], data['email'], data['date_naissance'], data['sexe'], data['code'], data['telephone'])
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -2388,7 +3205,9 @@ def update_etudiant(matricule):
         
         sql = f"UPDATE etudiant SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -2420,7 +3239,7 @@ def update_etudiant(matricule):
         }
     ],
     'responses': {
-        200: {'description': 'Connexion réussie'},
+        200: {'description': 'Connexion réussie (token : jeton signé à envoyer en Authorization: Bearer)'},
         401: {'description': 'Matricule ou code incorrect'},
         500: {'description': 'Erreur serveur'}
     }
@@ -2439,7 +3258,12 @@ def login_etudiant():
         cursor.close()
 
         if etudiant:
-            return jsonify({'message': 'Connexion réussie', 'etudiant': etudiant}), 200
+            return jsonify({
+                'message': 'Connexion réussie',
+                'etudiant': etudiant,
+                'token': token_signer.issue(ETUDIANT, data['matricule'], 'Etudiant'),
+                'expires_in': token_signer.max_age
+            }), 200
         else:
             return jsonify({'error': 'Matricule ou code incorrect'}), 401
     except Exception as e:
@@ -2491,7 +3315,9 @@ def supprimer_etudiant(matricule):  # Correction du nom de fonction (supprimer a
         
         # Suppression
         cursor.execute("DELETE FROM etudiant WHERE matricule = %s", (matricule,))
+        bump_table_versions(conn, 'etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         
         return jsonify({'message': 'Étudiant supprimé avec succès'}), 200
 
@@ -2523,10 +3349,37 @@ def supprimer_etudiant(matricule):  # Correction du nom de fonction (supprimer a
 # API pour la table 'moyenne_ue'
 # ----------------------------------------------------------------------------------------
 
+MOYENNE_UE_LIST = ListSpec(
+    columns='*',
+    from_clause='moyenne_ue',
+    pk='id',
+    filters={
+        'etudiant_matricule': 'etudiant_matricule',
+        'ue_id': 'ue_id',
+        'annee_academique_id': 'annee_academique_id',
+        'verdict': 'verdict'
+    },
+    sorts={
+        'id': 'id',
+        'verdict': 'verdict'
+    },
+    fields={
+        'id': 'id',
+        'etudiant_matricule': 'etudiant_matricule',
+        'ue_id': 'ue_id',
+        'annee_academique_id': 'annee_academique_id',
+        'moyenne': 'moyenne',
+        'verdict': 'verdict',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/moyenne_ue', methods=['GET'])
 @swag_from({
     'tags': ['Moyenne_ue'],
     'summary': 'Obtenir toutes les moyennes d\'UE',
+    'parameters': MOYENNE_UE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste de toutes les moyennes d\'UE',
@@ -2545,19 +3398,31 @@ def supprimer_etudiant(matricule):  # Correction du nom de fonction (supprimer a
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('moyenne_ue'))
 def get_all_moyenne_ue():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM moyenne_ue")
-        moyenne_ues = cursor.fetchall()
+        if MOYENNE_UE_LIST.wants_page(request.args):
+            page = paginate(cursor, MOYENNE_UE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = MOYENNE_UE_LIST.parse_fields(request.args)
+        if fields:
+            moyenne_ues = fetch_fields(MOYENNE_UE_LIST, fields)
+        else:
+            cursor.execute("SELECT * FROM moyenne_ue")
+            moyenne_ues = cursor.fetchall()
         cursor.close()
         return jsonify(moyenne_ues), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2573,7 +3438,7 @@ def get_all_moyenne_ue():
             'required': True,
             'description': 'ID de la moyenne d\'UE'
         }
-    ],
+    ] + MOYENNE_UE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Détails de la moyenne d\'UE',
@@ -2589,6 +3454,7 @@ def get_all_moyenne_ue():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Moyenne d\'UE non trouvée'
         },
@@ -2597,18 +3463,25 @@ def get_all_moyenne_ue():
         }
     }
 })
+@conditional_get(row_validator("SELECT id FROM moyenne_ue WHERE id = %s", ('moyenne_ue',)))
 def get_moyenne_ue(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM moyenne_ue WHERE id = %s", (id,))
-        moyenne_ue = cursor.fetchone()
-        cursor.close()
+        fields = MOYENNE_UE_LIST.parse_fields(request.args)
+        if fields:
+            moyenne_ue = fetch_fields_one(MOYENNE_UE_LIST, fields, id)
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM moyenne_ue WHERE id = %s", (id,))
+            moyenne_ue = cursor.fetchone()
+            cursor.close()
         
         if moyenne_ue:
             return jsonify(moyenne_ue), 200
         else:
             return jsonify({'message': 'Moyenne d\'UE non trouvée'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2660,6 +3533,7 @@ def create_moyenne_ue():
         values = (data['etudiant_matricule'], data['ue_id'], data['annee_academique_id'], data['moyenne'], data['verdict'])
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'moyenne_ue')
         conn.commit()
         
         new_id = cursor.lastrowid
@@ -2743,6 +3617,7 @@ def update_moyenne_ue(id):
         
         sql = f"UPDATE moyenne_ue SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'moyenne_ue')
         conn.commit()
         
         affected_rows = cursor.rowcount
@@ -2793,51 +3668,141 @@ def suprrimer_moyenne_ue(id):
             return jsonify({'message': 'Moyenne d\'UE non trouvée'}), 404
         
         cursor.execute("DELETE FROM moyenne_ue WHERE id = %s", (id,))
+        bump_table_versions(conn, 'moyenne_ue')
         conn.commit()
         cursor.close()
         
         return jsonify({'message': 'Moyenne d\'UE supprimée avec succès'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-# ----------------------------------------------------------------------------------------
-# API pour la table 'enseignant'
-# ----------------------------------------------------------------------------------------
 
-@app.route('/api/enseignant', methods=['GET'])
+@app.route('/api/moyenne_ue/recalcul', methods=['POST'])
 @swag_from({
-    'tags': ['Enseignant'],
-    'summary': 'Obtenir tous les enseignants',
-    'responses': {
-        200: {
-            'description': 'Liste des enseignants',
+    'tags': ['Moyenne_ue'],
+    'summary': 'Recalculer les moyennes d\'UE d\'une année académique à partir des notes',
+    'description': 'Les notes saisies ensuite sont prises en compte automatiquement ; ce recalcul sert à la reprise des données existantes.',
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
             'schema': {
-                'type': 'array',
-                'items': {
-                    'type': 'object',
-                    'properties': {
-                        'id': {'type': 'integer'},
-                        'nom': {'type': 'string'},
-                        'prenom': {'type': 'string'},
-                        'email': {'type': 'string'},
-                        'telephone': {'type': 'string'},
-                        'specialite': {'type': 'string'}
-                    }
-                }
+                'type': 'object',
+                'properties': {
+                    'annee_academique_id': {'type': 'integer'}
+                },
+                'required': ['annee_academique_id']
             }
-        },
-        500: {
-            'description': 'Erreur serveur'
         }
+    ],
+    'responses': {
+        200: {'description': 'Nombre de moyennes mises à jour, créées et supprimées'},
+        400: {'description': 'Champs obligatoires manquants'},
+        500: {'description': 'Erreur serveur'}
     }
 })
-def get_all_enseignants():
+@login_required
+def recalculer_moyennes_ue():
     try:
+        data = request.get_json(silent=True) or {}
+        annee_academique_id = data.get('annee_academique_id')
+        if annee_academique_id is None:
+            return jsonify({'message': 'Champs obligatoires manquants'}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM enseignant")
-        enseignants = cursor.fetchall()
+        # Moyennes qui devraient exister (notes saisies) et moyennes existantes (éventuellement orphelines)
+        cursor.execute("""
+            SELECT DISTINCT pe.etudiant_matricule, ecue.ue_id, pe.annee_academique_id
+            FROM parcours_etudiant pe
+            JOIN note n ON n.parcours_etudiant_id = pe.id
+            JOIN ecue ON ecue.id = n.ecue_id
+            WHERE pe.annee_academique_id = %s AND ecue.ue_id IS NOT NULL
+            UNION
+            SELECT etudiant_matricule, ue_id, annee_academique_id FROM moyenne_ue
+            WHERE annee_academique_id = %s
+        """, (annee_academique_id, annee_academique_id))
+        keys = {tuple(row) for row in cursor.fetchall() if None not in row}
         cursor.close()
+
+        counts = recompute_moyennes(conn, keys)
+        conn.commit()
+        return jsonify(dict(counts, message='Moyennes d\'UE recalculées')), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+# ----------------------------------------------------------------------------------------
+# API pour la table 'enseignant'
+# ----------------------------------------------------------------------------------------
+
+ENSEIGNANT_LIST = ListSpec(
+    columns='*',
+    from_clause='enseignant',
+    pk='id',
+    filters={
+        'specialite': 'specialite'
+    },
+    sorts={
+        'id': 'id',
+        'nom': 'nom',
+        'prenom': 'prenom'
+    },
+    fields={
+        'id': 'id',
+        'nom': 'nom',
+        'prenom': 'prenom',
+        'email': 'email',
+        'telephone': 'telephone',
+        'specialite': 'specialite',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
+@app.route('/api/enseignant', methods=['GET'])
+@swag_from({
+    'tags': ['Enseignant'],
+    'summary': 'Obtenir tous les enseignants',
+    'parameters': ENSEIGNANT_LIST.swagger_parameters(),
+    'responses': {
+        200: {
+            'description': 'Liste des enseignants',
+            'schema': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'id': {'type': 'integer'},
+                        'nom': {'type': 'string'},
+                        'prenom': {'type': 'string'},
+                        'email': {'type': 'string'},
+                        'telephone': {'type': 'string'},
+                        'specialite': {'type': 'string'}
+                    }
+                }
+            }
+        },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
+        500: {
+            'description': 'Erreur serveur'
+        }
+    }
+})
+@conditional_get(tables_validator('enseignant'))
+def get_all_enseignants():
+    try:
+        if ENSEIGNANT_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, ENSEIGNANT_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = ENSEIGNANT_LIST.parse_fields(request.args)
+        if fields:
+            enseignants = reference_cache.get(('enseignants', fields), ('enseignant',), lambda: fetch_fields(ENSEIGNANT_LIST, fields))
+        else:
+            enseignants = reference_cache.get('enseignants', ('enseignant',), lambda: fetch_data("SELECT * FROM enseignant"))
         return jsonify(enseignants), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2853,24 +3818,28 @@ def get_all_enseignants():
             'required': True,
             'description': 'ID de l\'enseignant'
         }
-    ],
+    ] + ENSEIGNANT_LIST.fields_parameters(),
     'responses': {
         200: {'description': 'Détails de l\'enseignant'},
+        400: {'description': 'Champ inconnu dans fields'},
         404: {'description': 'Enseignant non trouvé'},
         500: {'description': 'Erreur serveur'}
     }
 })
+@conditional_get(tables_validator('enseignant'))
 def get_enseignant(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM enseignant WHERE id = %s", (id,))
-        enseignant = cursor.fetchone()
-        cursor.close()
+        fields = ENSEIGNANT_LIST.parse_fields(request.args)
+        if fields:
+            enseignant = reference_cache.get(('enseignant', id, fields), ('enseignant',), lambda: fetch_fields_one(ENSEIGNANT_LIST, fields, id))
+        else:
+            enseignant = reference_cache.get(('enseignant', id), ('enseignant',), lambda: fetch_one("SELECT * FROM enseignant WHERE id = %s", (id,)))
         if enseignant:
             return jsonify(enseignant), 200
         else:
             return jsonify({'message': 'Enseignant non trouvé'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2916,7 +3885,9 @@ def create_enseignant():
         values = (data['nom'], data['prenom'], data['email'], data.get('telephone'), data['specialite'])
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'enseignant')
         conn.commit()
+        reference_cache.invalidate('enseignant')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -2991,7 +3962,9 @@ def update_enseignant(id):
         
         sql = f"UPDATE enseignant SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'enseignant')
         conn.commit()
+        reference_cache.invalidate('enseignant')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -3027,7 +4000,9 @@ def supprimer_enseignant(id):
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM enseignant WHERE id = %s", (id,))
+        bump_table_versions(conn, 'enseignant')
         conn.commit()
+        reference_cache.invalidate('enseignant')
         cursor.close()
         return jsonify({'message': 'Enseignant supprimé avec succès'}), 200
     except Exception as e:
@@ -3036,6 +4011,27 @@ def supprimer_enseignant(id):
 # ----------------------------------------------------------------------------------------
 # API pour la table 'note'
 # ----------------------------------------------------------------------------------------
+
+# Notes d'une ECUE pour toute une promotion, avec les étudiants (index parcours_etudiant.promotion
+# et note.parcours_ecue, voir migrations/0001_index_acces_promotion.sql)
+NOTES_PROMOTION_QUERY = """
+    SELECT
+        e.matricule,
+        e.nom,
+        e.prenom,
+        COALESCE(n.note, 0) as note
+    FROM
+        etudiant e
+    JOIN
+        parcours_etudiant pe ON e.matricule = pe.etudiant_matricule
+    LEFT JOIN
+        note n ON n.parcours_etudiant_id = pe.id AND n.ecue_id = %s
+    WHERE
+        pe.annee_etude_id = %s
+        AND pe.annee_academique_id = %s
+        AND pe.semestre = %s
+"""
+
 @app.route('/api/notes', methods=['GET'])
 @swag_from({
     'tags': ['Notes'],
@@ -3094,6 +4090,7 @@ def supprimer_enseignant(id):
         }
     }
 })
+@conditional_get(tables_validator('note', 'parcours_etudiant', 'etudiant'))
 def get_notes():
     try:
         # Get query parameters
@@ -3109,26 +4106,7 @@ def get_notes():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Complex query to get notes with student details
-        query = """
-        SELECT 
-            e.matricule, 
-            e.nom, 
-            e.prenom, 
-            COALESCE(n.note, 0) as note
-        FROM 
-            etudiant e
-        JOIN 
-            parcours_etudiant pe ON e.matricule = pe.etudiant_matricule
-        LEFT JOIN 
-            note n ON n.parcours_etudiant_id = pe.id AND n.ecue_id = %s
-        WHERE 
-            pe.annee_etude_id = %s 
-            AND pe.annee_academique_id = %s 
-            AND pe.semestre = %s
-        """
-
-        cursor.execute(query, (ecue_id, annee_etude_id, annee_academique_id, semestre))
+        cursor.execute(NOTES_PROMOTION_QUERY, (ecue_id, annee_etude_id, annee_academique_id, semestre))
         notes = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -3138,10 +4116,41 @@ def get_notes():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+NOTE_LIST = ListSpec(
+    columns='*',
+    from_clause='note LEFT JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id',
+    pk='note.id',
+    filters={
+        'ecue_id': 'note.ecue_id',
+        'parcours_etudiant_id': 'note.parcours_etudiant_id',
+        'etudiant_matricule': 'parcours_etudiant.etudiant_matricule',
+        'annee_etude_id': 'parcours_etudiant.annee_etude_id',
+        'annee_academique_id': 'parcours_etudiant.annee_academique_id',
+        'semestre': 'parcours_etudiant.semestre'
+    },
+    sorts={
+        'id': 'note.id',
+        'updated_at': 'note.updated_at'
+    },
+    fields={
+        'id': 'note.id',
+        'ecue_id': 'note.ecue_id',
+        'parcours_etudiant_id': 'note.parcours_etudiant_id',
+        'note': 'note.note',
+        'matricule': 'parcours_etudiant.etudiant_matricule',
+        'annee_etude_id': 'parcours_etudiant.annee_etude_id',
+        'annee_academique_id': 'parcours_etudiant.annee_academique_id',
+        'semestre': 'parcours_etudiant.semestre',
+        'created_at': 'note.created_at',
+        'updated_at': 'note.updated_at'
+    }
+)
+
 @app.route('/api/note', methods=['GET'])
 @swag_from({
     'tags': ['Note'],
     'summary': 'Obtenir toutes les notes',
+    'parameters': NOTE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste de toutes les notes',
@@ -3158,22 +4167,166 @@ def get_notes():
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('note', 'parcours_etudiant'))
 def get_all_notes():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM note LEFT JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id")
-        notes = cursor.fetchall()
+        if NOTE_LIST.wants_page(request.args):
+            page = paginate(cursor, NOTE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = NOTE_LIST.parse_fields(request.args)
+        if fields:
+            notes = fetch_fields(NOTE_LIST, fields)
+        else:
+            cursor.execute("SELECT * FROM note LEFT JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id")
+            notes = cursor.fetchall()
         cursor.close()
         return jsonify(notes), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+NOTE_EXPORT_COLUMNS = [
+    ('id', 'note.id'),
+    ('ecue_id', 'note.ecue_id'),
+    ('parcours_etudiant_id', 'note.parcours_etudiant_id'),
+    ('note', 'note.note'),
+    ('matricule', 'etudiant.matricule'),
+    ('nom', 'etudiant.nom'),
+    ('prenom', 'etudiant.prenom'),
+    ('annee_etude_id', 'parcours_etudiant.annee_etude_id'),
+    ('annee_academique_id', 'parcours_etudiant.annee_academique_id'),
+    ('semestre', 'parcours_etudiant.semestre'),
+    ('decision', 'parcours_etudiant.decision'),
+    ('updated_at', 'note.updated_at'),
+]
+
+def export_value(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+def stream_notes_export(conn, fmt, filters, release):
+    names = [name for name, _ in NOTE_EXPORT_COLUMNS]
+    where = []
+    params = []
+    for name, value in filters.items():
+        where.append(f"{NOTE_LIST.filters[name]} = %s")
+        params.append(value)
+    sql = f"""SELECT {', '.join(column for _, column in NOTE_EXPORT_COLUMNS)}
+              FROM note
+              JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id
+              JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule"""
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY note.id"
+
+    def generate():
+        cursor = None
+        try:
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(sql, params)
+            if fmt == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(names)
+                yield buffer.getvalue()
+            while True:
+                rows = cursor.fetchmany(app.config['EXPORT_CHUNK_SIZE'])
+                if not rows:
+                    break
+                if fmt == 'csv':
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer)
+                    writer.writerows([[export_value(v) for v in row] for row in rows])
+                    yield buffer.getvalue()
+                else:
+                    yield ''.join(
+                        json.dumps(dict(zip(names, map(export_value, row))), ensure_ascii=False) + '\n'
+                        for row in rows
+                    )
+        except Exception:
+            # Fichier tronqué : l'erreur remonte au serveur, qui coupe le flux sans le terminer
+            # (le client ne reçoit pas un export partiel présenté comme complet)
+            app.logger.exception("Export des notes interrompu")
+            raise
+        finally:
+            # Client déconnecté en cours de route : des lignes restent à lire et cursor.close()
+            # lèverait "Unread result found". On vide le résultat ; si la connexion reste
+            # inutilisable, pool.release la jette au lieu de la remettre dans le pool.
+            try:
+                if cursor is not None:
+                    if getattr(conn, 'unread_result', False):
+                        conn.consume_results()
+                    cursor.close()
+            except Exception:
+                pass
+            release()
+
+    return generate()
+
+@app.route('/api/note/export', methods=['GET'])
+@swag_from({
+    'tags': ['Note'],
+    'summary': 'Exporter toutes les notes (NDJSON ou CSV) en streaming',
+    'parameters': [
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'csv'],
+            'required': False,
+            'description': 'Format du fichier (ndjson par défaut)'
+        }
+    ] + NOTE_LIST.filter_parameters(),
+    'responses': {
+        200: {'description': 'Flux NDJSON (une note par ligne) ou CSV avec en-tête'},
+        400: {'description': 'Format non supporté'},
+        503: {'description': 'Aucune connexion disponible'}
+    }
+})
+@login_required
+def export_notes():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'message': 'Format non supporté (ndjson ou csv)'}), 400
+
+    filters = {name: request.args[name] for name in NOTE_LIST.filters if name in request.args}
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+
+    # Connexion dédiée (hors g) : le curseur non bufferisé l'occupe pendant tout le
+    # streaming, qui se poursuit après la fin de la fonction de vue.
+    pool = get_pool()
+    try:
+        conn = pool.acquire()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 503
+
+    released = []
+    def release():
+        # Une seule fois : à la fin du générateur, ou à la fermeture de la réponse s'il n'a
+        # jamais démarré (client parti avant le premier octet)
+        if not released:
+            released.append(True)
+            pool.release(conn)
+
+    response = Response(stream_notes_export(conn, fmt, filters, release), mimetype=mimetype)
+    response.call_on_close(release)
+    response.headers['Content-Disposition'] = f'attachment; filename=notes.{fmt}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/note/<int:id>', methods=['GET'])
 @swag_from({
     'tags': ['Note'],
@@ -3186,7 +4339,7 @@ def get_all_notes():
             'required': True,
             'description': 'ID de la note'
         }
-    ],
+    ] + NOTE_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Détails de la note',
@@ -3200,6 +4353,7 @@ def get_all_notes():
                 }
             }
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Note non trouvée'
         },
@@ -3208,25 +4362,44 @@ def get_all_notes():
         }
     }
 })
+@conditional_get(row_validator("SELECT id FROM note WHERE id = %s", ('note', 'parcours_etudiant')))
 def get_note(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM note LEFT JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id WHERE id = %s", (id,))
-        note = cursor.fetchone()
-        cursor.close()
+        fields = NOTE_LIST.parse_fields(request.args)
+        if fields:
+            note = fetch_fields_one(NOTE_LIST, fields, id)
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM note LEFT JOIN parcours_etudiant ON note.parcours_etudiant_id = parcours_etudiant.id WHERE note.id = %s", (id,))
+            note = cursor.fetchone()
+            cursor.close()
         
         if note:
             return jsonify(note), 200
         else:
             return jsonify({'message': 'Note non trouvée'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Une note par (parcours, ECUE), clé unique parcours_ecue (migrations/0003) : un nouvel envoi
+# remplace la note existante en une seule instruction, sans SELECT préalable ni doublon.
+# LAST_INSERT_ID(id) renvoie l'id de la ligne existante quand c'est une mise à jour.
+NOTE_UPSERT = """
+    INSERT INTO note (ecue_id, parcours_etudiant_id, note)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id), note = VALUES(note)
+"""
+
+# Erreur MySQL ER_DUP_ENTRY (violation d'une clé unique)
+DUPLICATE_ENTRY = 1062
+
 @app.route('/api/note', methods=['POST'])
 @swag_from({
     'tags': ['Note'],
-    'summary': 'Créer une nouvelle note',
+    'summary': 'Enregistrer une note (créée, ou remplacée si l\'étudiant a déjà une note pour cette ECUE)',
     'parameters': [
         {
             'name': 'body',
@@ -3244,6 +4417,9 @@ def get_note(id):
         }
     ],
     'responses': {
+        200: {
+            'description': 'Note existante mise à jour'
+        },
         201: {
             'description': 'Note créée avec succès'
         },
@@ -3264,20 +4440,157 @@ def create_note():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        sql = """INSERT INTO note (ecue_id, parcours_etudiant_id, note) 
-                 VALUES (%s, %s, %s)"""
         values = (data['ecue_id'], data['parcours_etudiant_id'], data['note'])
         
-        cursor.execute(sql, values)
+        cursor.execute(NOTE_UPSERT, values)
+        # 1 : ligne insérée, 2 : note remplacée, 0 : même note déjà enregistrée
+        created = cursor.rowcount == 1
+        note_id = cursor.lastrowid
+        dirty = refresh_moyennes(conn, [(data['ecue_id'], data['parcours_etudiant_id'])])
+        bump_table_versions(conn, 'note')
         conn.commit()
+        get_moyenne_recomputer().mark(dirty)
         
-        new_id = cursor.lastrowid
         cursor.close()
         
+        if created:
+            return jsonify({
+                'message': 'Note créée avec succès',
+                'id': note_id
+            }), 201
         return jsonify({
-            'message': 'Note créée avec succès',
-            'id': new_id
-        }), 201
+            'message': 'Note mise à jour avec succès',
+            'id': note_id
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def parse_bulk_notes():
+    # Accepte un tableau JSON, {"notes": [...]} ou un flux NDJSON (une note par ligne)
+    if request.mimetype == 'application/x-ndjson':
+        lines = request.get_data(as_text=True).splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get('notes')
+    return data
+
+def validate_bulk_note(item):
+    if not isinstance(item, dict):
+        return ['Objet attendu']
+    errors = []
+    for field in ['ecue_id', 'parcours_etudiant_id']:
+        value = item.get(field)
+        if isinstance(value, bool) or not isinstance(value, int):
+            try:
+                int(str(value))
+            except (TypeError, ValueError):
+                errors.append(f'{field} doit être un entier')
+    try:
+        note = float(item.get('note'))
+        if not 0 <= note <= 20:
+            errors.append('note doit être comprise entre 0 et 20')
+    except (TypeError, ValueError):
+        errors.append('note doit être un nombre')
+    return errors
+
+@app.route('/api/note/bulk', methods=['POST'])
+@swag_from({
+    'tags': ['Note'],
+    'summary': 'Enregistrer plusieurs notes en une seule transaction (les notes existantes sont remplacées)',
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'description': 'Tableau de notes (JSON) ou une note par ligne (application/x-ndjson)',
+            'schema': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'ecue_id': {'type': 'integer'},
+                        'parcours_etudiant_id': {'type': 'integer'},
+                        'note': {'type': 'number', 'format': 'decimal'}
+                    },
+                    'required': ['ecue_id', 'parcours_etudiant_id', 'note']
+                }
+            }
+        }
+    ],
+    'responses': {
+        200: {'description': 'Toutes les notes ont été enregistrées (créées ou remplacées)'},
+        400: {'description': 'Lot invalide : aucune note n\'est enregistrée, le détail par ligne est renvoyé'},
+        413: {'description': 'Lot trop volumineux'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def create_notes_bulk():
+    try:
+        try:
+            items = parse_bulk_notes()
+        except ValueError:
+            return jsonify({'message': 'Corps de requête illisible'}), 400
+        if not isinstance(items, list) or not items:
+            return jsonify({'message': 'Un tableau de notes non vide est attendu'}), 400
+        if len(items) > app.config['NOTE_BULK_MAX_ROWS']:
+            return jsonify({'message': f"Maximum {app.config['NOTE_BULK_MAX_ROWS']} notes par lot"}), 413
+
+        # Validation de tout le lot avant la moindre écriture
+        results = [{'index': index, 'errors': validate_bulk_note(item)} for index, item in enumerate(items)]
+        valid = [item for item, result in zip(items, results) if not result['errors']]
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if valid:
+            ecue_ids = sorted({int(item['ecue_id']) for item in valid})
+            parcours_ids = sorted({int(item['parcours_etudiant_id']) for item in valid})
+            cursor.execute(f"SELECT id FROM ecue WHERE id IN ({', '.join(['%s'] * len(ecue_ids))})", ecue_ids)
+            known_ecues = {row[0] for row in cursor.fetchall()}
+            cursor.execute(f"SELECT id FROM parcours_etudiant WHERE id IN ({', '.join(['%s'] * len(parcours_ids))})", parcours_ids)
+            known_parcours = {row[0] for row in cursor.fetchall()}
+            for item, result in zip(items, results):
+                if result['errors']:
+                    continue
+                if int(item['ecue_id']) not in known_ecues:
+                    result['errors'].append('ECUE inconnue')
+                if int(item['parcours_etudiant_id']) not in known_parcours:
+                    result['errors'].append('Parcours étudiant inconnu')
+
+        invalid = [result for result in results if result['errors']]
+        if invalid:
+            cursor.close()
+            for result in results:
+                result['status'] = 'invalide' if result['errors'] else 'non enregistrée'
+            return jsonify({
+                'message': f'{len(invalid)} note(s) invalide(s) sur {len(items)} : aucune note enregistrée',
+                'results': results
+            }), 400
+
+        # Un seul INSERT multi-lignes (upsert) et un seul commit pour tout le lot : un scan
+        # renvoyé remplace les notes déjà saisies. Pour un même couple présent deux fois dans
+        # le lot, la dernière ligne l'emporte.
+        values = [(int(item['ecue_id']), int(item['parcours_etudiant_id']), item['note']) for item in items]
+        try:
+            cursor.executemany(NOTE_UPSERT, values)
+            dirty = refresh_moyennes(conn, [(ecue_id, parcours_id) for ecue_id, parcours_id, _ in values])
+            bump_table_versions(conn, 'note')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        get_moyenne_recomputer().mark(dirty)
+
+        for result in results:
+            result['status'] = 'enregistrée'
+        return jsonify({
+            'message': f'{len(items)} notes enregistrées avec succès',
+            'saved': len(items),
+            'results': results
+        }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3314,6 +4627,9 @@ def create_note():
         404: {
             'description': 'Note non trouvée'
         },
+        409: {
+            'description': 'L\'étudiant a déjà une note pour cette ECUE'
+        },
         500: {
             'description': 'Erreur serveur'
         }
@@ -3327,7 +4643,8 @@ def update_note(id):
         
         # Vérifier si la note existe
         cursor.execute("SELECT * FROM note WHERE id = %s", (id,))
-        if not cursor.fetchone():
+        note = cursor.fetchone()
+        if not note:
             cursor.close()
             conn.close()
             return jsonify({'message': 'Note non trouvée'}), 404
@@ -3350,9 +4667,16 @@ def update_note(id):
         
         sql = f"UPDATE note SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        affected_rows = cursor.rowcount
+        # Ancienne et nouvelle (ECUE, parcours) : une note déplacée change deux moyennes
+        dirty = refresh_moyennes(conn, [
+            (note[1], note[2]),
+            (data.get('ecue_id', note[1]), data.get('parcours_etudiant_id', note[2]))
+        ])
+        bump_table_versions(conn, 'note')
         conn.commit()
+        get_moyenne_recomputer().mark(dirty)
         
-        affected_rows = cursor.rowcount
         cursor.close()
         
         return jsonify({
@@ -3360,6 +4684,9 @@ def update_note(id):
             'affected_rows': affected_rows
         }), 200
     except Exception as e:
+        # Déplacement vers un (parcours, ECUE) déjà noté : clé unique parcours_ecue
+        if getattr(e, 'errno', None) == DUPLICATE_ENTRY:
+            return jsonify({'message': 'L\'étudiant a déjà une note pour cette ECUE'}), 409
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/note/<int:id>', methods=['DELETE'])
@@ -3394,13 +4721,17 @@ def suprrimer_note(id):
         
         # Vérifier si la note existe
         cursor.execute("SELECT * FROM note WHERE id = %s", (id,))
-        if not cursor.fetchone():
+        note = cursor.fetchone()
+        if not note:
             cursor.close()
             conn.close()
             return jsonify({'message': 'Note non trouvée'}), 404
         
         cursor.execute("DELETE FROM note WHERE id = %s", (id,))
+        dirty = refresh_moyennes(conn, [(note[1], note[2])])
+        bump_table_versions(conn, 'note')
         conn.commit()
+        get_moyenne_recomputer().mark(dirty)
         cursor.close()
         
         return jsonify({'message': 'Note supprimée avec succès'}), 200
@@ -3411,10 +4742,42 @@ def suprrimer_note(id):
 # API pour la table 'parcours_etudiant'
 # ----------------------------------------------------------------------------------------
 
+PARCOURS_ETUDIANT_LIST = ListSpec(
+    columns='*',
+    from_clause='parcours_etudiant LEFT JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule LEFT JOIN annee_etude ON parcours_etudiant.annee_etude_id = annee_etude.id LEFT JOIN annee_academique ON parcours_etudiant.annee_academique_id = annee_academique.id',
+    pk='parcours_etudiant.id',
+    filters={
+        'etudiant_matricule': 'parcours_etudiant.etudiant_matricule',
+        'annee_etude_id': 'parcours_etudiant.annee_etude_id',
+        'annee_academique_id': 'parcours_etudiant.annee_academique_id',
+        'semestre': 'parcours_etudiant.semestre',
+        'decision': 'parcours_etudiant.decision'
+    },
+    sorts={
+        'id': 'parcours_etudiant.id',
+        'semestre': 'parcours_etudiant.semestre'
+    },
+    fields={
+        'id': 'parcours_etudiant.id',
+        'etudiant_matricule': 'parcours_etudiant.etudiant_matricule',
+        'nom': 'etudiant.nom',
+        'prenom': 'etudiant.prenom',
+        'annee_etude_id': 'parcours_etudiant.annee_etude_id',
+        'annee_etude': 'annee_etude.code',
+        'annee_academique_id': 'parcours_etudiant.annee_academique_id',
+        'annee': 'annee_academique.annee',
+        'semestre': 'parcours_etudiant.semestre',
+        'decision': 'parcours_etudiant.decision',
+        'created_at': 'parcours_etudiant.created_at',
+        'updated_at': 'parcours_etudiant.updated_at'
+    }
+)
+
 @app.route('/api/parcours_etudiant', methods=['GET'])
 @swag_from({
     'tags': ['Parcours Etudiant'],
     'summary': 'Obtenir tous les parcours étudiants',
+    'parameters': PARCOURS_ETUDIANT_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste de tous les parcours étudiants',
@@ -3430,19 +4793,31 @@ def suprrimer_note(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('parcours_etudiant', 'etudiant', 'annee_etude', 'annee_academique'))
 def get_all_parcours_etudiants():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM parcours_etudiant LEFT JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule LEFT JOIN annee_etude ON parcours_etudiant.annee_etude_id = annee_etude.id LEFT JOIN annee_academique ON parcours_etudiant.annee_academique_id = annee_academique.id")
-        parcours = cursor.fetchall()
+        if PARCOURS_ETUDIANT_LIST.wants_page(request.args):
+            page = paginate(cursor, PARCOURS_ETUDIANT_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = PARCOURS_ETUDIANT_LIST.parse_fields(request.args)
+        if fields:
+            parcours = fetch_fields(PARCOURS_ETUDIANT_LIST, fields)
+        else:
+            cursor.execute("SELECT * FROM parcours_etudiant LEFT JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule LEFT JOIN annee_etude ON parcours_etudiant.annee_etude_id = annee_etude.id LEFT JOIN annee_academique ON parcours_etudiant.annee_academique_id = annee_academique.id")
+            parcours = cursor.fetchall()
         cursor.close()
         return jsonify(parcours), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3458,11 +4833,12 @@ def get_all_parcours_etudiants():
             'required': True,
             'description': 'ID du parcours étudiant'
         }
-    ],
+    ] + PARCOURS_ETUDIANT_LIST.fields_parameters(),
     'responses': {
         200: {
             'description': 'Détails du parcours étudiant'
         },
+        400: {'description': 'Champ inconnu dans fields'},
         404: {
             'description': 'Parcours étudiant non trouvé'
         },
@@ -3471,18 +4847,28 @@ def get_all_parcours_etudiants():
         }
     }
 })
+@conditional_get(row_validator(
+    "SELECT id FROM parcours_etudiant WHERE id = %s",
+    ('parcours_etudiant', 'etudiant', 'annee_etude', 'annee_academique')
+))
 def get_parcours_etudiant(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM parcours_etudiant LEFT JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule LEFT JOIN annee_etude ON parcours_etudiant.annee_etude_id = annee_etude.id LEFT JOIN annee_academique ON parcours_etudiant.annee_academique_id = annee_academique.id WHERE id = %s", (id,))
-        parcours = cursor.fetchone()
-        cursor.close()
+        fields = PARCOURS_ETUDIANT_LIST.parse_fields(request.args)
+        if fields:
+            parcours = fetch_fields_one(PARCOURS_ETUDIANT_LIST, fields, id)
+        else:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM parcours_etudiant LEFT JOIN etudiant ON parcours_etudiant.etudiant_matricule = etudiant.matricule LEFT JOIN annee_etude ON parcours_etudiant.annee_etude_id = annee_etude.id LEFT JOIN annee_academique ON parcours_etudiant.annee_academique_id = annee_academique.id WHERE parcours_etudiant.id = %s", (id,))
+            parcours = cursor.fetchone()
+            cursor.close()
         
         if parcours:
             return jsonify(parcours), 200
         else:
             return jsonify({'message': 'Parcours étudiant non trouvé'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3531,7 +4917,9 @@ def create_parcours_etudiant():
         values = (data['etudiant_id'], data['annee_etude_id'])
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'parcours_etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -3611,7 +4999,9 @@ def update_parcours_etudiant(id):
         
         sql = f"UPDATE parcours_etudiant SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'parcours_etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -3661,21 +5051,124 @@ def suprrimer_parcours_etudiant(id):
             return jsonify({'message': 'Parcours étudiant non trouvé'}), 404
         
         cursor.execute("DELETE FROM parcours_etudiant WHERE id = %s", (id,))
+        bump_table_versions(conn, 'parcours_etudiant')
         conn.commit()
+        roster_indexes.invalidate()
         cursor.close()
         
         return jsonify({'message': 'Parcours étudiant supprimé avec succès'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/deliberations', methods=['POST'])
+@swag_from({
+    'tags': ['Parcours Etudiant'],
+    'summary': 'Délibérer une promotion (décision Admis / Enjambement / Redoublant)',
+    'description': 'Moyennes de semestre pondérées par les crédits, compensations et crédits acquis '
+                   'calculés pour toute la promotion. Par défaut (dry_run) seul le rapport est renvoyé.',
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'annee_etude_id': {'type': 'integer'},
+                    'annee_academique_id': {'type': 'integer'},
+                    'dry_run': {'type': 'boolean', 'default': True},
+                    'regles': {
+                        'type': 'object',
+                        'description': 'Surcharge des règles par défaut',
+                        'properties': {
+                            'pass_mark': {'type': 'number', 'default': DELIBERATION_DEFAULTS['pass_mark']},
+                            'ue_floor': {'type': 'number', 'default': DELIBERATION_DEFAULTS['ue_floor']},
+                            'semester_compensation': {'type': 'boolean', 'default': DELIBERATION_DEFAULTS['semester_compensation']},
+                            'annual_compensation': {'type': 'boolean', 'default': DELIBERATION_DEFAULTS['annual_compensation']},
+                            'missing_as_zero': {'type': 'boolean', 'default': DELIBERATION_DEFAULTS['missing_as_zero']},
+                            'enjambement_ratio': {'type': 'number', 'default': DELIBERATION_DEFAULTS['enjambement_ratio']}
+                        }
+                    }
+                },
+                'required': ['annee_etude_id', 'annee_academique_id']
+            }
+        }
+    ],
+    'responses': {
+        200: {'description': 'Rapport de délibération (moyennes, crédits et décision par étudiant)'},
+        400: {'description': 'Paramètres ou règles invalides, promotion vide'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def deliberer_promotion():
+    try:
+        data = request.get_json(silent=True) or {}
+        if not all(field in data for field in ['annee_etude_id', 'annee_academique_id']):
+            return jsonify({'message': 'Champs obligatoires manquants'}), 400
+        try:
+            annee_etude_id = int(data['annee_etude_id'])
+            annee_academique_id = int(data['annee_academique_id'])
+        except (TypeError, ValueError):
+            return jsonify({'message': 'annee_etude_id et annee_academique_id doivent être des entiers'}), 400
+        try:
+            # Ce drapeau décide de l'écriture : "false" vaut False, null / "" / [] sont refusés
+            dry_run = parse_bool(data.get('dry_run', True))
+        except ValueError:
+            return jsonify({'message': 'dry_run doit être un booléen (true / false)'}), 400
+        rules = deliberation_rules(data.get('regles'))
+
+        conn = get_db_connection()
+        cohort = load_cohort(conn, annee_etude_id, annee_academique_id)
+        report = build_report(cohort, deliberate(cohort, rules))
+        report.update({
+            'annee_etude_id': annee_etude_id,
+            'annee_academique_id': annee_academique_id,
+            'regles': rules,
+            'dry_run': dry_run,
+            'enregistrees': 0 if dry_run else apply_decisions(conn, annee_etude_id, annee_academique_id, report)
+        })
+        return jsonify(report), 200
+    except DeliberationError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ----------------------------------------------------------------------------------------
 # API pour la table 'ue'
 # ----------------------------------------------------------------------------------------
 
+UE_LIST = ListSpec(
+    columns='*',
+    from_clause='ue',
+    pk='id',
+    filters={
+        'annee_etude_id': 'annee_etude_id',
+        'semestre': 'semestre',
+        'code': 'code'
+    },
+    sorts={
+        'id': 'id',
+        'code': 'code',
+        'semestre': 'semestre'
+    },
+    fields={
+        'id': 'id',
+        'code': 'code',
+        'nom': 'nom',
+        'annee_etude_id': 'annee_etude_id',
+        'credit': 'credit',
+        'semestre': 'semestre',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+)
+
 @app.route('/api/ue', methods=['GET'])
 @swag_from({
     'tags': ['UE'],
     'summary': 'Obtenir toutes les unités d\'enseignement',
+    'parameters': UE_LIST.swagger_parameters(),
     'responses': {
         200: {
             'description': 'Liste des UE',
@@ -3694,19 +5187,28 @@ def suprrimer_parcours_etudiant(id):
                 }
             }
         },
+        400: {'description': 'Paramètre de pagination, de filtre ou de tri invalide'},
         500: {
             'description': 'Erreur serveur'
         }
     }
 })
+@conditional_get(tables_validator('ue'))
 def get_all_ues():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ue")
-        ues = cursor.fetchall()
-        cursor.close()
+        if UE_LIST.wants_page(request.args):
+            cursor = get_db_connection().cursor()
+            page = paginate(cursor, UE_LIST, request.args)
+            cursor.close()
+            return jsonify(page), 200
+        fields = UE_LIST.parse_fields(request.args)
+        if fields:
+            ues = reference_cache.get(('ues', fields), ('ue',), lambda: fetch_fields(UE_LIST, fields))
+        else:
+            ues = reference_cache.get('ues', ('ue',), lambda: fetch_data("SELECT * FROM ue"))
         return jsonify(ues), 200
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3722,24 +5224,28 @@ def get_all_ues():
             'required': True,
             'description': 'ID de l\'UE'
         }
-    ],
+    ] + UE_LIST.fields_parameters(),
     'responses': {
         200: {'description': 'Détails de l\'UE'},
+        400: {'description': 'Champ inconnu dans fields'},
         404: {'description': 'UE non trouvée'},
         500: {'description': 'Erreur serveur'}
     }
 })
+@conditional_get(tables_validator('ue'))
 def get_ue(id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ue WHERE id = %s", (id,))
-        ue = cursor.fetchone()
-        cursor.close()
+        fields = UE_LIST.parse_fields(request.args)
+        if fields:
+            ue = reference_cache.get(('ue', id, fields), ('ue',), lambda: fetch_fields_one(UE_LIST, fields, id))
+        else:
+            ue = reference_cache.get(('ue', id), ('ue',), lambda: fetch_one("SELECT * FROM ue WHERE id = %s", (id,)))
         if ue:
             return jsonify(ue), 200
         else:
             return jsonify({'message': 'UE non trouvée'}), 404
+    except PaginationError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -3785,7 +5291,9 @@ def create_ue():
         values = (data['code'], data['nom'], data.get('annee_etude_id'), data['credit'], data['semestre'])
         
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'ue')
         conn.commit()
+        reference_cache.invalidate('ue')
         
         new_id = cursor.lastrowid
         cursor.close()
@@ -3860,7 +5368,9 @@ def update_ue(id):
         
         sql = f"UPDATE ue SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(sql, values)
+        bump_table_versions(conn, 'ue')
         conn.commit()
+        reference_cache.invalidate('ue')
         
         affected_rows = cursor.rowcount
         cursor.close()
@@ -3896,13 +5406,298 @@ def suprrimer_ue(id):
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM ue WHERE id = %s", (id,))
+        bump_table_versions(conn, 'ue')
         conn.commit()
+        reference_cache.invalidate('ue')
         cursor.close()
         return jsonify({'message': 'UE supprimée avec succès'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ----------------------------------------------------------------------------------------
+# API pour la reconnaissance des relevés (OCR)
+# ----------------------------------------------------------------------------------------
+
+@app.route('/api/ocr/scan', methods=['POST'])
+@swag_from({
+    'tags': ['OCR'],
+    'summary': 'Reconnaître une ou plusieurs feuilles de notes',
+    'consumes': ['multipart/form-data'],
+    'parameters': [
+        {
+            'name': 'images',
+            'in': 'formData',
+            'type': 'file',
+            'required': True,
+            'description': 'Images jpg/jpeg/png (plusieurs fichiers possibles)'
+        },
+        {'name': 'annee_etude_id', 'in': 'formData', 'type': 'integer', 'required': False},
+        {'name': 'annee_academique_id', 'in': 'formData', 'type': 'integer', 'required': False},
+        {'name': 'semestre', 'in': 'formData', 'type': 'integer', 'required': False,
+         'description': 'Avec les deux champs précédents : chaque ligne reçoit son parcours_etudiant (match)'}
+    ],
+    'responses': {
+        200: {
+            'description': 'Texte reconnu et lignes (matricule, nom, prénom, note) par image',
+            'schema': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'filename': {'type': 'string'},
+                        'text': {'type': 'string'},
+                        'rows': {'type': 'array', 'items': {'type': 'object'}},
+                        'error': {'type': 'string'}
+                    }
+                }
+            }
+        },
+        400: {'description': 'Aucune image ou format non autorisé'},
+        413: {'description': 'Trop d\'images ou requête trop volumineuse'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def scan_notes():
+    try:
+        files = request.files.getlist('images')
+        if not files:
+            return jsonify({'message': 'Aucune image reçue'}), 400
+        if len(files) > app.config['OCR_MAX_FILES']:
+            return jsonify({'message': f"Maximum {app.config['OCR_MAX_FILES']} images par envoi"}), 413
+        for file in files:
+            if not allowed_file(file.filename):
+                return jsonify({'message': f'Format non autorisé : {file.filename}'}), 400
+
+        from ocr import ocr_images  # PIL et pytesseract chargés à la première reconnaissance
+        images = [(file.filename, file.read()) for file in files]
+        results = ocr_images(images, ocr_settings(), max_workers=app.config['OCR_WORKERS'], cache=get_ocr_cache())
+
+        # Promotion fournie : chaque ligne est rattachée à son parcours_etudiant
+        roster = roster_params(request.form)
+        if roster:
+            for result in results:
+                result['rows'] = match_rows(result['rows'], roster)
+        return jsonify(results), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/ocr/match', methods=['POST'])
+@swag_from({
+    'tags': ['OCR'],
+    'summary': 'Rattacher des lignes reconnues aux inscrits d\'une promotion',
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'annee_etude_id': {'type': 'integer'},
+                    'annee_academique_id': {'type': 'integer'},
+                    'semestre': {'type': 'integer'},
+                    'rows': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'matricule': {'type': 'string'},
+                                'nom': {'type': 'string'},
+                                'prenom': {'type': 'string'},
+                                'note': {'type': 'number'}
+                            }
+                        }
+                    }
+                },
+                'required': ['annee_etude_id', 'annee_academique_id', 'semestre', 'rows']
+            }
+        }
+    ],
+    'responses': {
+        200: {'description': 'Lignes avec match : parcours_etudiant_id, matricule retenu, confidence (0-1), method (exact, matricule, nom) ou null'},
+        400: {'description': 'Promotion ou lignes manquantes'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def match_ocr_rows():
+    try:
+        data = request.get_json()
+        roster = roster_params(data or {})
+        if roster is None or not isinstance(data.get('rows'), list):
+            return jsonify({'message': 'annee_etude_id, annee_academique_id, semestre et rows sont requis'}), 400
+        return jsonify(match_rows(data['rows'], roster)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+_ocr_job_manager = None
+_ocr_job_lock = threading.Lock()
+
+# Démarré à la première utilisation des routes /api/ocr/jobs (reprend alors les traitements
+# laissés en attente en base)
+def get_ocr_job_manager():
+    global _ocr_job_manager
+    if _ocr_job_manager is None:
+        with _ocr_job_lock:
+            if _ocr_job_manager is None:
+                manager = OcrJobManager(
+                    get_pool(),
+                    app.config['UPLOAD_FOLDER'],
+                    ocr_settings(),
+                    workers=app.config['OCR_JOB_WORKERS'],
+                    queue_size=app.config['OCR_JOB_QUEUE_SIZE'],
+                    ocr_workers=app.config['OCR_WORKERS'],
+                    cache=get_ocr_cache(),
+                    retention_days=app.config['OCR_JOB_RETENTION_DAYS']
+                )
+                manager.start()
+                _ocr_job_manager = manager
+    return _ocr_job_manager
+
+@app.route('/api/ocr/jobs', methods=['POST'])
+@swag_from({
+    'tags': ['OCR'],
+    'summary': 'Lancer la reconnaissance d\'un lot de feuilles en arrière-plan',
+    'consumes': ['multipart/form-data'],
+    'parameters': [
+        {
+            'name': 'images',
+            'in': 'formData',
+            'type': 'file',
+            'required': True,
+            'description': 'Images jpg/jpeg/png (plusieurs fichiers possibles)'
+        }
+    ],
+    'responses': {
+        202: {'description': 'Traitement accepté, suivi via GET /api/ocr/jobs/<job_id>'},
+        400: {'description': 'Aucune image ou format non autorisé'},
+        413: {'description': 'Trop d\'images ou requête trop volumineuse'},
+        429: {'description': 'File de traitement pleine, réessayer après Retry-After secondes'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def create_ocr_job():
+    try:
+        files = request.files.getlist('images')
+        if not files:
+            return jsonify({'message': 'Aucune image reçue'}), 400
+        if len(files) > app.config['OCR_MAX_FILES']:
+            return jsonify({'message': f"Maximum {app.config['OCR_MAX_FILES']} images par envoi"}), 413
+        for file in files:
+            if not allowed_file(file.filename):
+                return jsonify({'message': f'Format non autorisé : {file.filename}'}), 400
+
+        manager = get_ocr_job_manager()
+        images = [(secure_filename(file.filename) or 'image', file.read()) for file in files]
+        try:
+            # Session ou jeton Bearer : le membre vient de flask_login (anonyme si LOGIN_DISABLED)
+            created_by = current_user.id if current_user.is_authenticated else None
+            job_id = manager.submit(images, created_by=created_by)
+        except QueueFull:
+            response = jsonify({'message': 'Trop de traitements en cours, réessayez plus tard'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(manager.retry_after())
+            return response
+
+        status_url = url_for('get_ocr_job', job_id=job_id)
+        response = jsonify({'job_id': job_id, 'status_url': status_url})
+        response.status_code = 202
+        response.headers['Location'] = status_url
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/ocr/jobs/<string:job_id>', methods=['GET'])
+@swag_from({
+    'tags': ['OCR'],
+    'summary': 'État, progression et résultats d\'un traitement OCR',
+    'parameters': [
+        {
+            'name': 'job_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': 'Identifiant renvoyé par POST /api/ocr/jobs'
+        }
+    ],
+    'responses': {
+        200: {'description': 'statut (en_attente, en_cours, termine, echec), progression en %, résultats une fois terminé'},
+        404: {'description': 'Traitement non trouvé'},
+        500: {'description': 'Erreur serveur'}
+    }
+})
+@login_required
+def get_ocr_job(job_id):
+    try:
+        job = get_ocr_job_manager().get(job_id)
+        if job is None:
+            return jsonify({'message': 'Traitement non trouvé'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ------------------------------------- FIN API ---------------------------------------------------
 
+# ----------------------------------------------------------------------------------------
+# Fabrique et service en production (wsgi.py, gunicorn.conf.py)
+# ----------------------------------------------------------------------------------------
+
+def configure_services():
+    # Services construits à partir de la configuration ; rappelé par create_app après surcharge
+    global token_signer, reference_cache, user_cache, roster_indexes
+    # Sans clé (import seul, hors create_app) : aucun jeton n'est émis ni accepté
+    token_signer = TokenSigner(app.secret_key, app.config['AUTH_TOKEN_TTL']) if app.secret_key else None
+    reference_cache = ReferenceCache(
+        ttl=app.config['REFERENCE_CACHE_TTL'],
+        max_entries=app.config['REFERENCE_CACHE_MAX_ENTRIES']
+    )
+    user_cache = ReferenceCache(
+        ttl=app.config['USER_CACHE_TTL'],
+        max_entries=app.config['USER_CACHE_MAX_ENTRIES']
+    )
+    roster_indexes = RosterIndexCache(
+        load_roster,
+        ttl=app.config['ROSTER_INDEX_TTL'],
+        max_distance=app.config['ROSTER_MAX_DISTANCE']
+    )
+
+configure_services()
+
+def create_app(config=None):
+    # config : dict, objet de configuration ou chemin d'un fichier Python (SECRET_KEY,
+    # MYSQL_HOST, MYSQL_PASSWORD, MYSQL_POOL_SIZE, ...). Les routes sont déclarées sur
+    # l'application du module : une seule application par processus.
+    if isinstance(config, str):
+        app.config.from_pyfile(config)
+    elif isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+    if not app.secret_key or app.secret_key in INSECURE_SECRET_KEYS:
+        raise RuntimeError(
+            'SECRET_KEY manquante ou publique : la définir dans NOTEFINDER_CONFIG ou '
+            'NOTEFINDER_SECRET_KEY (par exemple python -c "import secrets; print(secrets.token_hex(32))")'
+        )
+    configure_services()
+    return app
+
+def reset_after_fork():
+    # Dans chaque worker préforké (preload) : pool de connexions, threads de recalcul des
+    # moyennes et des traitements OCR sont propres au processus et recréés à la demande.
+    # Les sockets et threads hérités du processus maître ne sont pas utilisables ici.
+    global _pool, _pool_lock, _moyenne_recomputer, _moyenne_lock, _ocr_job_manager, _ocr_job_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+    _moyenne_recomputer = None
+    _moyenne_lock = threading.Lock()
+    _ocr_job_manager = None
+    _ocr_job_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):  # absent sous Windows (pas de fork)
+    os.register_at_fork(after_in_child=reset_after_fork)
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Serveur de développement ; en production : gunicorn -c gunicorn.conf.py wsgi:app
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,45 @@
+# Jetons d'authentification signés, sans état (en-tête Authorization: Bearer <jeton>).
+#
+# Le jeton porte le type de compte (admin / etudiant), l'identifiant (id ou matricule), le
+# rôle et sa date d'émission, signés HMAC-SHA256 avec la clé secrète de l'application. La
+# vérification de la signature ne fait qu'un calcul, sans requête en base : n'importe quel
+# worker ou serveur partageant la clé peut la faire. Dans app.py, un jeton administrateur
+# est ensuite rattaché au compte en base (load_user) ; un jeton étudiant n'ouvre que les
+# routes de son propre matricule (etudiant_or_admin_required). Un jeton ne se révoque pas :
+# sa durée de vie courte borne l'effet d'un changement côté étudiant.
+
+import hashlib
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+ADMIN = 'admin'
+ETUDIANT = 'etudiant'
+
+
+class TokenSigner:
+    def __init__(self, secret_key, max_age, salt='notefinder-auth'):
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(
+            secret_key, salt=salt, signer_kwargs={'digest_method': hashlib.sha256}
+        )
+
+    def issue(self, kind, subject, role, **claims):
+        return self._serializer.dumps({'type': kind, 'sub': subject, 'role': role, **claims})
+
+    def verify(self, token):
+        # Contenu du jeton, ou None s'il est falsifié, mal formé ou expiré
+        try:
+            claims = self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:  # SignatureExpired en hérite
+            return None
+        if not isinstance(claims, dict) or claims.get('type') not in (ADMIN, ETUDIANT):
+            return None
+        return claims
+
+
+def bearer_token(request):
+    header = request.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
@@ -0,0 +1,270 @@
+# Latence des routes critiques, dans le processus (client de test Flask) et sur une vraie
+# base MySQL/MariaDB remplie par bench/seed.py.
+#
+#   python bench/bench_endpoints.py --seed --scale 10k
+#   python bench/bench_endpoints.py --requests 500 --only notes_promotion,releve
+#   python bench/bench_endpoints.py --compare bench/results/avant.json --max-regression 20
+#
+# Chaque route est mesurée dans un interpréteur neuf : le pic de mémoire (RSS) rapporté est
+# donc celui de la route seule. Pour chacune : latence p50 / p95 / p99, requêtes SQL par appel
+# (comptées sur les connexions du pool) et taille de la réponse. Le rapport est écrit en JSON
+# dans bench/results/ ; --compare affiche l'écart avec un rapport précédent et, avec
+# --max-regression, échoue (code 1) si un p95 se dégrade de plus du pourcentage donné ou si
+# le nombre de requêtes SQL augmente.
+#
+# Les connexions administrateur vérifient un hash bcrypt : elles sont lentes par conception.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from seed import (BENCH_ADMIN_EMAIL, BENCH_ADMIN_PASSWORD, DEFAULT_DATABASE, ETUDIANT_CODE, SCALES,
+                  open_bench_app, parse_scale, seed)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Nom -> (méthode, chemin, corps JSON) à partir d'une promotion notée de la base
+ENDPOINTS = {
+    'notes_promotion': lambda s: (
+        'GET',
+        f"/api/notes?ecue_id={s['ecue_id']}&annee_etude_id={s['annee_etude_id']}"
+        f"&annee_academique_id={s['annee_academique_id']}&semestre={s['semestre']}",
+        None
+    ),
+    'parcours_liste': lambda s: ('GET', '/api/parcours_etudiant', None),
+    'parcours_page': lambda s: ('GET', '/api/parcours_etudiant?limit=50', None),
+    'releve': lambda s: ('GET', f"/api/etudiants/{s['matricule']}/releve", None),
+    'login_admin': lambda s: ('POST', '/api/login', {'email': BENCH_ADMIN_EMAIL, 'password': BENCH_ADMIN_PASSWORD}),
+    'login_etudiant': lambda s: ('POST', '/api/etudiants/login', {'matricule': s['matricule'], 'code': ETUDIANT_CODE}),
+}
+# Routes appelées avec le jeton de l'étudiant de l'échantillon (etudiant_or_admin_required)
+STUDENT_TOKEN_ROUTES = {'releve'}
+
+
+class CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, *args, **kwargs):
+        self._counter[0] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._counter[0] += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    # Compte les execute() des curseurs ; les ping du pool ne passent pas par un curseur
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._conn.cursor(*args, **kwargs), self._counter)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentiles(values):
+    if len(values) < 2:
+        return {'p50': values[0], 'p95': values[0], 'p99': values[0]}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def load_sample(appmod):
+    from migrate import sample_parameters
+    conn = appmod.open_mysql_connection()
+    try:
+        cursor = conn.cursor()
+        annee_etude_id, annee_academique_id, semestre, matricule, ecue_id = sample_parameters(cursor)
+        cursor.execute("SELECT (SELECT COUNT(*) FROM etudiant), (SELECT COUNT(*) FROM note)")
+        etudiants, notes = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    sample = {'annee_etude_id': annee_etude_id, 'annee_academique_id': annee_academique_id,
+              'semestre': semestre, 'matricule': matricule, 'ecue_id': ecue_id}
+    return sample, {'etudiants': etudiants, 'notes': notes}
+
+
+def measure(name, database, requests, warmup):
+    # Exécuté dans le sous-processus d'une route
+    appmod = open_bench_app(database)
+    queries = [0]
+    open_connection = appmod.open_mysql_connection
+    appmod.open_mysql_connection = lambda: CountingConnection(open_connection(), queries)
+
+    sample, _ = load_sample(appmod)
+    method, path, body = ENDPOINTS[name](sample)
+    headers = {}
+    if name in STUDENT_TOKEN_ROUTES:
+        token = appmod.token_signer.issue(appmod.ETUDIANT, sample['matricule'], 'Etudiant')
+        headers['Authorization'] = f'Bearer {token}'
+    client = appmod.app.test_client()
+    rss_base = peak_rss_mb()
+
+    for _ in range(warmup):
+        client.open(path, method=method, json=body, headers=headers)
+
+    latencies, query_counts, errors = [], [], 0
+    size = 0
+    for _ in range(requests):
+        queries[0] = 0
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        size = len(response.get_data())
+        latencies.append((time.perf_counter() - start) * 1000)
+        query_counts.append(queries[0])
+        if response.status_code >= 400:
+            errors += 1
+
+    return {
+        'requete': f'{method} {path}',
+        'statut': response.status_code,
+        'erreurs': errors,
+        'latence_ms': {key: round(value, 2) for key, value in percentiles(latencies).items()},
+        'requetes_sql': {'moyenne': round(statistics.mean(query_counts), 2), 'max': max(query_counts)},
+        'reponse_octets': size,
+        'rss_depart_mb': rss_base,
+        'rss_pic_mb': peak_rss_mb(),
+    }
+
+
+def run_child(name, args):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--database', args.database,
+               '--requests', str(args.requests), '--warmup', str(args.warmup)]
+    completed = subprocess.run(command, cwd=os.path.dirname(BENCH_DIR), capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'echec': completed.stderr.strip().splitlines()[-1:] or ['code ' + str(completed.returncode)]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, report, max_regression):
+    # Écarts par route ; renvoie la liste des régressions au-delà du seuil
+    regressions = []
+    for name, current in report['endpoints'].items():
+        before = previous.get('endpoints', {}).get(name)
+        if not before or 'latence_ms' not in before or 'latence_ms' not in current:
+            continue
+        p95_before, p95_now = before['latence_ms']['p95'], current['latence_ms']['p95']
+        change = (p95_now - p95_before) / p95_before * 100 if p95_before else 0.0
+        sql_before, sql_now = before['requetes_sql']['moyenne'], current['requetes_sql']['moyenne']
+        print(f"{name:18} p95 {p95_before:9.2f} -> {p95_now:9.2f} ms ({change:+.0f} %)"
+              f"   SQL {sql_before:g} -> {sql_now:g}")
+        if max_regression is not None and change > max_regression:
+            regressions.append(f'{name} : p95 {change:+.0f} %')
+        if max_regression is not None and sql_now > sql_before:
+            regressions.append(f'{name} : {sql_before:g} -> {sql_now:g} requêtes SQL')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des routes sur une base de test')
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    parser.add_argument('--seed', action='store_true', help='recharge la base avant la mesure (bench/seed.py)')
+    parser.add_argument('--scale', type=parse_scale, default=SCALES['1k'], help="avec --seed : 1k, 10k, 100k ou un nombre d'étudiants")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--only', help='routes à mesurer, séparées par des virgules')
+    parser.add_argument('--output', help='fichier JSON du rapport (par défaut dans bench/results/)')
+    parser.add_argument('--compare', help='rapport JSON précédent')
+    parser.add_argument('--max-regression', type=float, help='avec --compare : dégradation du p95 tolérée, en %%')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.requests < 1:
+        parser.error('--requests doit être au moins 1')
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.database, args.requests, args.warmup)))
+        return
+
+    names = args.only.split(',') if args.only else list(ENDPOINTS)
+    unknown = [name for name in names if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"route inconnue : {', '.join(unknown)} (disponibles : {', '.join(ENDPOINTS)})")
+
+    appmod = open_bench_app(args.database)
+    if args.seed:
+        conn = appmod.open_mysql_connection(allow_local_infile=True)
+        try:
+            password_hash = appmod.bcrypt.generate_password_hash(BENCH_ADMIN_PASSWORD).decode('utf-8')
+            seed(conn, args.scale, password_hash)
+        finally:
+            conn.close()
+    _, dataset = load_sample(appmod)
+
+    report = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'database': args.database,
+        'donnees': dataset,
+        'requests': args.requests,
+        'endpoints': {name: run_child(name, args) for name in names},
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"endpoints-{dataset['etudiants']}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f'Rapport : {output}', file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        regressions = compare(previous, report, args.max_regression)
+        if regressions:
+            print('\n'.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
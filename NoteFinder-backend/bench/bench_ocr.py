@@ -0,0 +1,122 @@
+# Mesure du coût de la reconnaissance avec et sans préparation des images.
+#
+#   python bench/bench_ocr.py uploads/*.png
+#   python bench/bench_ocr.py photo.jpg --set target_dpi=200 --set deskew=false --repeat 3
+#
+# Pour chaque image : temps de préparation, puis temps de reconnaissance complet sans
+# préparation, avec préparation, et avec préparation + découpage du tableau, avec le nombre
+# de lignes de notes reconnues (et l'exactitude si --truth est fourni : un fichier texte
+# "matricule note" par ligne).
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from ocr import DEFAULT_SETTINGS, ocr_images
+from ocr_preprocess import PREPROCESS_DEFAULTS, open_for_ocr, preprocess
+from ocr_table import TABLE_DEFAULTS
+
+
+def parse_value(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def load_truth(path):
+    truth = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                truth[parts[0]] = float(parts[-1].replace(',', '.'))
+    return truth
+
+
+def accuracy(rows, truth):
+    if not truth:
+        return None
+    found = {row['matricule']: row['note'] for row in rows}
+    correct = sum(1 for matricule, note in truth.items() if found.get(matricule) == note)
+    return correct / len(truth)
+
+
+def timed(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return result, statistics.median(durations)
+
+
+def run(path, options, repeat, truth, with_tesseract):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    def prepare():
+        return preprocess(open_for_ocr(Image.open(io.BytesIO(data)), options), options)
+
+    prepared, prepare_time = timed(prepare, repeat)
+    original = Image.open(io.BytesIO(data))
+    report = {
+        'image': os.path.basename(path),
+        'pixels_avant': original.size[0] * original.size[1],
+        'pixels_apres': prepared.size[0] * prepared.size[1],
+        'temps_preparation_s': round(prepare_time, 3),
+    }
+    if not with_tesseract:
+        return report
+
+    # Chemin réel (pool de processus, sans cache) avec et sans préparation / tableau
+    variants = {
+        'brut': {'preprocess': {**options, 'enabled': False}, 'table': {**TABLE_DEFAULTS, 'enabled': False}},
+        'preparation': {'preprocess': options, 'table': {**TABLE_DEFAULTS, 'enabled': False}},
+        'preparation_tableau': {'preprocess': options, 'table': TABLE_DEFAULTS},
+    }
+    # Démarrage du pool de processus hors mesure
+    ocr_images([(path, data)], {**DEFAULT_SETTINGS, **variants['brut']})
+    for name, overrides in variants.items():
+        settings = {**DEFAULT_SETTINGS, **overrides}
+        (result,), duration = timed(lambda: ocr_images([(path, data)], settings), repeat)
+        report[f'{name}_s'] = round(duration, 3)
+        report[f'{name}_lignes'] = len(result['rows'])
+        report[f'{name}_erreur'] = result['error']
+        if truth:
+            report[f'{name}_exactitude'] = accuracy(result['rows'], truth)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('images', nargs='+')
+    parser.add_argument('--set', action='append', default=[], metavar='CLE=VALEUR',
+                        help='surcharge un réglage de PREPROCESS_DEFAULTS')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--truth', help='fichier "matricule note" attendu')
+    parser.add_argument('--no-tesseract', action='store_true', help='ne mesurer que la préparation')
+    args = parser.parse_args()
+
+    options = dict(PREPROCESS_DEFAULTS)
+    for item in args.set:
+        key, _, raw = item.partition('=')
+        if key not in options:
+            parser.error(f'réglage inconnu : {key}')
+        options[key] = parse_value(raw)
+
+    truth = load_truth(args.truth) if args.truth else None
+    reports = [run(path, options, args.repeat, truth, not args.no_tesseract) for path in args.images]
+    print(json.dumps({'options': options, 'resultats': reports}, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
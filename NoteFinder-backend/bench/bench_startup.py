@@ -0,0 +1,87 @@
+# Budget de démarrage d'un worker : import de app.py et première requête, dans des
+# interpréteurs neufs (démarrage à froid, comme un worker préforké ou une session de tests).
+#
+#   python bench/bench_startup.py
+#   python bench/bench_startup.py --repeat 10 --budget-ms 500 --no-swagger
+#
+# Le script échoue (code 1) si la médiane dépasse le budget, si un module lourd (PIL,
+# pytesseract, numpy, mysql.connector) est chargé à l'import ou si une connexion à la base
+# est ouverte avant la première requête qui en a besoin.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('PIL', 'pytesseract', 'numpy', 'mysql.connector')
+
+# Exécuté dans chaque interpréteur neuf
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+# Route inexistante : mesure l'initialisation de la première requête sans toucher la base
+app.app.test_client().get('/__demarrage__')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'premiere_requete_ms': (served - imported) * 1000,
+    'modules_lourds': [name for name in %r if name in sys.modules],
+    'pool_ouvert': app._pool is not None,
+}))
+""" % (HEAVY_MODULES,)
+
+
+def cold_start(swagger):
+    env = dict(os.environ, NOTEFINDER_SWAGGER='1' if swagger else '0')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=BACKEND, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000, help='médiane import + première requête')
+    parser.add_argument('--no-swagger', action='store_true', help='démarrage avec NOTEFINDER_SWAGGER=0')
+    args = parser.parse_args()
+
+    # Premier lancement hors mesure : compilation des .pyc
+    cold_start(not args.no_swagger)
+    runs = [cold_start(not args.no_swagger) for _ in range(args.repeat)]
+
+    total = statistics.median(run['import_ms'] + run['premiere_requete_ms'] for run in runs)
+    heavy = sorted({name for run in runs for name in run['modules_lourds']})
+    pool_opened = any(run['pool_ouvert'] for run in runs)
+    report = {
+        'swagger': not args.no_swagger,
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'premiere_requete_ms': round(statistics.median(run['premiere_requete_ms'] for run in runs), 1),
+        'total_ms': round(total, 1),
+        'budget_ms': args.budget_ms,
+        'modules_lourds': heavy,
+        'pool_ouvert': pool_opened,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failures = []
+    if total > args.budget_ms:
+        failures.append(f'démarrage {total:.0f} ms > budget {args.budget_ms:.0f} ms')
+    if heavy:
+        failures.append(f"modules lourds importés au démarrage : {', '.join(heavy)}")
+    if pool_opened:
+        failures.append('connexion à la base ouverte au démarrage')
+    if failures:
+        print('\n'.join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+# Jeu de données universitaire synthétique pour les tests de charge et les benchmarks, dans
+# une base dédiée (jamais la base de production : toutes les tables de données sont vidées
+# avant le chargement).
+#
+#   mysql -u root -e "CREATE DATABASE notefinder_bench"
+#   mysql -u root notefinder_bench < "entite (2).sql"
+#   NOTEFINDER_CONFIG=bench.cfg python migrate.py      # bench.cfg : MYSQL_DB = 'notefinder_bench'
+#   python bench/seed.py --scale 100k --annees 5 [--filieres 6] [--database notefinder_bench]
+#
+# Filières de licence et de master, UE / ECUE par semestre (30 crédits), années académiques
+# successives. Chaque étudiant entre en L1 (ou à un niveau quelconque la première année) et
+# avance d'année en année selon ses résultats : admis, enjambement ou redoublement, abandon
+# après deux redoublements, poursuite en master pour une partie des licenciés. Notes par
+# ECUE et moyennes d'UE cohérentes avec moyennes.py.
+#
+# Chargement par LOAD DATA LOCAL INFILE (fichiers TSV générés au fil de l'eau, quelques
+# minutes pour plusieurs millions de notes) ; si le serveur ou le client le refuse
+# (local_infile désactivé), repli sur des INSERT multi-lignes par paquets. Contraintes
+# désactivées pendant le chargement.
+
+import argparse
+import datetime
+import json
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+import unicodedata
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moyennes import compute_moyenne
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+DEFAULT_DATABASE = 'notefinder_bench'
+DEFAULT_ANNEES = 4
+
+# Compte administrateur utilisé par les benchmarks de connexion
+BENCH_ADMIN_EMAIL = 'bench@notefinder.local'
+BENCH_ADMIN_PASSWORD = 'bench'
+# Code de connexion des étudiants (valeur par défaut de la colonne etudiant.code)
+ETUDIANT_CODE = 12345
+
+CHUNK = 5000
+
+# Tables vidées avant le chargement (grade, enseignant et les comptes sont conservés)
+DATA_TABLES = (
+    'note', 'moyenne_ue', 'parcours_etudiant', 'etudiant', 'ecue', 'ue',
+    'annee_etude', 'filiere', 'annee_academique', 'ocr_job'
+)
+
+# (code, nom, mention, domaine, poids dans les inscriptions)
+FILIERES = (
+    ('GL', 'Génie Logiciel', 'Informatique', 'Science et Technologie', 5),
+    ('SI', 'Sécurité Informatique', 'Informatique', 'Science et Technologie', 3),
+    ('IM', 'Internet et Multimédia', 'Informatique', 'Science et Technologie', 3),
+    ('RT', 'Réseaux et Télécommunications', 'Informatique', 'Science et Technologie', 2),
+    ('GE', 'Génie Électrique', 'Électrotechnique', 'Science et Technologie', 2),
+    ('FC', 'Finance et Comptabilité', 'Gestion', 'Sciences Économiques et de Gestion', 4),
+)
+# Étapes du cursus : (grade_id du dump, libellé, niveau)
+CURSUS = ((1, 'Licence', 1), (1, 'Licence', 2), (1, 'Licence', 3), (2, 'Master', 1), (2, 'Master', 2))
+FIN_LICENCE = 3
+UE_PAR_SEMESTRE = (4, 6)
+ECUE_PAR_UE = (1, 3)
+CREDITS_SEMESTRE = 30
+MATIERES = (
+    'Mathématiques', 'Algorithmique', 'Programmation', 'Bases de données', 'Réseaux', 'Systèmes',
+    'Anglais', 'Communication', 'Statistiques', 'Physique', 'Économie', 'Droit',
+    'Gestion de projet', 'Architecture des ordinateurs', 'Électronique', 'Comptabilité'
+)
+
+# Progression : moyenne annuelle >= 10 admis ; entre 9 et 10, enjambement une fois sur trois ;
+# sinon redoublement (deux au plus, puis abandon)
+SEUIL_ENJAMBEMENT = 9
+PROBA_ENJAMBEMENT = 1 / 3
+REDOUBLEMENTS_MAX = 2
+POURSUITE_MASTER = 0.6
+ABSENCE = 0.02
+
+NOMS = ('KOUASSI', 'DIARRA', 'FOFANA', 'TRAORE', 'KONE', 'MALIK', 'SISSE', 'DAOUDA', 'HOUNKPE', 'AGBO',
+        'ADJOVI', 'SOGLO', 'BAMBA', 'OUATTARA', 'DOSSOU', 'AHOUANSOU', 'YAO', 'ZINSOU', 'CAMARA', 'TOURE')
+PRENOMS = (('Jean', 'M'), ('Nicolas', 'M'), ('François', 'M'), ('Kader', 'M'), ('Ibrahim', 'M'),
+           ('Moussa', 'M'), ('Serge', 'M'), ('Rodrigue', 'M'), ('Chloé', 'F'), ('Léa', 'F'),
+           ('Sarah', 'F'), ('Mariama', 'F'), ('Aïcha', 'F'), ('Fatou', 'F'), ('Grâce', 'F'), ('Nadège', 'F'))
+
+# Erreurs MySQL quand LOAD DATA LOCAL est refusé par le serveur ou le client
+LOCAL_INFILE_ERRORS = (1148, 2068, 3948, 3950)
+
+
+def parse_scale(value):
+    # "10k" ou un nombre d'étudiants
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"échelle inconnue : {value} ({', '.join(SCALES)} ou un entier)")
+    if count < 1:
+        raise argparse.ArgumentTypeError("au moins un étudiant")
+    return count
+
+
+def open_bench_app(database):
+    # Application configurée comme wsgi.py, mais sur la base de benchmark. Sans clé fournie,
+    # une clé aléatoire (héritée par les sous-processus du benchmark) : jetons jetables.
+    os.environ.setdefault('NOTEFINDER_SECRET_KEY', secrets.token_hex(32))
+    import app as appmod
+    appmod.create_app(os.environ.get('NOTEFINDER_CONFIG'))
+    appmod.app.config['MYSQL_DB'] = database
+    return appmod
+
+
+# ----------------------------------------------------------------------------------------
+# Écriture des lignes : INSERT multi-lignes ou fichiers TSV pour LOAD DATA
+# ----------------------------------------------------------------------------------------
+
+class InsertSink:
+    def __init__(self, cursor, table, columns):
+        self._cursor = cursor
+        # executemany réécrit l'INSERT en une instruction multi-lignes par paquet
+        self._sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        self._rows = []
+        self.count = 0
+
+    def add(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= CHUNK:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._cursor.executemany(self._sql, self._rows)
+            self.count += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        return self.count
+
+
+def _tsv(value):
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+class LoadDataSink:
+    def __init__(self, cursor, table, columns, directory):
+        self._cursor = cursor
+        self._table = table
+        self._columns = columns
+        self._path = os.path.join(directory, f'{table}.tsv')
+        self._file = open(self._path, 'w', encoding='utf-8', newline='\n')
+        self.count = 0
+
+    def add(self, row):
+        self._file.write('\t'.join(_tsv(value) for value in row) + '\n')
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+        # Séparateurs par défaut de LOAD DATA : tabulation, saut de ligne, échappement par \
+        self._cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {self._table} CHARACTER SET utf8mb4 ({', '.join(self._columns)})",
+            (self._path,)
+        )
+        os.remove(self._path)
+        return self.count
+
+
+def local_infile_available(cursor, directory):
+    # Essai sur un fichier vide : le refus ne dépend que de la configuration
+    probe = LoadDataSink(cursor, 'annee_academique', ('id', 'annee'), directory)
+    try:
+        probe.close()
+    except Exception as e:
+        if getattr(e, 'errno', None) in LOCAL_INFILE_ERRORS:
+            return False
+        raise
+    return True
+
+
+# ----------------------------------------------------------------------------------------
+# Génération
+# ----------------------------------------------------------------------------------------
+
+def ascii_only(text):
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def academic_years(count, today=None):
+    # Les `count` dernières années académiques (rentrée en septembre), la plus ancienne d'abord
+    today = today or datetime.date.today()
+    last = today.year if today.month >= 9 else today.year - 1
+    return [f'{year}-{year + 1}' for year in range(last - count + 1, last + 1)]
+
+
+def split_credits(count):
+    base, extra = divmod(CREDITS_SEMESTRE, count)
+    return [base + (1 if rank < extra else 0) for rank in range(count)]
+
+
+def build_offre(rng, filieres, sinks):
+    # Filières, années d'étude, UE et ECUE. Renvoie, par année d'étude, les semestres avec
+    # leurs UE : {annee_etude_id: [(semestre, [(ue_id, credit, [(ecue_id, difficulte)])])]}
+    offre = {}
+    ue_id = ecue_id = 0
+    for filiere_index, (code, nom, mention, domaine, _) in enumerate(FILIERES[:filieres]):
+        filiere_id = filiere_index + 1
+        sinks['filiere'].add((filiere_id, code, nom, mention, domaine))
+        for stage, (grade_id, libelle, niveau) in enumerate(CURSUS):
+            annee_etude_id = filiere_index * len(CURSUS) + stage + 1
+            sinks['annee_etude'].add((annee_etude_id, f'{code}_{libelle}_{niveau}', niveau, filiere_id, grade_id))
+            semestres = []
+            # Semestres numérotés dans le grade : le niveau n couvre les semestres 2n-1 et 2n
+            for semestre in (2 * niveau - 1, 2 * niveau):
+                ues = []
+                credits = split_credits(rng.randint(*UE_PAR_SEMESTRE))
+                matieres = rng.sample(MATIERES, len(credits))
+                for rang, (credit, matiere) in enumerate(zip(credits, matieres), start=1):
+                    ue_id += 1
+                    ue_code = f'{code}-{libelle[0]}{semestre}{rang:02d}'
+                    sinks['ue'].add((ue_id, ue_code, matiere, annee_etude_id, credit, semestre))
+                    ecues = []
+                    for partie in range(1, rng.randint(*ECUE_PAR_UE) + 1):
+                        ecue_id += 1
+                        sinks['ecue'].add((ecue_id, f'{ue_code}-{partie}', f'{matiere} {partie}', ue_id))
+                        ecues.append((ecue_id, rng.gauss(0, 1.5)))
+                    ues.append((ue_id, credit, ecues))
+                semestres.append((semestre, ues))
+            offre[annee_etude_id] = semestres
+    return offre
+
+
+def generate_students(rng, etudiants, annees, filieres, offre, sinks):
+    weights = [filiere[4] for filiere in FILIERES[:filieres]]
+    parcours_id = 0
+    for index in range(etudiants):
+        matricule = str(20000000 + index)
+        nom = rng.choice(NOMS)
+        prenom, sexe = rng.choice(PRENOMS)
+        naissance = datetime.date(1996, 1, 1) + datetime.timedelta(days=rng.randrange(3650))
+        sinks['etudiant'].add((matricule, nom, prenom, naissance, sexe,
+                               ascii_only(f'{prenom}.{nom}.{index}@etu.bench.local').lower(), ETUDIANT_CODE))
+
+        filiere_index = rng.choices(range(filieres), weights)[0]
+        # Nouvelles promotions chaque année ; la première année, des étudiants à tous les niveaux
+        annee = rng.randrange(annees)
+        stage = rng.randrange(len(CURSUS)) if annee == 0 else 0
+        aptitude = rng.gauss(11, 2.5)
+        redoublements = 0
+
+        while annee < annees:
+            annee_academique_id = annee + 1
+            annee_etude_id = filiere_index * len(CURSUS) + stage + 1
+            rows, notes_by_ue, credits = [], {}, {}
+            for semestre, ues in offre[annee_etude_id]:
+                parcours_id += 1
+                rows.append((parcours_id, semestre))
+                for ue_id, credit, ecues in ues:
+                    credits[ue_id] = credit
+                    for ecue_id, difficulte in ecues:
+                        if rng.random() < ABSENCE:
+                            continue
+                        # Quarts de point, comme sur les feuilles de notes
+                        note = min(20.0, max(0.0, round((aptitude - difficulte + rng.gauss(0, 3)) * 4) / 4))
+                        sinks['note'].add((ecue_id, parcours_id, note))
+                        notes_by_ue.setdefault(ue_id, []).append(Decimal(note))
+
+            moyennes = {}
+            for ue_id, notes in notes_by_ue.items():
+                moyenne, verdict = compute_moyenne(sum(notes) / len(notes))
+                moyennes[ue_id] = moyenne
+                sinks['moyenne_ue'].add((matricule, ue_id, annee_academique_id, moyenne, verdict))
+            total = sum(credits[ue_id] for ue_id in moyennes)
+            moyenne_annuelle = sum(moyennes[ue_id] * credits[ue_id] for ue_id in moyennes) / total if total else 0
+
+            if moyenne_annuelle >= 10:
+                decision = 'Admis'
+            elif moyenne_annuelle >= SEUIL_ENJAMBEMENT and rng.random() < PROBA_ENJAMBEMENT:
+                decision = 'Enjambement'
+            else:
+                decision = 'Redoublant'
+            for row_id, semestre in rows:
+                sinks['parcours_etudiant'].add((row_id, matricule, annee_etude_id, annee_academique_id, decision, semestre))
+
+            annee += 1
+            if decision == 'Redoublant':
+                redoublements += 1
+                aptitude += 0.5
+                if redoublements > REDOUBLEMENTS_MAX:
+                    break
+            else:
+                stage += 1
+                if stage == len(CURSUS) or (stage == FIN_LICENCE and rng.random() > POURSUITE_MASTER):
+                    break
+
+
+COLUMNS = {
+    'annee_academique': ('id', 'annee'),
+    'filiere': ('id', 'code', 'nom', 'mention', 'domaine'),
+    'annee_etude': ('id', 'code', 'niveau', 'filiere_id', 'grade_id'),
+    'ue': ('id', 'code', 'nom', 'annee_etude_id', 'credit', 'semestre'),
+    'ecue': ('id', 'code', 'nom', 'ue_id'),
+    'etudiant': ('matricule', 'nom', 'prenom', 'date_naissance', 'sexe', 'email', 'code'),
+    'parcours_etudiant': ('id', 'etudiant_matricule', 'annee_etude_id', 'annee_academique_id', 'decision', 'semestre'),
+    'note': ('ecue_id', 'parcours_etudiant_id', 'note'),
+    'moyenne_ue': ('etudiant_matricule', 'ue_id', 'annee_academique_id', 'moyenne', 'verdict'),
+}
+
+
+def seed(conn, etudiants, password_hash, annees=DEFAULT_ANNEES, filieres=len(FILIERES), random_seed=0,
+         load_data=True):
+    # Vide la base puis la remplit ; renvoie le nombre de lignes par table et le mode utilisé
+    rng = random.Random(random_seed)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET foreign_key_checks = 0")
+        cursor.execute("SET unique_checks = 0")
+        for table in DATA_TABLES:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        cursor.execute("DELETE FROM membre_administratif WHERE email = %s", (BENCH_ADMIN_EMAIL,))
+
+        with tempfile.TemporaryDirectory(prefix='notefinder-seed-') as directory:
+            load_data = load_data and local_infile_available(cursor, directory)
+            if load_data:
+                sinks = {table: LoadDataSink(cursor, table, columns, directory) for table, columns in COLUMNS.items()}
+            else:
+                sinks = {table: InsertSink(cursor, table, columns) for table, columns in COLUMNS.items()}
+
+            for annee_academique_id, annee in enumerate(academic_years(annees), start=1):
+                sinks['annee_academique'].add((annee_academique_id, annee))
+            offre = build_offre(rng, filieres, sinks)
+            generate_students(rng, etudiants, annees, filieres, offre, sinks)
+            counts = {table: sink.close() for table, sink in sinks.items()}
+
+        cursor.execute(
+            "INSERT INTO membre_administratif (nom, prenom, email, mot_de_passe, role) VALUES (%s, %s, %s, %s, %s)",
+            ('BENCH', 'Admin', BENCH_ADMIN_EMAIL, password_hash, 'Admin')
+        )
+        # Écriture hors de l'application : les ETag déjà émis sont périmés (migration 0004)
+        cursor.execute("UPDATE table_version SET version = version + 1")
+        conn.commit()
+    finally:
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.execute("SET unique_checks = 1")
+        cursor.close()
+    return {'mode': 'load_data' if load_data else 'insert', 'lignes': counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Jeu de données universitaire synthétique')
+    parser.add_argument('--scale', type=parse_scale, default=SCALES['1k'], help="1k, 10k, 100k, 1m ou un nombre d'étudiants")
+    parser.add_argument('--annees', type=int, default=DEFAULT_ANNEES, help='nombre d\'années académiques')
+    parser.add_argument('--filieres', type=int, default=len(FILIERES), choices=range(1, len(FILIERES) + 1))
+    parser.add_argument('--database', default=DEFAULT_DATABASE)
+    parser.add_argument('--insert', action='store_true', help='INSERT multi-lignes au lieu de LOAD DATA')
+    parser.add_argument('--random-seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.annees < 1:
+        parser.error('--annees doit être au moins 1')
+
+    appmod = open_bench_app(args.database)
+    conn = appmod.open_mysql_connection(allow_local_infile=not args.insert)
+    start = time.perf_counter()
+    try:
+        password_hash = appmod.bcrypt.generate_password_hash(BENCH_ADMIN_PASSWORD).decode('utf-8')
+        result = seed(conn, args.scale, password_hash, annees=args.annees, filieres=args.filieres,
+                      random_seed=args.random_seed, load_data=not args.insert)
+    finally:
+        conn.close()
+    print(json.dumps(dict(
+        {'database': args.database, 'etudiants': args.scale, 'annees': args.annees},
+        **result, duree_s=round(time.perf_counter() - start, 1)
+    ), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Compression des réponses (brotli ou gzip) au-delà d'une taille minimale.
+#
+# Les listes JSON (notes, parcours...) se compressent d'un facteur 10 environ : sur une
+# connexion mobile, c'est l'essentiel du temps de chargement. brotli est optionnel ; sans
+# lui, seul gzip est proposé.
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain'}
+
+
+def choose_encoding(accept_encoding):
+    # Encodage retenu d'après Accept-Encoding (qualités comprises), brotli de préférence
+    if brotli is not None and accept_encoding['br'] > 0:
+        return 'br'
+    if accept_encoding['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, min_size, gzip_level=6, brotli_quality=4):
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(data, quality=brotli_quality, mode=brotli.MODE_TEXT)
+    else:
+        body = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # Le corps envoyé n'est plus celui de l'ETag fort : ETag faible (même représentation)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    @app.after_request
+    def compress(response):
+        return compress_response(
+            response,
+            app.config['COMPRESS_MIN_SIZE'],
+            gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+            brotli_quality=app.config['COMPRESS_BROTLI_QUALITY']
+        )
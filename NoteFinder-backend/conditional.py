@@ -0,0 +1,75 @@
+# GET conditionnels : ETag / If-None-Match.
+#
+# Avant d'exécuter la vraie requête, la route calcule un validateur peu coûteux : les versions
+# des tables lues (table_version, voir migrations/0004_table_version.sql), incrémentées une
+# fois par transaction d'écriture, juste avant le commit (bump_table_versions). Si le client
+# présente déjà l'ETag correspondant, il reçoit un 304 sans corps : ni SELECT complet, ni
+# sérialisation.
+
+import functools
+import hashlib
+
+from flask import Response, make_response, request
+
+
+def tables_validator_query(tables):
+    # Une seule lecture par clé primaire pour toutes les tables : une ligne (nom, version) par table.
+    # MAX(updated_at) / COUNT(*) ne suffisaient pas : résolution d'une seconde, et une suppression
+    # suivie d'une insertion pouvait laisser les deux inchangés.
+    names = ', '.join(f"'{table}'" for table in sorted(tables))
+    return f"SELECT nom, version FROM table_version WHERE nom IN ({names}) ORDER BY nom"
+
+
+def bump_table_versions(conn, *tables):
+    # Dans la transaction d'écriture, juste avant le commit : une mise à jour par transaction
+    # (et non par ligne écrite), le verrou sur les lignes de table_version ne dure que le
+    # commit. Curseur à part : lastrowid / rowcount du curseur de la route restent intacts.
+    names = ', '.join(f"'{table}'" for table in sorted(tables))
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"UPDATE table_version SET version = version + 1 WHERE nom IN ({names})")
+    finally:
+        cursor.close()
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional_get(load_validator):
+    # load_validator(**view_args) -> valeur qui change avec les données servies,
+    # ou None pour laisser la route répondre sans ETag (ressource absente par exemple)
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                validator = load_validator(**kwargs)
+            except Exception:
+                # Validateur indisponible : la route répond normalement (et gère ses erreurs)
+                validator = None
+            if validator is None:
+                return view(*args, **kwargs)
+
+            # Le chemin et les paramètres (filtres, pagination) font partie de l'ETag. Le
+            # validateur est lu avant les données : une écriture entre les deux donne au pire
+            # un ETag déjà périmé, donc une nouvelle réponse complète au prochain appel.
+            etag = make_etag(request.full_path, validator)
+            # Comparaison faible : l'ETag devient faible quand la réponse est compressée
+            if request.if_none_match.contains_weak(etag):
+                return _not_modified(etag)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                # Le navigateur garde la réponse mais la revalide à chaque fois
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
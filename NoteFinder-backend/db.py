@@ -0,0 +1,185 @@
+# Pool de connexions MySQL partagé par les routes de app.py.
+#
+# Chaque requête emprunte une connexion au pool (voir get_db_connection dans app.py)
+# et la rend à la fin de la requête : plusieurs threads/workers peuvent ainsi
+# exécuter leurs requêtes SQL en parallèle au lieu de se partager un seul socket.
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Aucune connexion n'est devenue disponible avant l'expiration du délai."""
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=10, acquire_timeout=5.0, ping_interval=30.0, max_lifetime=3600.0):
+        # connect : fonction sans argument qui ouvre une nouvelle connexion
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.ping_interval = ping_interval
+        self.max_lifetime = max_lifetime
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connexion, date de création, dernière utilisation)
+        self._born = {}  # id(connexion) -> date de création
+        self._size = 0
+        self._pid = os.getpid()
+        self._counters = {
+            'acquired': 0,
+            'created': 0,
+            'discarded': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'ping_failures': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Emprunt / restitution
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        waited = False
+        with self._cond:
+            self._check_fork()
+            while True:
+                if self._idle:
+                    conn, born, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # On réserve la place avant d'ouvrir la connexion hors du verrou
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"Pool de connexions saturé ({self.max_size} connexions utilisées depuis {timeout}s)"
+                    )
+                if not waited:
+                    self._counters['waits'] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+        if conn is None:
+            return self._open()
+
+        now = time.monotonic()
+        expired = self.max_lifetime and now - born > self.max_lifetime
+        if expired or (now - last_used > self.ping_interval and not self._ping(conn)):
+            # On garde la place réservée et on la remplit avec une connexion neuve
+            self._close_quietly(conn)
+            return self._open()
+
+        with self._cond:
+            self._counters['acquired'] += 1
+        return conn
+
+    def release(self, conn):
+        if os.getpid() != self._pid:
+            return
+        try:
+            if getattr(conn, 'unread_result', False):
+                conn.consume_results()
+            # Ne jamais rendre une transaction ouverte (ni un snapshot périmé) au pool
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            born = self._born.get(id(conn), time.monotonic())
+            self._idle.append((conn, born, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'acquire_timeout': self.acquire_timeout,
+                **self._counters,
+            }
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self._counters['created'] += 1
+            self._counters['acquired'] += 1
+        return conn
+
+    def _ping(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._counters['ping_failures'] += 1
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._born.pop(id(conn), None)
+            self._counters['discarded'] += 1
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _check_fork(self):
+        # Après un fork, les sockets hérités appartiennent au processus parent :
+        # on les oublie sans les fermer et on repart d'un pool vide.
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._idle.clear()
+            self._born.clear()
+            self._size = 0
+
+
+class RequestConnection:
+    # Connexion empruntée pour la durée d'une requête Flask. close() ne ferme rien :
+    # la connexion est rendue au pool par le teardown de l'application.
+
+    def __init__(self, conn):
+        self.raw = conn
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
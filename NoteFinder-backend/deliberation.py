@@ -0,0 +1,249 @@
+# Délibération de fin d'année d'une promotion (annee_etude + annee_academique).
+#
+# Les notes de la promotion sont chargées une seule fois dans une matrice étudiants x ECUE,
+# puis toutes les règles (moyennes d'UE, moyennes de semestre pondérées par les crédits,
+# compensations, crédits acquis, décision) sont appliquées en opérations NumPy sur toute
+# la promotion. Les décisions sont écrites en une seule transaction. NumPy n'est importé
+# qu'au premier calcul : les règles et leur validation n'en ont pas besoin.
+
+from conditional import bump_table_versions
+
+DELIBERATION_DEFAULTS = {
+    'pass_mark': 10.0,  # moyenne de validation d'une UE, d'un semestre, de l'année
+    'ue_floor': 0.0,  # note éliminatoire : une UE sous ce seuil n'est jamais compensée
+    'semester_compensation': True,  # semestre >= pass_mark : toutes ses UEs sont acquises
+    'annual_compensation': True,  # moyenne annuelle >= pass_mark : toutes les UEs sont acquises
+    'missing_as_zero': False,  # ECUE sans note comptée 0 (sinon ignorée dans la moyenne de l'UE)
+    'enjambement_ratio': 0.75,  # part des crédits à acquérir pour passer en Enjambement
+}
+
+ADMIS = 'Admis'
+ENJAMBEMENT = 'Enjambement'
+REDOUBLANT = 'Redoublant'
+
+
+# Valeurs acceptées pour les règles booléennes (JSON ou chaîne de formulaire)
+TRUE_VALUES = {'true', '1', 'yes'}
+FALSE_VALUES = {'false', '0', 'no'}
+
+
+class DeliberationError(ValueError):
+    """Promotion ou règles de délibération invalides."""
+
+
+def parse_bool(value):
+    # bool(value) rendait "false" ou "0" vrais : tout ce qui n'est pas reconnu est refusé
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, str)):
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+    raise ValueError(value)
+
+
+def deliberation_rules(overrides=None):
+    overrides = overrides or {}
+    unknown = set(overrides) - set(DELIBERATION_DEFAULTS)
+    if unknown:
+        raise DeliberationError(f"Règle(s) inconnue(s) : {', '.join(sorted(unknown))}")
+    rules = dict(DELIBERATION_DEFAULTS)
+    for name, value in overrides.items():
+        expected = type(DELIBERATION_DEFAULTS[name])
+        try:
+            rules[name] = parse_bool(value) if expected is bool else expected(value)
+        except (TypeError, ValueError):
+            raise DeliberationError(f'Valeur invalide pour {name}')
+    if not 0 <= rules['enjambement_ratio'] <= 1:
+        raise DeliberationError('enjambement_ratio doit être compris entre 0 et 1')
+    return rules
+
+
+def load_cohort(conn, annee_etude_id, annee_academique_id):
+    # Trois requêtes : inscrits, maquette (UE/ECUE) et notes de la promotion
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT e.matricule, e.nom, e.prenom, pe.decision
+        FROM parcours_etudiant pe
+        JOIN etudiant e ON e.matricule = pe.etudiant_matricule
+        WHERE pe.annee_etude_id = %s AND pe.annee_academique_id = %s
+    """, (annee_etude_id, annee_academique_id))
+    students = {}
+    for matricule, nom, prenom, decision in cursor.fetchall():
+        student = students.setdefault(matricule, {'matricule': matricule, 'nom': nom, 'prenom': prenom, 'decisions': set()})
+        student['decisions'].add(decision)
+
+    cursor.execute("""
+        SELECT ue.id, ue.credit, ue.semestre, ecue.id
+        FROM ue
+        LEFT JOIN ecue ON ecue.ue_id = ue.id
+        WHERE ue.annee_etude_id = %s
+        ORDER BY ue.id
+    """, (annee_etude_id,))
+    maquette = cursor.fetchall()
+
+    cursor.execute("""
+        SELECT pe.etudiant_matricule, n.ecue_id, n.note
+        FROM parcours_etudiant pe
+        JOIN note n ON n.parcours_etudiant_id = pe.id
+        WHERE pe.annee_etude_id = %s AND pe.annee_academique_id = %s AND n.note IS NOT NULL
+    """, (annee_etude_id, annee_academique_id))
+    note_rows = cursor.fetchall()
+    cursor.close()
+
+    if not students:
+        raise DeliberationError('Aucun étudiant inscrit dans cette promotion')
+    ue_rows = {}
+    for ue_id, credit, semestre, _ in maquette:
+        ue_rows[ue_id] = (credit, semestre)
+    if not ue_rows or not sum(credit for credit, _ in ue_rows.values()):
+        raise DeliberationError('Aucune UE créditée pour cette année d\'étude')
+    return build_cohort(list(students.values()), maquette, note_rows)
+
+
+def build_cohort(students, maquette, note_rows):
+    # students : [{matricule, nom, prenom, decisions}], maquette : [(ue_id, credit, semestre, ecue_id)],
+    # note_rows : [(matricule, ecue_id, note)]
+    import numpy as np
+
+    students = sorted(students, key=lambda student: student['matricule'])
+    matricules = np.array([student['matricule'] for student in students])
+
+    ue_ids = sorted({row[0] for row in maquette})
+    ue_index = {ue_id: index for index, ue_id in enumerate(ue_ids)}
+    credits = np.zeros(len(ue_ids))
+    ue_semestres = np.zeros(len(ue_ids), dtype=int)
+    for ue_id, credit, semestre, _ in maquette:
+        credits[ue_index[ue_id]] = credit
+        ue_semestres[ue_index[ue_id]] = semestre
+
+    ecue_pairs = sorted((row[3], ue_index[row[0]]) for row in maquette if row[3] is not None)
+    ecue_ids = np.array([ecue_id for ecue_id, _ in ecue_pairs], dtype=np.int64)
+    ecue_ue = np.zeros((len(ecue_ids), len(ue_ids)))
+    ecue_ue[np.arange(len(ecue_ids)), [index for _, index in ecue_pairs]] = 1
+
+    # Matrice des notes : NaN = pas de note ; en cas de doublon, la meilleure note
+    notes = np.full((len(matricules), len(ecue_ids)), np.nan)
+    if note_rows and len(ecue_ids):
+        note_matricules = np.array([row[0] for row in note_rows])
+        note_ecues = np.array([row[1] for row in note_rows], dtype=np.int64)
+        values = np.array([row[2] for row in note_rows], dtype=float)
+        rows = np.clip(np.searchsorted(matricules, note_matricules), 0, len(matricules) - 1)
+        cols = np.clip(np.searchsorted(ecue_ids, note_ecues), 0, len(ecue_ids) - 1)
+        known = (matricules[rows] == note_matricules) & (ecue_ids[cols] == note_ecues)
+        np.fmax.at(notes, (rows[known], cols[known]), values[known])
+
+    return {
+        'students': students,
+        'notes': notes,
+        'ecue_ue': ecue_ue,
+        'credits': credits,
+        'ue_semestres': ue_semestres,
+    }
+
+
+def deliberate(cohort, rules):
+    import numpy as np
+
+    notes = cohort['notes']
+    ecue_ue = cohort['ecue_ue']
+    credits = cohort['credits']
+    pass_mark = rules['pass_mark']
+
+    # Moyennes d'UE : moyenne des ECUE de chaque UE (produit matriciel avec la maquette)
+    present = ~np.isnan(notes)
+    sums = np.where(present, notes, 0.0) @ ecue_ue
+    if rules['missing_as_zero']:
+        counts = np.broadcast_to(ecue_ue.sum(axis=0), sums.shape)
+    else:
+        counts = present.astype(float) @ ecue_ue
+    ue_averages = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    # Moyennes de semestre et annuelle pondérées par les crédits
+    semestres = np.unique(cohort['ue_semestres'])
+    in_semester = (cohort['ue_semestres'][:, None] == semestres[None, :]) * credits[:, None]
+    semester_credits = in_semester.sum(axis=0)
+    semester_averages = np.divide(
+        ue_averages @ in_semester, semester_credits,
+        out=np.zeros((len(notes), len(semestres))), where=semester_credits > 0
+    )
+    year_averages = ue_averages @ credits / credits.sum()
+
+    # UEs acquises : directement, puis par compensation (sauf sous la note éliminatoire)
+    acquired = ue_averages >= pass_mark
+    compensable = ue_averages >= rules['ue_floor']
+    if rules['semester_compensation']:
+        semester_of_ue = np.searchsorted(semestres, cohort['ue_semestres'])
+        acquired |= (semester_averages >= pass_mark)[:, semester_of_ue] & compensable
+    if rules['annual_compensation']:
+        acquired |= (year_averages >= pass_mark)[:, None] & compensable
+
+    earned = acquired.astype(float) @ credits
+    total = credits.sum()
+    decisions = np.where(
+        earned >= total, ADMIS,
+        np.where(earned >= rules['enjambement_ratio'] * total, ENJAMBEMENT, REDOUBLANT)
+    )
+    return {
+        'semestres': semestres,
+        'semester_averages': semester_averages,
+        'year_averages': year_averages,
+        'earned': earned,
+        'total': total,
+        'decisions': decisions,
+    }
+
+
+def build_report(cohort, result):
+    students = []
+    summary = {ADMIS: 0, ENJAMBEMENT: 0, REDOUBLANT: 0}
+    changed = 0
+    semestres = [int(semestre) for semestre in result['semestres']]
+    for index, student in enumerate(cohort['students']):
+        decision = str(result['decisions'][index])
+        summary[decision] += 1
+        is_changed = student['decisions'] != {decision}
+        changed += is_changed
+        students.append({
+            'matricule': student['matricule'],
+            'nom': student['nom'],
+            'prenom': student['prenom'],
+            'moyennes_semestre': {
+                str(semestre): round(float(value), 2)
+                for semestre, value in zip(semestres, result['semester_averages'][index])
+            },
+            'moyenne_annuelle': round(float(result['year_averages'][index]), 2),
+            'credits_acquis': int(result['earned'][index]),
+            'credits_total': int(result['total']),
+            'decision': decision,
+            'decision_actuelle': sorted(student['decisions']),
+            'modifiee': is_changed,
+        })
+    return {'effectif': len(students), 'resume': summary, 'modifications': changed, 'etudiants': students}
+
+
+def apply_decisions(conn, annee_etude_id, annee_academique_id, report):
+    # Une seule transaction pour toute la promotion ; seules les décisions modifiées sont écrites
+    values = [
+        (student['decision'], student['matricule'], annee_etude_id, annee_academique_id)
+        for student in report['etudiants'] if student['modifiee']
+    ]
+    if not values:
+        return 0
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(
+            """UPDATE parcours_etudiant SET decision = %s
+               WHERE etudiant_matricule = %s AND annee_etude_id = %s AND annee_academique_id = %s""",
+            values
+        )
+        bump_table_versions(conn, 'parcours_etudiant')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(values)
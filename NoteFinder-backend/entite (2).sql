@@ -870,6 +870,29 @@ ALTER TABLE `parcours_etudiant`
 --
 ALTER TABLE `ue`
   ADD CONSTRAINT `ue_ibfk_2` FOREIGN KEY (`annee_etude_id`) REFERENCES `annee_etude` (`id`);
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `ocr_job`
+-- (traitements OCR asynchrones, voir ocr_jobs.py)
+--
+
+CREATE TABLE `ocr_job` (
+  `id` char(32) NOT NULL,
+  `statut` enum('en_attente','en_cours','termine','echec') NOT NULL DEFAULT 'en_attente',
+  `total` int(11) NOT NULL,
+  `traites` int(11) NOT NULL DEFAULT 0,
+  `fichiers` text NOT NULL,
+  `resultats` longtext DEFAULT NULL,
+  `erreur` varchar(255) DEFAULT NULL,
+  `tentatives` int(11) NOT NULL DEFAULT 0,
+  `created_by` int(11) DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (`id`),
+  KEY `statut_updated_at` (`statut`,`updated_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
@@ -0,0 +1,36 @@
+# Profil de production : gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Plusieurs processus (un par cœur environ) avec plusieurs threads chacun : les requêtes
+# attendent MySQL en parallèle au lieu de se suivre dans le serveur de développement.
+# preload_app : app.py est importé une fois dans le maître puis partagé par fork ; chaque
+# worker recrée son pool de connexions et ses threads (reset_after_fork dans app.py).
+# Chaque valeur peut être surchargée par variable d'environnement.
+
+import multiprocessing
+import os
+
+bind = os.environ.get('NOTEFINDER_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('NOTEFINDER_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+# Threads par worker : garder MYSQL_POOL_SIZE >= threads pour ne pas attendre le pool
+threads = int(os.environ.get('NOTEFINDER_THREADS', 4))
+preload_app = os.environ.get('NOTEFINDER_PRELOAD', '1') != '0'
+
+# OCR : chaque worker a son propre pool de processus tesseract (OCR_WORKERS dans app.py, un
+# par cœur par défaut), soit (2n+1) x n processus sur n cœurs sous charge. On partage les
+# cœurs entre les workers : avec le profil par défaut, un processus tesseract par worker, soit
+# 2n+1 au plus. Lu par app.py à l'import, après ce fichier (les workers héritent de
+# l'environnement du maître).
+os.environ.setdefault('NOTEFINDER_OCR_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+# La reconnaissance OCR synchrone (/api/ocr/scan) peut dépasser les 30 s par défaut
+timeout = int(os.environ.get('NOTEFINDER_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recyclage périodique des workers (fuites mémoire de PIL / tesseract)
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,70 @@
+# Sérialisation JSON rapide (orjson) pour jsonify.
+#
+# Les valeurs produites sont celles du fournisseur par défaut de Flask : Decimal en chaîne
+# ("12.50"), dates au format HTTP ("Wed, 26 Mar 2025 06:40:42 GMT"), clés triées. Le
+# frontend n'a donc rien à changer. Le JSON est équivalent, pas identique octet pour octet :
+# les caractères non ASCII sont écrits tels quels en UTF-8 ("é" au lieu de "\u00e9"), NaN
+# et Infinity deviennent null, et l'indentation du mode debug de Flask n'est pas reprise.
+# Les ETag (conditional.py) dépendent des versions des tables et non du corps : une réponse
+# gardée par un client avant le changement reste valide, avec le même contenu décodé.
+# orjson est une dépendance optionnelle : sans lui, le fournisseur de Flask reste utilisé.
+
+import datetime
+import decimal
+import functools
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+@functools.lru_cache(maxsize=8192)
+def http_date(value):
+    # Identique à werkzeug.http.http_date, sans passer par email.utils ; les created_at /
+    # updated_at se répètent beaucoup d'une ligne à l'autre, d'où le cache
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        time_part = f'{value.hour:02d}:{value.minute:02d}:{value.second:02d}'
+    else:
+        time_part = '00:00:00'
+    return f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} {time_part} GMT'
+
+
+def _default(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, datetime.date):
+        return http_date(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return self.dump_bytes(obj).decode('utf-8')
+
+    def dump_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=self.options)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Comme DefaultJSONProvider.response, sans aller-retour str <-> bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    if orjson is not None and app.config.get('JSON_FAST', True):
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,177 @@
+# Migrations du schéma : scripts SQL numérotés de migrations/ (0001_nom.sql, 0002_nom.sql...)
+# appliqués dans l'ordre, une seule fois, au déploiement.
+#
+#   python migrate.py                # applique les migrations en attente
+#   python migrate.py --status       # versions appliquées / en attente, sans rien modifier
+#   python migrate.py --explain      # plans EXPLAIN des requêtes critiques avant / après
+#
+# Même configuration que wsgi.py (NOTEFINDER_CONFIG). Les versions appliquées sont gardées
+# dans la table schema_migration. Sous MySQL, chaque instruction DDL valide implicitement la
+# transaction : la version n'est enregistrée qu'une fois toutes les instructions passées, une
+# migration interrompue est donc à terminer à la main avant de relancer.
+
+import argparse
+import os
+import re
+import sys
+
+from app import NOTE_LIST, NOTES_PROMOTION_QUERY, RELEVE_QUERY, create_app, open_mysql_connection
+from conditional import tables_validator_query
+from pagination import build_query
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migration (
+        version int(11) NOT NULL PRIMARY KEY,
+        nom varchar(255) NOT NULL,
+        applied_at timestamp NOT NULL DEFAULT current_timestamp()
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+"""
+
+FILENAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+class MigrationError(Exception):
+    """Répertoire de migrations incohérent."""
+
+
+def discover(directory=MIGRATIONS_DIR):
+    # [(version, nom, chemin)] triés par version
+    migrations = {}
+    for filename in os.listdir(directory):
+        match = FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f'Version {version} en double : {filename} et {migrations[version][1]}')
+        migrations[version] = (version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql):
+    # Scripts simples (pas de procédures) : commentaires "--" retirés, découpage sur ";"
+    lines = [line for line in sql.splitlines() if not line.lstrip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def applied_versions(cursor):
+    cursor.execute(VERSION_TABLE)
+    cursor.execute("SELECT version FROM schema_migration")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migration(conn, migration):
+    version, name, path = migration
+    with open(path, encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    cursor = conn.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO schema_migration (version, nom) VALUES (%s, %s)", (version, name))
+        conn.commit()
+    finally:
+        cursor.close()
+    return len(statements)
+
+
+# ----------------------------------------------------------------------------------------
+# Plans d'exécution des requêtes critiques
+# ----------------------------------------------------------------------------------------
+
+def sample_parameters(cursor):
+    # Valeurs réelles d'une promotion notée, pour des plans représentatifs
+    cursor.execute("""
+        SELECT pe.annee_etude_id, pe.annee_academique_id, pe.semestre, pe.etudiant_matricule, n.ecue_id
+        FROM parcours_etudiant pe JOIN note n ON n.parcours_etudiant_id = pe.id
+        LIMIT 1
+    """)
+    row = cursor.fetchone()
+    return row or (1, 1, 1, '', 1)
+
+
+def hot_queries(cursor):
+    annee_etude_id, annee_academique_id, semestre, matricule, ecue_id = sample_parameters(cursor)
+    notes_by_date, notes_by_date_params, _ = build_query(NOTE_LIST, {'sort': '-updated_at'})
+    return [
+        ('notes d\'une promotion (GET /api/notes)', NOTES_PROMOTION_QUERY,
+         (ecue_id, annee_etude_id, annee_academique_id, semestre)),
+        ('relevé d\'un étudiant', RELEVE_QUERY, (matricule,)),
+        ('validateur ETag des notes', tables_validator_query(('note', 'parcours_etudiant')), ()),
+        ('notes les plus récentes (sort=-updated_at)', notes_by_date, notes_by_date_params),
+    ]
+
+
+def explain_all(cursor):
+    plans = []
+    for name, sql, params in hot_queries(cursor):
+        try:
+            cursor.execute('EXPLAIN ' + sql, params)
+        except Exception as e:
+            # Table créée par une migration en attente (table_version avant 0004 par exemple)
+            plans.append((name, str(e)))
+            continue
+        columns = [column[0] for column in cursor.description]
+        steps = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        plans.append((name, steps))
+    return plans
+
+
+def format_plan(steps):
+    if isinstance(steps, str):
+        return f'indisponible ({steps})'
+    return ' | '.join(
+        f"{step.get('table')} {step.get('type')} {step.get('key') or '-'} rows={step.get('rows')}"
+        + (f" ({step['Extra']})" if step.get('Extra') else '')
+        for step in steps
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrations du schéma NoteFinder')
+    parser.add_argument('--status', action='store_true', help='liste les migrations sans les appliquer')
+    parser.add_argument('--explain', action='store_true', help='plans EXPLAIN avant / après')
+    args = parser.parse_args()
+
+    create_app(os.environ.get('NOTEFINDER_CONFIG'))
+    migrations = discover()
+    conn = open_mysql_connection()
+    try:
+        cursor = conn.cursor()
+        applied = applied_versions(cursor)
+        conn.commit()
+        pending = [migration for migration in migrations if migration[0] not in applied]
+
+        if args.status:
+            for version, name, _ in migrations:
+                print(f"{version:04d} {name} : {'appliquée' if version in applied else 'en attente'}")
+            return
+
+        before = explain_all(cursor) if args.explain else None
+        cursor.close()
+
+        for migration in pending:
+            count = apply_migration(conn, migration)
+            print(f'{migration[0]:04d} {migration[1]} appliquée ({count} instructions)')
+        if not pending:
+            print('Schéma à jour')
+
+        if args.explain:
+            cursor = conn.cursor()
+            after = explain_all(cursor)
+            cursor.close()
+            for (name, steps_before), (_, steps_after) in zip(before, after):
+                print(f'\n== {name}')
+                print(f'  avant : {format_plan(steps_before)}')
+                print(f'  après : {format_plan(steps_after)}')
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except MigrationError as e:
+        sys.exit(str(e))
@@ -0,0 +1,20 @@
+-- Index composites des chemins d'accès les plus fréquents.
+-- Dans InnoDB, tout index secondaire contient aussi la clé primaire (id) : les index
+-- ci-dessous sont donc couvrants pour les requêtes indiquées.
+
+-- Inscrits d'une promotion (get_notes, délibération, rapprochement OCR) : filtre sur
+-- (annee_etude_id, annee_academique_id, semestre), etudiant_matricule pour la jointure avec etudiant
+ALTER TABLE `parcours_etudiant`
+  ADD KEY `promotion` (`annee_etude_id`, `annee_academique_id`, `semestre`, `etudiant_matricule`);
+-- Préfixe du nouvel index, qui sert aussi la clé étrangère sur annee_etude_id
+ALTER TABLE `parcours_etudiant` DROP KEY `annee_etude_id`;
+
+-- Note d'un parcours pour une ECUE (jointure de get_notes, relevé, recalcul des moyennes)
+ALTER TABLE `note`
+  ADD KEY `parcours_ecue` (`parcours_etudiant_id`, `ecue_id`, `note`);
+ALTER TABLE `note` DROP KEY `parcours_etudiant_id`;
+
+-- Moyenne d'un étudiant pour une UE et une année (relevé, recalcul des moyennes)
+ALTER TABLE `moyenne_ue`
+  ADD KEY `etudiant_ue_annee` (`etudiant_matricule`, `ue_id`, `annee_academique_id`);
+ALTER TABLE `moyenne_ue` DROP KEY `etudiant_matricule`;
@@ -0,0 +1,6 @@
+-- GET conditionnels (conditional.py) : MAX(updated_at) et COUNT(*) calculés sur cet index
+-- étroit au lieu d'un parcours de la table ; sert aussi le tri ?sort=updated_at des notes.
+ALTER TABLE `note` ADD KEY `updated_at` (`updated_at`);
+ALTER TABLE `parcours_etudiant` ADD KEY `updated_at` (`updated_at`);
+ALTER TABLE `etudiant` ADD KEY `updated_at` (`updated_at`);
+ALTER TABLE `moyenne_ue` ADD KEY `updated_at` (`updated_at`);
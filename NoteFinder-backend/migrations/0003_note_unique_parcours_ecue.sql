@@ -0,0 +1,18 @@
+-- Une seule note par étudiant (parcours) et par ECUE : un nouvel envoi du même scan met à
+-- jour la note au lieu d'ajouter une ligne (INSERT ... ON DUPLICATE KEY UPDATE dans app.py).
+
+-- Doublons existants : la note la plus récente (id le plus grand) est conservée. Les moyennes
+-- des UE concernées sont à recalculer ensuite (POST /api/moyenne_ue/recalcul, par année).
+DELETE ancienne FROM `note` ancienne
+  JOIN `note` recente
+    ON recente.parcours_etudiant_id = ancienne.parcours_etudiant_id
+   AND recente.ecue_id = ancienne.ecue_id
+   AND recente.id > ancienne.id;
+
+-- Remplace l'index parcours_ecue de 0001 : mêmes colonnes de tête, donc mêmes chemins
+-- d'accès (jointure de get_notes, relevé, clé étrangère sur parcours_etudiant_id). La note
+-- n'y figure plus (elle ne peut pas faire partie d'une clé unique par ECUE) : une lecture de
+-- la ligne par clé primaire par note jointe.
+ALTER TABLE `note`
+  DROP KEY `parcours_ecue`,
+  ADD UNIQUE KEY `parcours_ecue` (`parcours_etudiant_id`, `ecue_id`);
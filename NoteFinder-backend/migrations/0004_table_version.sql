@@ -0,0 +1,27 @@
+-- Validateurs des GET conditionnels (conditional.py) : un compteur par table, incrémenté par
+-- l'application une fois par transaction d'écriture, juste avant le commit
+-- (bump_table_versions). Contrairement à MAX(updated_at) / COUNT(*) (résolution d'une
+-- seconde), il change à chaque écriture : modification d'une ligne ancienne dans la même
+-- seconde, suppression suivie d'une insertion...
+--
+-- Une écriture faite hors de l'application (requête à la main, import) doit incrémenter la
+-- version de la table elle-même, sinon les clients gardent leur copie jusqu'à la suivante :
+--   UPDATE table_version SET version = version + 1 WHERE nom = 'note';
+CREATE TABLE IF NOT EXISTS `table_version` (
+  `nom` varchar(64) NOT NULL PRIMARY KEY,
+  `version` bigint(20) UNSIGNED NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT IGNORE INTO `table_version` (`nom`) VALUES
+  ('annee_academique'),
+  ('annee_etude'),
+  ('ecue'),
+  ('enseignant'),
+  ('etudiant'),
+  ('filiere'),
+  ('grade'),
+  ('membre_administratif'),
+  ('moyenne_ue'),
+  ('note'),
+  ('parcours_etudiant'),
+  ('ue');
@@ -0,0 +1,17 @@
+-- Traitements OCR asynchrones (ocr_jobs.py, POST /api/ocr/jobs). La table n'existait que dans
+-- le dump entite (2).sql : IF NOT EXISTS pour les bases créées à partir de ce dump.
+CREATE TABLE IF NOT EXISTS `ocr_job` (
+  `id` char(32) NOT NULL,
+  `statut` enum('en_attente','en_cours','termine','echec') NOT NULL DEFAULT 'en_attente',
+  `total` int(11) NOT NULL,
+  `traites` int(11) NOT NULL DEFAULT 0,
+  `fichiers` text NOT NULL,
+  `resultats` longtext DEFAULT NULL,
+  `erreur` varchar(255) DEFAULT NULL,
+  `tentatives` int(11) NOT NULL DEFAULT 0,
+  `created_by` int(11) DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (`id`),
+  KEY `statut_updated_at` (`statut`,`updated_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
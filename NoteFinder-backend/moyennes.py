@@ -0,0 +1,196 @@
+# Mise à jour incrémentale de moyenne_ue.
+#
+# Chaque écriture sur note marque les moyennes touchées (étudiant, UE, année académique).
+# Un thread regroupe les marques pendant quelques secondes (une saisie de notes en rafale
+# ne déclenche qu'un recalcul) puis ne recalcule que ces moyennes, en une transaction :
+# lectures par les index etudiant_matricule / ue_id, jamais de parcours de toute la table.
+
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from conditional import bump_table_versions
+
+PASS_MARK = Decimal('10')
+VERDICT_OK = 'Validé'
+VERDICT_KO = 'Non validé'
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def moyenne_keys(conn, pairs):
+    # (ecue_id, parcours_etudiant_id) -> {(etudiant_matricule, ue_id, annee_academique_id)}
+    pairs = {(int(ecue_id), int(parcours_id)) for ecue_id, parcours_id in pairs
+             if ecue_id is not None and parcours_id is not None}
+    if not pairs:
+        return set()
+    ecue_ids = sorted({ecue_id for ecue_id, _ in pairs})
+    parcours_ids = sorted({parcours_id for _, parcours_id in pairs})
+
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id, ue_id FROM ecue WHERE id IN ({_placeholders(ecue_ids)})", ecue_ids)
+    ues = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT id, etudiant_matricule, annee_academique_id FROM parcours_etudiant WHERE id IN ({_placeholders(parcours_ids)})",
+        parcours_ids
+    )
+    parcours = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    cursor.close()
+
+    keys = set()
+    for ecue_id, parcours_id in pairs:
+        ue_id = ues.get(ecue_id)
+        matricule, annee_academique_id = parcours.get(parcours_id, (None, None))
+        if ue_id is not None and matricule is not None and annee_academique_id is not None:
+            keys.add((matricule, ue_id, annee_academique_id))
+    return keys
+
+
+def compute_moyenne(average):
+    moyenne = Decimal(average).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return moyenne, VERDICT_OK if moyenne >= PASS_MARK else VERDICT_KO
+
+
+def recompute_moyennes(conn, keys, batch_size=500):
+    # Recalcule les moyennes des clés données, sans commit (la transaction reste à l'appelant).
+    # Une clé sans aucune note n'a plus de moyenne : sa ligne est supprimée.
+    counts = {'updated': 0, 'inserted': 0, 'deleted': 0}
+    cursor = conn.cursor()
+    for batch in _chunks(sorted(keys), batch_size):
+        wanted = set(batch)
+        matricules = sorted({key[0] for key in batch})
+        ue_ids = sorted({key[1] for key in batch})
+        annee_ids = sorted({key[2] for key in batch})
+        params = matricules + ue_ids + annee_ids
+
+        cursor.execute(f"""
+            SELECT pe.etudiant_matricule, ecue.ue_id, pe.annee_academique_id, AVG(n.note)
+            FROM parcours_etudiant pe
+            JOIN note n ON n.parcours_etudiant_id = pe.id
+            JOIN ecue ON ecue.id = n.ecue_id
+            WHERE pe.etudiant_matricule IN ({_placeholders(matricules)})
+              AND ecue.ue_id IN ({_placeholders(ue_ids)})
+              AND pe.annee_academique_id IN ({_placeholders(annee_ids)})
+              AND n.note IS NOT NULL
+            GROUP BY pe.etudiant_matricule, ecue.ue_id, pe.annee_academique_id
+        """, params)
+        averages = {tuple(row[:3]): row[3] for row in cursor.fetchall() if tuple(row[:3]) in wanted}
+
+        cursor.execute(f"""
+            SELECT id, etudiant_matricule, ue_id, annee_academique_id FROM moyenne_ue
+            WHERE etudiant_matricule IN ({_placeholders(matricules)})
+              AND ue_id IN ({_placeholders(ue_ids)})
+              AND annee_academique_id IN ({_placeholders(annee_ids)})
+        """, params)
+        existing = {}
+        for row in cursor.fetchall():
+            if tuple(row[1:]) in wanted:
+                existing.setdefault(tuple(row[1:]), []).append(row[0])
+
+        updates, inserts, deletes = [], [], []
+        for key in batch:
+            if key in averages:
+                moyenne, verdict = compute_moyenne(averages[key])
+                if key in existing:
+                    updates.extend((moyenne, verdict, row_id) for row_id in existing[key])
+                else:
+                    inserts.append((*key, moyenne, verdict))
+            else:
+                deletes.extend(existing.get(key, []))
+
+        if updates:
+            cursor.executemany("UPDATE moyenne_ue SET moyenne = %s, verdict = %s WHERE id = %s", updates)
+        if inserts:
+            cursor.executemany(
+                "INSERT INTO moyenne_ue (etudiant_matricule, ue_id, annee_academique_id, moyenne, verdict) VALUES (%s, %s, %s, %s, %s)",
+                inserts
+            )
+        if deletes:
+            cursor.execute(f"DELETE FROM moyenne_ue WHERE id IN ({_placeholders(deletes)})", deletes)
+        counts['updated'] += len(updates)
+        counts['inserted'] += len(inserts)
+        counts['deleted'] += len(deletes)
+    cursor.close()
+    if any(counts.values()):
+        # Validateur des GET conditionnels de moyenne_ue ; l'appelant commite juste après
+        bump_table_versions(conn, 'moyenne_ue')
+    return counts
+
+
+class MoyenneRecomputer:
+    # Recalcul différé : mark() accumule les clés, un thread les traite après `delay` secondes
+
+    def __init__(self, pool, delay=2.0, batch_size=500):
+        # pool : pool de connexions (db.ConnectionPool)
+        self.pool = pool
+        self.delay = delay
+        self.batch_size = batch_size
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.recomputed = 0
+        self.last_error = None
+
+    def mark(self, keys):
+        if not keys:
+            return
+        with self._lock:
+            self._dirty |= set(keys)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='moyenne-ue', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            keys, self._dirty = self._dirty, set()
+        if not keys:
+            return None
+        conn = self.pool.acquire()
+        try:
+            counts = recompute_moyennes(conn, keys, self.batch_size)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            # Clés remises en attente pour la prochaine passe
+            with self._lock:
+                self._dirty |= keys
+                self.last_error = str(e)
+            raise
+        finally:
+            self.pool.release(conn)
+        with self._lock:
+            self.runs += 1
+            self.recomputed += len(keys)
+            self.last_error = None
+        return counts
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._dirty),
+                'runs': self.runs,
+                'recomputed': self.recomputed,
+                'last_error': self.last_error,
+            }
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.delay)  # les notes saisies entre-temps rejoignent le même lot
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Erreur du recalcul des moyennes d'UE : {e}")
+                self._wakeup.set()
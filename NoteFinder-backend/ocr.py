@@ -0,0 +1,290 @@
+# Reconnaissance des relevés de notes côté serveur.
+#
+# Tesseract est exécuté dans un pool de processus borné : un processus par cœur
+# par défaut, chaque image avec sa propre limite de temps et de taille.
+# Une feuille est d'abord préparée (ocr_preprocess.py) ; si le tableau des notes y est
+# détecté (ocr_table.py), seules ses colonnes sont reconnues, sinon la page entière.
+
+import io
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+import pytesseract
+
+from ocr_cache import cache_key
+from ocr_preprocess import PREPROCESS_DEFAULTS, open_for_ocr, preprocess
+from ocr_table import TABLE_DEFAULTS, analyze_table, assemble_rows, recognize_strip
+
+DEFAULT_SETTINGS = {
+    'lang': 'fra',
+    'config': '--psm 6',
+    'timeout': 60,  # secondes par image
+    'max_pixels': 40_000_000,
+    'preprocess': PREPROCESS_DEFAULTS,
+    'table': TABLE_DEFAULTS,
+}
+
+
+class OcrError(Exception):
+    """Image refusée ou reconnaissance impossible."""
+
+
+# ----------------------------------------------------------------------------------------
+# Travail exécuté dans les processus du pool
+# ----------------------------------------------------------------------------------------
+
+def _tesseract_errors(function, *args):
+    try:
+        return function(*args)
+    except OcrError:
+        raise
+    except RuntimeError as e:
+        # pytesseract tue tesseract et lève RuntimeError à l'expiration du délai
+        raise OcrError(f"Reconnaissance interrompue : {e}")
+    except Exception as e:
+        # Certaines exceptions de pytesseract ne peuvent pas être renvoyées au processus parent
+        raise OcrError(str(e) or e.__class__.__name__)
+
+
+def _analyze_image(data, settings):
+    image = Image.open(io.BytesIO(data))
+    # La taille est connue dès l'ouverture, avant de décoder les pixels
+    width, height = image.size
+    if width * height > settings['max_pixels']:
+        raise OcrError(f"Image trop grande ({width}x{height} pixels, max {settings['max_pixels']})")
+
+    options = {**PREPROCESS_DEFAULTS, **(settings.get('preprocess') or {})}
+    config = settings['config']
+    if options['enabled']:
+        image = preprocess(open_for_ocr(image, options), options)
+        # L'image est ramenée à target_dpi : inutile de laisser tesseract la deviner
+        config = f"{config} --dpi {options['target_dpi']}"
+
+        # Tableau détecté : seules ses bandes utiles seront reconnues (en parallèle)
+        strips = analyze_table(image, settings)
+        if strips:
+            return {'strips': strips}
+    else:
+        image.load()
+
+    text = pytesseract.image_to_string(
+        image,
+        lang=settings['lang'],
+        config=config,
+        timeout=settings['timeout']
+    )
+    return {'text': text}
+
+
+def analyze_image(data, settings):
+    # Renvoie {'text': ...} (page entière reconnue) ou {'strips': [...]} (bandes du tableau)
+    return _tesseract_errors(_analyze_image, data, settings)
+
+
+def recognize_table_strip(strip, settings):
+    return _tesseract_errors(recognize_strip, strip, settings)
+
+
+# ----------------------------------------------------------------------------------------
+# Analyse du texte reconnu (même logique que parseNotesFromText côté React)
+# ----------------------------------------------------------------------------------------
+
+def parse_note(value):
+    try:
+        return float(value.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def parse_notes_from_text(text):
+    lines = [line for line in text.split('\n') if line.strip()]
+    notes = []
+    is_table_format = any('|' in line and len(line.split('|')) > 3 for line in lines)
+
+    for line in lines:
+        # Ignorer les lignes d'en-tête et séparateurs
+        if 'Matricule' in line or '---' in line or '===' in line:
+            continue
+
+        # Format tableau avec |
+        if is_table_format and '|' in line:
+            parts = [part.strip() for part in line.split('|') if part.strip()]
+            if len(parts) >= 4:
+                note = parse_note(parts[3])
+                if note is not None:
+                    notes.append({'matricule': parts[0], 'nom': parts[1], 'prenom': parts[2], 'note': note})
+        # Format ligne simple
+        else:
+            parts = re.sub(r'\s+', ' ', line).strip().split(' ')
+            if len(parts) >= 4:
+                note = parse_note(parts[-1])
+                if note is not None:
+                    notes.append({
+                        'matricule': parts[0],
+                        'nom': parts[1],
+                        'prenom': ' '.join(parts[2:-1]),  # Gère les prénoms composés
+                        'note': note
+                    })
+    return notes
+
+
+# ----------------------------------------------------------------------------------------
+# Pool de processus
+# ----------------------------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers=None):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn : les workers n'héritent ni des threads ni des sockets MySQL du serveur
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def _forget_executor():
+    # Après un fork, le pool de processus (et son thread de gestion) appartient au parent
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):  # absent sous Windows
+    os.register_at_fork(after_in_child=_forget_executor)
+
+
+def reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def make_result(filename, value=None, error=None, cached=False):
+    # value : {'text': ..., 'rows': [...]} (forme stockée dans le cache)
+    return {
+        'filename': filename,
+        'text': value['text'] if value else None,
+        'rows': value['rows'] if value else [],
+        'error': error,
+        'cached': cached,
+    }
+
+
+def cached_results(images, settings=None, cache=None):
+    # Résultats complets si toutes les images sont déjà en cache, sinon None. Présence vérifiée
+    # d'abord sans lecture : un lot incomplet est relu par ocr_images, chaque image n'est
+    # ainsi comptée qu'une fois dans les succès / échecs du cache
+    if cache is None:
+        return None
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    keys = [cache_key(data, settings) for _, data in images]
+    if not all(cache.contains(key) for key in keys):
+        return None
+    results = []
+    for (filename, _), key in zip(images, keys):
+        value = cache.get(key)
+        if value is None:
+            return None
+        results.append(make_result(filename, value, cached=True))
+    return results
+
+
+def _wait(future, deadline):
+    # (valeur, erreur) sans lever d'exception
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic())), None
+    except FutureTimeout:
+        future.cancel()
+        return None, 'Délai de reconnaissance dépassé'
+    except BrokenProcessPool:
+        reset_executor()
+        return None, 'Processus OCR interrompu'
+    except Exception as e:
+        return None, str(e)
+
+
+def _deadline(executor, tasks, timeout):
+    # Les tâches passent par vagues de max_workers : le délai global en tient compte,
+    # avec une vague de marge pour le décodage et la file d'attente
+    waves = math.ceil(tasks / executor._max_workers)
+    return time.monotonic() + timeout * (waves + 1)
+
+
+def ocr_images(images, settings=None, max_workers=None, progress=None, cache=None):
+    # images : liste de (nom de fichier, octets). Renvoie un résultat par image,
+    # dans le même ordre, sans lever d'exception pour une image en échec.
+    # progress(nombre d'images traitées) est appelé après chaque image.
+    # cache : OcrCache facultatif, les images déjà reconnues ne passent pas par le pool.
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+
+    keys = [cache_key(data, settings) for _, data in images] if cache is not None else [None] * len(images)
+    values = {}
+    for index, key in enumerate(keys):
+        value = cache.get(key) if key else None
+        if value is not None:
+            values[index] = value
+    cached = set(values)
+    errors = {}
+
+    def done(index, value=None, error=None):
+        if error is None:
+            values[index] = value
+            if cache is not None:
+                cache.put(keys[index], value)
+        else:
+            errors[index] = error
+        if progress:
+            progress(len(values) + len(errors))
+
+    if progress and cached:
+        progress(len(cached))
+
+    misses = [index for index in range(len(images)) if index not in values]
+    if misses:
+        executor = get_executor(max_workers)
+
+        # 1. Préparation, détection du tableau (ou lecture de la page entière à défaut)
+        analyses = {index: executor.submit(analyze_image, images[index][1], settings) for index in misses}
+        deadline = _deadline(executor, len(misses), settings['timeout'])
+        strips = {}
+        for index in misses:
+            analysis, error = _wait(analyses[index], deadline)
+            if error is not None:
+                done(index, error=error)
+            elif 'text' in analysis:
+                done(index, {'text': analysis['text'], 'rows': parse_notes_from_text(analysis['text'])})
+            else:
+                # Bandes soumises dès que la feuille est analysée, pendant l'analyse des suivantes
+                strips[index] = [executor.submit(recognize_table_strip, strip, settings) for strip in analysis['strips']]
+
+        # 2. Reconnaissance des bandes de chaque tableau
+        if strips:
+            deadline = _deadline(executor, sum(len(futures) for futures in strips.values()), settings['timeout'])
+        for index, futures in strips.items():
+            outcomes = [_wait(future, deadline) for future in futures]
+            error = next((error for _, error in outcomes if error is not None), None)
+            if error is not None:
+                done(index, error=error)
+            else:
+                text, rows = assemble_rows([result for result, _ in outcomes])
+                done(index, {'text': text, 'rows': rows})
+
+    return [
+        make_result(filename, values.get(index), errors.get(index), cached=index in cached)
+        for index, (filename, _) in enumerate(images)
+    ]
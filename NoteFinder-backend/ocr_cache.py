@@ -0,0 +1,112 @@
+# Cache disque des résultats OCR.
+#
+# La clé est le SHA-256 des octets de l'image combiné aux réglages qui influencent le
+# texte reconnu : renvoyer la même feuille (après un enregistrement raté par exemple)
+# ne relance pas tesseract. Le cache est borné en taille et évince les entrées les
+# moins récemment utilisées (date de modification rafraîchie à chaque lecture).
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Réglages sans effet sur le texte reconnu
+IGNORED_SETTINGS = {'timeout'}
+
+
+def cache_key(data, settings):
+    relevant = {name: value for name, value in settings.items() if name not in IGNORED_SETTINGS}
+    digest = hashlib.sha256(data).hexdigest()
+    settings_json = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(f'{digest}:{settings_json}'.encode('utf-8')).hexdigest()
+
+
+class OcrCache:
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)  # entrée récemment utilisée
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def contains(self, key):
+        # Présence sans lecture ni comptage (pré-vérification avant get)
+        return os.path.exists(self._path(key))
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Écriture atomique : un lecteur concurrent ne voit jamais un fichier partiel
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        written = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += written
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else None,
+                'size': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Plusieurs processus peuvent partager le répertoire : on repart de l'état réel
+        # du disque et on descend à 90 % de la limite pour ne pas évincer à chaque écriture.
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * 0.9
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+            except OSError:
+                pass
+        self._size = size
@@ -0,0 +1,278 @@
+# Traitements OCR asynchrones.
+#
+# POST /api/ocr/jobs enregistre les images dans uploads/ocr_jobs/<id>/, crée une ligne
+# ocr_job et place l'id dans une file bornée. Des threads la vident en envoyant les
+# images au pool de processus tesseract (ocr.py) et mettent la progression à jour en base.
+# L'état vit dans la table ocr_job : après un redémarrage, les traitements en attente
+# (ou abandonnés en cours de route) sont repris. Les images sont supprimées dès qu'un
+# traitement est terminé ou en échec ; les lignes terminées sont purgées après
+# retention_days jours. ocr.py (PIL, pytesseract) n'est importé qu'au premier traitement.
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+
+STATUS_WAITING = 'en_attente'
+STATUS_RUNNING = 'en_cours'
+STATUS_DONE = 'termine'
+STATUS_FAILED = 'echec'
+
+
+class QueueFull(Exception):
+    """La file des traitements OCR est pleine."""
+
+
+class OcrJobManager:
+    def __init__(self, pool, upload_folder, settings, workers=2, queue_size=20,
+                 poll_interval=10, stale_after=600, max_attempts=3, ocr_workers=None, cache=None,
+                 retention_days=30, purge_interval=3600):
+        # pool : pool de connexions (db.ConnectionPool)
+        self.pool = pool
+        self.folder = os.path.join(upload_folder, 'ocr_jobs')
+        self.settings = settings
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.ocr_workers = ocr_workers
+        self.cache = cache
+        self.retention_days = retention_days  # None : pas de purge
+        self.purge_interval = purge_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'ocr-job-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    # ------------------------------------------------------------------
+    # Côté requête HTTP
+    # ------------------------------------------------------------------
+
+    def submit(self, images, created_by=None):
+        # images : liste de (nom de fichier sûr, octets)
+        from ocr import cached_results
+        results = cached_results(images, self.settings, self.cache)
+        if results is not None:
+            # Feuilles déjà reconnues : le traitement est terminé dès sa création
+            job_id = uuid.uuid4().hex
+            self._execute(
+                "INSERT INTO ocr_job (id, statut, total, traites, fichiers, resultats, created_by) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                (job_id, STATUS_DONE, len(images), len(images), json.dumps([name for name, _ in images]),
+                 json.dumps(results, ensure_ascii=False), created_by)
+            )
+            return job_id
+
+        if self.queue.full():
+            raise QueueFull()
+
+        job_id = uuid.uuid4().hex
+        job_folder = os.path.join(self.folder, job_id)
+        os.makedirs(job_folder, exist_ok=True)
+        filenames = []
+        for index, (filename, data) in enumerate(images):
+            stored = f'{index:03d}_{filename}'
+            with open(os.path.join(job_folder, stored), 'wb') as f:
+                f.write(data)
+            filenames.append(stored)
+
+        self._execute(
+            "INSERT INTO ocr_job (id, statut, total, fichiers, created_by) VALUES (%s, %s, %s, %s, %s)",
+            (job_id, STATUS_WAITING, len(filenames), json.dumps(filenames), created_by)
+        )
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            self._execute("DELETE FROM ocr_job WHERE id = %s", (job_id,))
+            shutil.rmtree(job_folder, ignore_errors=True)
+            raise QueueFull()
+        return job_id
+
+    def get(self, job_id):
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT id, statut, total, traites, resultats, erreur, created_at, updated_at FROM ocr_job WHERE id = %s",
+                (job_id,)
+            )
+            job = cursor.fetchone()
+            cursor.close()
+        finally:
+            self.pool.release(conn)
+        if job is None:
+            return None
+        job['resultats'] = json.loads(job['resultats']) if job['resultats'] else None
+        job['progression'] = round(100 * job['traites'] / job['total']) if job['total'] else 100
+        return job
+
+    def retry_after(self):
+        # Estimation grossière : le temps de vider la file à raison d'une image par worker
+        return max(1, int(self.settings.get('timeout', 60) * self.queue.qsize() / max(self.workers, 1)))
+
+    def stats(self):
+        return {'queued': self.queue.qsize(), 'queue_size': self.queue.maxsize, 'workers': self.workers}
+
+    # ------------------------------------------------------------------
+    # Threads de traitement
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        self._recover()
+        while True:
+            try:
+                job_id = self.queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                # File vide : on reprend les traitements restés en base (redémarrage,
+                # autre processus arrêté, file pleine au moment de la reprise...)
+                self._recover()
+                continue
+            try:
+                self._process(job_id)
+            except Exception as e:
+                print(f"Erreur du traitement OCR {job_id} : {e}")
+            finally:
+                self.queue.task_done()
+
+    def _recover(self):
+        self._purge()
+        free = self.queue.maxsize - self.queue.qsize()
+        if free <= 0:
+            return
+        try:
+            rows = self._fetchall(
+                """SELECT id FROM ocr_job
+                   WHERE statut = %s
+                      OR (statut = %s AND updated_at < NOW() - INTERVAL %s SECOND)
+                   ORDER BY created_at LIMIT %s""",
+                (STATUS_WAITING, STATUS_RUNNING, self.stale_after, free)
+            )
+        except Exception as e:
+            print(f"Reprise des traitements OCR impossible : {e}")
+            return
+        for (job_id,) in rows:
+            try:
+                self.queue.put_nowait(job_id)
+            except queue.Full:
+                break
+
+    def _purge(self):
+        # Rétention : traitements terminés ou en échec depuis plus de retention_days jours
+        # (résultats en base et images éventuellement restées sur disque), au plus une fois
+        # par purge_interval secondes et par processus
+        if self.retention_days is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval
+        try:
+            rows = self._fetchall(
+                """SELECT id FROM ocr_job
+                   WHERE statut IN (%s, %s) AND updated_at < NOW() - INTERVAL %s DAY
+                   LIMIT 1000""",
+                (STATUS_DONE, STATUS_FAILED, self.retention_days)
+            )
+            job_ids = [job_id for (job_id,) in rows]
+            if job_ids:
+                self._execute(f"DELETE FROM ocr_job WHERE id IN ({', '.join(['%s'] * len(job_ids))})", job_ids)
+        except Exception as e:
+            print(f"Purge des traitements OCR impossible : {e}")
+            return
+        for job_id in job_ids:
+            shutil.rmtree(os.path.join(self.folder, job_id), ignore_errors=True)
+
+    def _process(self, job_id):
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            # Réservation atomique : un seul thread (ou processus) traite un job donné
+            cursor.execute(
+                """UPDATE ocr_job SET statut = %s, traites = 0, tentatives = tentatives + 1
+                   WHERE id = %s AND (statut = %s OR (statut = %s AND updated_at < NOW() - INTERVAL %s SECOND))""",
+                (STATUS_RUNNING, job_id, STATUS_WAITING, STATUS_RUNNING, self.stale_after)
+            )
+            claimed = cursor.rowcount == 1
+            conn.commit()
+            cursor.execute("SELECT fichiers, tentatives FROM ocr_job WHERE id = %s", (job_id,))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            self.pool.release(conn)
+        if not claimed or row is None:
+            return
+
+        filenames, attempts = json.loads(row[0]), row[1]
+        job_folder = os.path.join(self.folder, job_id)
+        finished = False
+        try:
+            if attempts > self.max_attempts:
+                self._finish(job_id, STATUS_FAILED, None, 'Nombre maximum de tentatives atteint')
+                finished = True
+                return
+
+            try:
+                images = []
+                for filename in filenames:
+                    with open(os.path.join(job_folder, filename), 'rb') as f:
+                        images.append((filename.split('_', 1)[1], f.read()))
+            except OSError:
+                self._finish(job_id, STATUS_FAILED, None, 'Images introuvables')
+                finished = True
+                return
+
+            def progress(done):
+                self._execute("UPDATE ocr_job SET traites = %s WHERE id = %s", (done, job_id))
+
+            from ocr import ocr_images
+            results = ocr_images(images, self.settings, max_workers=self.ocr_workers, progress=progress, cache=self.cache)
+            self._finish(job_id, STATUS_DONE, results, None)
+            finished = True
+        finally:
+            # Statut final enregistré (terminé ou échec) : les images ne servent plus. Sur une
+            # erreur passagère, elles restent pour la reprise du traitement.
+            if finished:
+                shutil.rmtree(job_folder, ignore_errors=True)
+
+    def _finish(self, job_id, status, results, error):
+        self._execute(
+            "UPDATE ocr_job SET statut = %s, resultats = %s, erreur = %s WHERE id = %s",
+            (status, json.dumps(results, ensure_ascii=False) if results is not None else None, error, job_id)
+        )
+
+    # ------------------------------------------------------------------
+    # Accès base
+    # ------------------------------------------------------------------
+
+    def _execute(self, sql, params):
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            conn.commit()
+            cursor.close()
+        finally:
+            self.pool.release(conn)
+
+    def _fetchall(self, sql, params):
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            self.pool.release(conn)
+        return rows
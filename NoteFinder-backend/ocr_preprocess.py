@@ -0,0 +1,129 @@
+# Préparation des images avant tesseract.
+#
+# Les photos de relevés font souvent plus de 12 Mpx en couleur : tesseract passe l'essentiel
+# de son temps sur des pixels inutiles. Chaque étape est réglable via PREPROCESS_DEFAULTS
+# (ou app.config['OCR_PREPROCESS']) et n'utilise que des opérations Pillow écrites en C.
+# Mesures : bench/bench_ocr.py
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+PREPROCESS_DEFAULTS = {
+    'enabled': True,
+    'target_dpi': 300,  # résolution visée pour une page A4
+    'page_width_inches': 8.27,
+    'binarize': True,
+    'block_radius': 15,  # rayon du voisinage pour le seuil adaptatif
+    'offset': 10,  # un pixel est noir s'il est plus sombre que la moyenne locale - offset
+    'deskew': True,
+    'max_skew': 5.0,  # degrés
+    'skew_step': 0.5,
+    'crop': True,
+    'crop_padding': 20,
+    'osd': False,  # détection de l'orientation par tesseract (appel supplémentaire)
+}
+
+
+def target_width(options):
+    return int(options['target_dpi'] * options['page_width_inches'])
+
+
+def open_for_ocr(image, options):
+    # Pour un JPEG, draft() décode directement en niveaux de gris et à l'échelle réduite
+    # (1/2, 1/4, 1/8) : le gain le plus important, avant même de toucher aux pixels.
+    width, height = image.size
+    wanted = target_width(options)
+    if image.format == 'JPEG' and width > wanted:
+        image.draft('L', (wanted, int(height * wanted / width)))
+    return image
+
+
+def downscale(image, options):
+    wanted = target_width(options)
+    width, height = image.size
+    if width <= wanted:
+        return image
+    return image.resize((wanted, max(1, int(height * wanted / width))), Image.LANCZOS, reducing_gap=2.0)
+
+
+def binarize(image, options):
+    # Seuil adaptatif (moyenne locale) : robuste aux ombres et à l'éclairage inégal des photos
+    local_mean = image.filter(ImageFilter.BoxBlur(options['block_radius']))
+    darker = ImageChops.subtract(local_mean, image)
+    offset = options['offset']
+    return darker.point(lambda value: 0 if value > offset else 255, mode='L')
+
+
+def row_profile_score(image):
+    # Moyenne de chaque ligne via un redimensionnement à 1 pixel de large (fait en C) :
+    # des lignes de texte bien horizontales donnent un profil très contrasté.
+    column = image.resize((1, image.size[1]), Image.BOX)
+    values = list(column.getdata())
+    mean = sum(values) / len(values)
+    return sum((value - mean) ** 2 for value in values)
+
+
+def estimate_skew(image, options):
+    # Recherche de l'angle sur une vignette inversée (texte blanc sur fond noir)
+    small = ImageOps.invert(image)
+    small.thumbnail((800, 800))
+    best_angle, best_score = 0.0, None
+    steps = int(options['max_skew'] / options['skew_step'])
+    for step in range(-steps, steps + 1):
+        angle = step * options['skew_step']
+        score = row_profile_score(small.rotate(angle, resample=Image.NEAREST, expand=True))
+        if best_score is None or score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def deskew(image, options):
+    angle = estimate_skew(image, options)
+    if angle == 0:
+        return image
+    return image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+
+def correct_orientation(image):
+    import pytesseract
+
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except Exception:
+        return image
+    rotate = osd.get('rotate', 0)
+    if rotate:
+        return image.rotate(-rotate, expand=True, fillcolor=255)
+    return image
+
+
+def crop_margins(image, options):
+    bbox = ImageOps.invert(image).getbbox()
+    if bbox is None:
+        return image
+    padding = options['crop_padding']
+    left, top, right, bottom = bbox
+    return image.crop((
+        max(0, left - padding),
+        max(0, top - padding),
+        min(image.size[0], right + padding),
+        min(image.size[1], bottom + padding),
+    ))
+
+
+def preprocess(image, options=None):
+    options = {**PREPROCESS_DEFAULTS, **(options or {})}
+    if not options['enabled']:
+        return image
+
+    image = ImageOps.exif_transpose(image)
+    image = downscale(image, options)
+    image = image.convert('L')
+    if options['binarize']:
+        image = binarize(image, options)
+    if options['osd']:
+        image = correct_orientation(image)
+    if options['deskew']:
+        image = deskew(image, options)
+    if options['crop'] and options['binarize']:
+        image = crop_margins(image, options)
+    return image
@@ -0,0 +1,205 @@
+# Détection du tableau Matricule | Nom | Prénom | Note dans une feuille préparée.
+#
+# Les traits du tableau sont repérés par projection (moyenne de chaque ligne / colonne de
+# pixels), puis chaque colonne utile est découpée en une bande verticale sans les traits.
+# Les bandes sont reconnues séparément, avec un jeu de caractères restreint pour les
+# matricules et les notes : l'en-tête, les titres et les signatures ne passent plus par
+# tesseract, et les bandes d'une même feuille sont reconnues en parallèle.
+
+import unicodedata
+
+from PIL import Image, ImageDraw, ImageOps
+
+TABLE_DEFAULTS = {
+    'enabled': True,
+    'line_ratio': 0.5,  # part minimale de pixels noirs pour qu'une ligne/colonne soit un trait
+    'min_cell_height': 12,
+    'min_cell_width': 20,
+    'padding': 3,  # pixels retirés autour de chaque bande (restes de traits)
+    'names': True,  # reconnaître aussi les colonnes Nom et Prénom
+}
+
+COLUMNS = ['matricule', 'nom', 'prenom', 'note']
+
+STRIP_CONFIGS = {
+    'matricule': '--psm 6 -c tessedit_char_whitelist=0123456789',
+    'note': '--psm 6 -c tessedit_char_whitelist=0123456789.,',
+    'nom': '--psm 6',
+    'prenom': '--psm 6',
+}
+
+
+def _dark_mask(image):
+    # Image binaire avec l'encre à 255 (pour les projections)
+    if image.mode != 'L':
+        image = image.convert('L')
+    return image.point(lambda value: 255 if value < 128 else 0)
+
+
+def _line_spans(profile, threshold, min_gap):
+    # Regroupe les positions consécutives au-dessus du seuil en traits (début, fin)
+    spans = []
+    for position, value in enumerate(profile):
+        if value >= threshold:
+            if spans and position - spans[-1][1] <= min_gap:
+                spans[-1][1] = position
+            else:
+                spans.append([position, position])
+    return [tuple(span) for span in spans]
+
+
+def detect_grid(image, options):
+    mask = _dark_mask(image)
+    width, height = mask.size
+    threshold = 255 * options['line_ratio']
+
+    # Traits horizontaux : moyenne de chaque ligne de pixels
+    rows = list(mask.resize((1, height), Image.BOX).getdata())
+    h_lines = _line_spans(rows, threshold, 2)
+    if len(h_lines) < 3:
+        return None
+
+    # Traits verticaux cherchés uniquement dans la hauteur du tableau
+    top, bottom = h_lines[0][0], h_lines[-1][1]
+    band = mask.crop((0, top, width, bottom + 1))
+    columns = list(band.resize((width, 1), Image.BOX).getdata())
+    v_lines = _line_spans(columns, threshold, 2)
+    # Bords du tableau sans trait : le bord de l'image sert de limite
+    if not v_lines or v_lines[0][0] > options['min_cell_width']:
+        v_lines.insert(0, (0, 0))
+    if v_lines[-1][1] < width - 1 - options['min_cell_width']:
+        v_lines.append((width - 1, width - 1))
+
+    row_bounds = [
+        (upper[1] + 1, lower[0])
+        for upper, lower in zip(h_lines, h_lines[1:])
+        if lower[0] - upper[1] >= options['min_cell_height']
+    ]
+    column_bounds = [
+        (left[1] + 1, right[0])
+        for left, right in zip(v_lines, v_lines[1:])
+        if right[0] - left[1] >= options['min_cell_width']
+    ]
+    if len(row_bounds) < 2 or len(column_bounds) < 4:
+        return None
+    return {'h_lines': h_lines, 'rows': row_bounds, 'columns': column_bounds}
+
+
+def _normalize(word):
+    word = unicodedata.normalize('NFKD', word).encode('ascii', 'ignore').decode('ascii')
+    return ''.join(char for char in word.lower() if char.isalpha())
+
+
+def locate_columns(image, grid, settings):
+    # Quatre colonnes : l'ordre attendu par parseNotesFromText, sans lire l'en-tête
+    if len(grid['columns']) == 4:
+        return dict(zip(COLUMNS, range(4)))
+
+    # Sinon une seule lecture de la ligne d'en-tête, mots rattachés aux colonnes par leur x
+    import pytesseract
+
+    top, bottom = grid['rows'][0]
+    header = image.crop((0, top, image.size[0], bottom))
+    data = pytesseract.image_to_data(
+        header, lang=settings['lang'], config='--psm 7',
+        timeout=settings['timeout'], output_type=pytesseract.Output.DICT
+    )
+    found = {}
+    for word, left, word_width in zip(data['text'], data['left'], data['width']):
+        name = _normalize(word)
+        if name not in COLUMNS or name in found:
+            continue
+        center = left + word_width / 2
+        for index, (start, end) in enumerate(grid['columns']):
+            if start <= center <= end:
+                found[name] = index
+                break
+    if 'matricule' not in found or 'note' not in found:
+        return None
+    return found
+
+
+def build_strips(image, grid, column_indexes, options):
+    # Une bande par colonne utile, de la première ligne de données à la dernière,
+    # avec les traits horizontaux effacés et des positions relatives à la bande
+    data_rows = grid['rows'][1:]
+    top, bottom = data_rows[0][0], data_rows[-1][1]
+    padding = options['padding']
+    wanted = ['matricule', 'note'] + (['nom', 'prenom'] if options['names'] else [])
+
+    strips = []
+    for name in wanted:
+        if name not in column_indexes:
+            continue
+        left, right = grid['columns'][column_indexes[name]]
+        strip = image.crop((left + padding, top, right - padding, bottom)).convert('L')
+        draw = ImageDraw.Draw(strip)
+        for start, end in grid['h_lines']:
+            if top <= end and start <= bottom:
+                draw.rectangle((0, start - top - padding, strip.size[0], end - top + padding), fill=255)
+        strips.append({
+            'column': name,
+            'image': strip,
+            'rows': [(start - top, end - top) for start, end in data_rows],
+        })
+    return strips
+
+
+def analyze_table(image, settings):
+    # Renvoie les bandes à reconnaître, ou None si aucun tableau exploitable n'est trouvé
+    options = {**TABLE_DEFAULTS, **(settings.get('table') or {})}
+    if not options['enabled']:
+        return None
+    grid = detect_grid(image, options)
+    if grid is None:
+        return None
+    column_indexes = locate_columns(image, grid, settings)
+    if column_indexes is None:
+        return None
+    return build_strips(image, grid, column_indexes, options)
+
+
+def recognize_strip(strip, settings):
+    # Exécuté dans un processus du pool : texte de chaque ligne du tableau pour une colonne
+    import pytesseract
+
+    data = pytesseract.image_to_data(
+        ImageOps.expand(strip['image'], border=10, fill=255),
+        lang=settings['lang'],
+        config=STRIP_CONFIGS[strip['column']],
+        timeout=settings['timeout'],
+        output_type=pytesseract.Output.DICT
+    )
+    cells = [[] for _ in strip['rows']]
+    for word, word_top, word_height in zip(data['text'], data['top'], data['height']):
+        if not word.strip():
+            continue
+        center = word_top - 10 + word_height / 2
+        for index, (start, end) in enumerate(strip['rows']):
+            if start <= center <= end:
+                cells[index].append(word.strip())
+                break
+    separator = '' if strip['column'] in ('matricule', 'note') else ' '
+    return {'column': strip['column'], 'cells': [separator.join(words) for words in cells]}
+
+
+def assemble_rows(strip_results):
+    # Recompose les lignes (matricule, nom, prénom, note) et un texte au format tableau
+    columns = {result['column']: result['cells'] for result in strip_results}
+    count = len(columns.get('matricule', []))
+    rows = []
+    lines = ['Matricule | Nom | Prénom | Note']
+    for index in range(count):
+        matricule = columns['matricule'][index]
+        raw_note = columns.get('note', [''] * count)[index]
+        try:
+            note = float(raw_note.replace(',', '.'))
+        except ValueError:
+            continue
+        if not matricule:
+            continue
+        nom = columns.get('nom', [''] * count)[index]
+        prenom = columns.get('prenom', [''] * count)[index]
+        rows.append({'matricule': matricule, 'nom': nom, 'prenom': prenom, 'note': note})
+        lines.append(f'{matricule} | {nom} | {prenom} | {raw_note}')
+    return '\n'.join(lines), rows
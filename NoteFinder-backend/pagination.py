@@ -0,0 +1,218 @@
+# Pagination par curseur (keyset), filtres et tris pour les routes de liste (get_all_*).
+#
+# Au lieu de OFFSET, chaque page repart de la dernière clé lue :
+#   WHERE (tri, pk) > (dernier_tri, dernier_pk) ORDER BY tri, pk LIMIT n
+# le coût d'une page reste donc constant quelle que soit la taille de la table.
+#
+# Projection nommée : avec fields=a,b les lignes sont renvoyées en objets {a, b} et seules
+# ces colonnes sont lues. Sans fields, le format historique (tableaux positionnels) est gardé.
+
+import base64
+import datetime
+import decimal
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Paramètres communs à toutes les listes (les filtres sont propres à chaque ressource)
+PAGINATION_PARAMETERS = [
+    {
+        'name': 'limit',
+        'in': 'query',
+        'type': 'integer',
+        'required': False,
+        'description': f'Nombre de lignes par page (défaut {DEFAULT_LIMIT}, max {MAX_LIMIT})'
+    },
+    {
+        'name': 'cursor',
+        'in': 'query',
+        'type': 'string',
+        'required': False,
+        'description': 'Valeur next_cursor renvoyée par la page précédente'
+    },
+    {
+        'name': 'sort',
+        'in': 'query',
+        'type': 'string',
+        'required': False,
+        'description': 'Clé de tri autorisée, préfixée par "-" pour un tri décroissant'
+    },
+]
+
+
+FIELDS_PARAMETER = {
+    'name': 'fields',
+    'in': 'query',
+    'type': 'string',
+    'required': False,
+    'description': 'Champs à renvoyer, séparés par des virgules (objets nommés au lieu de tableaux)'
+}
+
+
+class PaginationError(ValueError):
+    """Paramètre de pagination, de filtre ou de tri invalide."""
+
+
+class ListSpec:
+    def __init__(self, columns, from_clause, pk, filters=None, sorts=None, default_sort='id', fields=None):
+        # columns     : liste SELECT renvoyée au client (identique à la réponse non paginée)
+        # from_clause : FROM + jointures
+        # pk          : expression de la clé primaire (départage les égalités de tri)
+        # filters     : paramètre de requête -> colonne (égalité)
+        # sorts       : clé de tri -> colonne NOT NULL
+        # fields      : nom renvoyé -> expression SQL (projection nommée, paramètre fields=)
+        self.columns = columns
+        self.from_clause = from_clause
+        self.pk = pk
+        self.filters = filters or {}
+        self.sorts = sorts or {'id': pk}
+        self.default_sort = default_sort
+        self.fields = fields or {}
+
+    def swagger_parameters(self):
+        return PAGINATION_PARAMETERS + self.fields_parameters() + self.filter_parameters()
+
+    def fields_parameters(self):
+        if not self.fields:
+            return []
+        return [dict(FIELDS_PARAMETER, description=f"{FIELDS_PARAMETER['description']} : {', '.join(self.fields)}")]
+
+    def filter_parameters(self):
+        return [
+            {
+                'name': name,
+                'in': 'query',
+                'type': 'string',
+                'required': False,
+                'description': f'Filtre sur {column}'
+            }
+            for name, column in self.filters.items()
+        ]
+
+    def wants_page(self, args):
+        return any(name in args for name in ('limit', 'cursor', 'sort')) or \
+            any(name in args for name in self.filters)
+
+    def parse_fields(self, args):
+        # Noms demandés (ordre conservé, sans doublon), ou None pour le format historique
+        raw = args.get('fields')
+        if raw is None:
+            return None
+        names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        if not names:
+            raise PaginationError('fields ne peut pas être vide')
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise PaginationError(f"Champ(s) inconnu(s) : {', '.join(unknown)} (autorisés : {', '.join(self.fields)})")
+        return names
+
+    def select(self, names):
+        return ', '.join(
+            self.fields[name] if self.fields[name] == name else f"{self.fields[name]} AS {name}"
+            for name in names
+        )
+
+
+def encode_cursor(values):
+    raw = json.dumps([_to_json(v) for v in values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise PaginationError('Curseur invalide')
+    if not isinstance(values, list) or len(values) != 2:
+        raise PaginationError('Curseur invalide')
+    return values
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def parse_limit(args):
+    raw = args.get('limit')
+    if raw is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError('limit doit être un entier')
+    if limit < 1:
+        raise PaginationError('limit doit être positif')
+    return min(limit, MAX_LIMIT)
+
+
+def parse_sort(spec, args):
+    key = args.get('sort', spec.default_sort)
+    descending = key.startswith('-')
+    key = key.lstrip('-')
+    if key not in spec.sorts:
+        raise PaginationError(f"Tri non autorisé : {key} (autorisés : {', '.join(sorted(spec.sorts))})")
+    return key, spec.sorts[key], descending
+
+
+def build_query(spec, args, fields=None):
+    limit = parse_limit(args)
+    _, sort_expr, descending = parse_sort(spec, args)
+
+    where = []
+    params = []
+    for name, column in spec.filters.items():
+        if name in args:
+            where.append(f"{column} = %s")
+            params.append(args.get(name))
+
+    token = args.get('cursor')
+    if token:
+        last_sort, last_pk = decode_cursor(token)
+        op = '<' if descending else '>'
+        if sort_expr == spec.pk:
+            where.append(f"{spec.pk} {op} %s")
+            params.append(last_pk)
+        else:
+            where.append(f"({sort_expr} {op} %s OR ({sort_expr} = %s AND {spec.pk} {op} %s))")
+            params.extend([last_sort, last_sort, last_pk])
+
+    direction = 'DESC' if descending else 'ASC'
+    order = f"{sort_expr} {direction}" if sort_expr == spec.pk else f"{sort_expr} {direction}, {spec.pk} {direction}"
+    columns = spec.select(fields) if fields else spec.columns
+    sql = f"SELECT {columns}, {sort_expr}, {spec.pk} FROM {spec.from_clause}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Une ligne de plus que demandé pour savoir s'il existe une page suivante
+    sql += f" ORDER BY {order} LIMIT %s"
+    params.append(limit + 1)
+    return sql, params, limit
+
+
+def paginate(cursor, spec, args):
+    fields = spec.parse_fields(args)
+    sql, params, limit = build_query(spec, args, fields)
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[-2:])
+
+    # Les deux colonnes de clé ajoutées à la fin ne sont pas renvoyées au client
+    if fields:
+        items = [dict(zip(fields, row)) for row in rows]
+    else:
+        items = [row[:-2] for row in rows]
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit,
+    }
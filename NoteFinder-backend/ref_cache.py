@@ -0,0 +1,66 @@
+# Cache en mémoire des tables de référence (filiere, grade, annee_academique, ...).
+#
+# Ces tables changent quelques fois par an mais sont relues à chaque chargement de page.
+# Chaque entrée est étiquetée avec les tables lues pour la produire : une écriture sur une
+# table n'invalide que les entrées qui en dépendent. Le cache est propre à chaque processus ;
+# la durée de vie (ttl) borne l'écart entre processus quand un autre worker a écrit.
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReferenceCache:
+    def __init__(self, ttl=300, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clé -> (instant de chargement, tables, valeur)
+        self._generations = {}  # table -> compteur d'invalidations
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, tables, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generations = tuple(self._generations.get(table, 0) for table in tables)
+
+        value = loader()
+
+        with self._lock:
+            # Une table invalidée pendant le chargement : la valeur est peut-être déjà périmée
+            if generations == tuple(self._generations.get(table, 0) for table in tables):
+                self._entries[key] = (time.monotonic(), tuple(tables), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, entry in self._entries.items() if set(entry[1]) & set(tables)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else None,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+            }
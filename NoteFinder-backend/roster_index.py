@@ -0,0 +1,193 @@
+# Rapprochement des lignes reconnues par l'OCR avec les inscrits d'une promotion.
+#
+# Une promotion (annee_etude, annee_academique, semestre) est chargée une fois en mémoire :
+# dictionnaire des matricules exacts, index par suppressions (distance d'édition) pour les
+# matricules mal lus, et index des mots du nom/prénom. Une ligne reconnue est ainsi rattachée à son
+# parcours_etudiant sans envoyer toute la table au navigateur.
+
+import threading
+import time
+import unicodedata
+
+
+def levenshtein(a, b, limit=None):
+    # Distance d'édition ; avec limit, tout résultat > limit est renvoyé comme limit + 1
+    if a == b:
+        return 0
+    if len(a) == len(b):
+        # Même longueur (cas courant : un chiffre mal lu) : à moins de 3 différences,
+        # la distance d'édition est exactement le nombre de positions différentes
+        mismatches = sum(char_a != char_b for char_a, char_b in zip(a, b))
+        if mismatches <= 2:
+            return mismatches
+    if limit is None:
+        limit = max(len(a), len(b))
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    # Seule la bande |i - j| <= limit de la matrice peut donner une distance <= limit
+    outside = limit + 1
+    previous = {j: j for j in range(min(len(b), limit) + 1)}
+    for i in range(1, len(a) + 1):
+        current = {}
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(
+                previous.get(j, outside) + 1,
+                current.get(j - 1, outside) + 1,
+                previous.get(j - 1, outside) + (a[i - 1] != b[j - 1]),
+            )
+        if min(current.values()) > limit:
+            return outside
+        previous = current
+    return min(previous.get(len(b), outside), outside)
+
+
+def deletions(word, max_distance):
+    # Toutes les chaînes obtenues en supprimant jusqu'à max_distance caractères
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        found |= frontier
+    return found
+
+
+class DeleteIndex:
+    # Index « symmetric delete » : deux mots à distance d'édition <= d partagent au moins
+    # une variante obtenue par au plus d suppressions. Une recherche se limite donc à
+    # quelques dizaines d'accès dictionnaire, puis à la vérification des candidats.
+
+    def __init__(self, words=(), max_distance=2):
+        self.max_distance = max_distance
+        self.variants = {}
+        for word in words:
+            for variant in deletions(word, max_distance):
+                self.variants.setdefault(variant, set()).add(word)
+
+    def search(self, word, max_distance=None):
+        # [(distance, mot)] triés par distance croissante
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in deletions(word, max_distance):
+            candidates |= self.variants.get(variant, set())
+        found = []
+        for candidate in candidates:
+            distance = levenshtein(word, candidate, limit=max_distance)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+        return sorted(found)
+
+
+def name_tokens(*parts):
+    text = ' '.join(part for part in parts if part)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return {token for token in ''.join(char if char.isalnum() else ' ' for char in text).split() if len(token) > 1}
+
+
+def normalize_matricule(value):
+    # Confusions OCR courantes dans une colonne de chiffres
+    table = str.maketrans({'O': '0', 'o': '0', 'D': '0', 'I': '1', 'l': '1', '|': '1', 'S': '5', 'B': '8', 'Z': '2'})
+    return ''.join(char for char in str(value or '').translate(table) if char.isdigit())
+
+
+class RosterIndex:
+    def __init__(self, entries, max_distance=2):
+        # entries : dicts {parcours_etudiant_id, matricule, nom, prenom}
+        self.max_distance = max_distance
+        self.by_matricule = {}
+        self.tokens = {}
+        for entry in entries:
+            entry = dict(entry, _tokens=name_tokens(entry.get('nom'), entry.get('prenom')))
+            self.by_matricule[str(entry['matricule'])] = entry
+            for token in entry['_tokens']:
+                self.tokens.setdefault(token, []).append(entry)
+        self.tree = DeleteIndex(self.by_matricule, max_distance)
+
+    def __len__(self):
+        return len(self.by_matricule)
+
+    def match(self, row):
+        raw = str(row.get('matricule') or '').strip()
+        matricule = normalize_matricule(raw) or raw
+        tokens = name_tokens(row.get('nom'), row.get('prenom'))
+
+        exact = self.by_matricule.get(raw) or self.by_matricule.get(matricule)
+        if exact is not None:
+            return self._result(exact, 1.0, 0, 'exact')
+
+        candidates = {}
+        for distance, value in self.tree.search(matricule, self.max_distance) if matricule else []:
+            entry = self.by_matricule[value]
+            score = 1 - distance / max(len(value), 1)
+            if tokens:
+                score = 0.7 * score + 0.3 * self._name_score(tokens, entry)
+            candidates[value] = (score, distance, entry, 'matricule')
+
+        # Matricule illisible : on se rabat sur le nom et le prénom
+        if not candidates and tokens:
+            for token in tokens:
+                for entry in self.tokens.get(token, []):
+                    if entry['matricule'] not in candidates:
+                        score = 0.6 * self._name_score(tokens, entry)
+                        candidates[entry['matricule']] = (score, None, entry, 'nom')
+
+        if not candidates:
+            return None
+        ranked = sorted(candidates.values(), key=lambda candidate: candidate[0], reverse=True)
+        score, distance, entry, method = ranked[0]
+        # Deux candidats presque aussi probables : confiance divisée par deux
+        if len(ranked) > 1 and score - ranked[1][0] < 0.05:
+            score /= 2
+        return self._result(entry, round(score, 3), distance, method)
+
+    @staticmethod
+    def _name_score(tokens, entry):
+        if not tokens or not entry['_tokens']:
+            return 0.0
+        return len(tokens & entry['_tokens']) / len(tokens | entry['_tokens'])
+
+    @staticmethod
+    def _result(entry, confidence, distance, method):
+        return {
+            'parcours_etudiant_id': entry['parcours_etudiant_id'],
+            'matricule': entry['matricule'],
+            'nom': entry['nom'],
+            'prenom': entry['prenom'],
+            'confidence': confidence,
+            'distance': distance,
+            'method': method,
+        }
+
+
+class RosterIndexCache:
+    # Index par promotion, reconstruits après ttl secondes ou après invalidate()
+
+    def __init__(self, loader, ttl=300, max_distance=2):
+        # loader(annee_etude_id, annee_academique_id, semestre) -> liste d'entrées
+        self.loader = loader
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._indexes = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, annee_etude_id, annee_academique_id, semestre):
+        key = (int(annee_etude_id), int(annee_academique_id), int(semestre))
+        with self._lock:
+            cached = self._indexes.get(key)
+            generation = self._generation
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        index = RosterIndex(self.loader(*key), self.max_distance)
+        with self._lock:
+            # Un index construit pendant une invalidation n'est pas conservé
+            if generation == self._generation:
+                self._indexes[key] = (time.monotonic(), index)
+        return index
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._indexes.clear()
@@ -0,0 +1,13 @@
+# Point d'entrée WSGI de production.
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# NOTEFINDER_CONFIG : chemin d'un fichier Python de configuration (SECRET_KEY, MYSQL_HOST,
+# MYSQL_USER, MYSQL_PASSWORD, MYSQL_DB, MYSQL_POOL_SIZE, ...) appliqué par create_app.
+# SECRET_KEY est obligatoire (ou NOTEFINDER_SECRET_KEY) : sans elle, le démarrage échoue.
+
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('NOTEFINDER_CONFIG'))
@@ -57,20 +57,15 @@ const Notes = ({ user = { email: '', role: '' } }) => {
   const fetchNotes = async () => {
     try {
       setLoading(true);
-      const response = await noteService.fetchNotes();
-      
-      const formattedNotes = response.map((noteArray) => {
-        return {
-          id: noteArray[0],
-          ecue_id: noteArray[1],
-          parcours_etudiant_id: noteArray[2],
-          matricule: noteArray[7] || 'N/A', // Le matricule est à l'index 7
-          note: noteArray[3],
-          created_at: noteArray[4],
-          updated_at: noteArray[5]
-        };
+      const response = await noteService.fetchNotes({
+        fields: ['id', 'ecue_id', 'parcours_etudiant_id', 'matricule', 'note', 'created_at', 'updated_at']
       });
       
+      const formattedNotes = response.map((note) => ({
+        ...note,
+        matricule: note.matricule || 'N/A'
+      }));
+      
       setNotes(formattedNotes);
       setError(null);
     } catch (error) {
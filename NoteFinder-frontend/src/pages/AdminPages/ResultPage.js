@@ -25,9 +25,9 @@ const ResultPage = () => {
       return [];
     }
     return ecuesArray.map(ecue => ({
-      id: ecue[0] || '',        // ecue_id
-      code: ecue[1] || '',      // code ECUE
-      name: ecue[2] || ''       // nom ECUE
+      id: ecue.id || '',
+      code: ecue.code || '',
+      name: ecue.nom || ''
     })).filter(ecue => ecue.id && ecue.code);
   };
   
@@ -38,10 +38,10 @@ const ResultPage = () => {
       return [];
     }
     return parcoursArray.map(parcour => ({
-      id: parcour[0] || '',     // parcours_etudiant_id
-      matricule: parcour[1] || '',
-      nom: parcour[9] || '',    // nom étudiant
-      prenom: parcour[10] || '' // prénom étudiant
+      id: parcour.id || '',
+      matricule: parcour.etudiant_matricule || '',
+      nom: parcour.nom || '',
+      prenom: parcour.prenom || ''
     })).filter(parcour => parcour.id && parcour.matricule);
   };
 
@@ -53,11 +53,11 @@ const ResultPage = () => {
         
         // Charge les ECUEs et parcours avec une meilleure gestion d'erreur
         const [ecuesResponse, parcoursResponse] = await Promise.all([
-          offreService.getEcues().catch(err => {
+          offreService.getEcues({ fields: ['id', 'code', 'nom'] }).catch(err => {
             console.error("Erreur chargement ECUEs:", err);
             throw new Error("Impossible de charger les ECUEs");
           }),
-          parcourService.getParcours().catch(err => {
+          parcourService.getParcours({ fields: ['id', 'etudiant_matricule', 'nom', 'prenom'] }).catch(err => {
             console.error("Erreur chargement Parcours:", err);
             throw new Error("Impossible de charger les parcours étudiants");
           })
@@ -133,24 +133,28 @@ const ResultPage = () => {
     let successCount = 0;
     const failedNotes = [];
   
-    for (let i = 0; i < totalNotes; i++) {
-      try {
-        const note = notes[i];
-        
-        // Petit délai entre les requêtes
-        if (i > 0) await new Promise(resolve => setTimeout(resolve, 100));
-        
-        await noteService.addNote({
-          ecue_id: parseInt(note.ecue_id, 10),
-          parcours_etudiant_id: parseInt(note.parcours_etudiant_id, 10),
-          note: parseFloat(note.note)
-        });
-        
-        successCount++;
-      } catch (err) {
-        console.error(`Échec enregistrement note ${i + 1}:`, err);
-        failedNotes.push(notes[i]);
+    // Un seul envoi pour toute la feuille : le serveur valide le lot puis l'enregistre en une
+    // transaction ; renvoyer une feuille corrigée remplace les notes déjà saisies
+    try {
+      const result = await noteService.addNotesBulk(notes.map(note => ({
+        ecue_id: parseInt(note.ecue_id, 10),
+        parcours_etudiant_id: parseInt(note.parcours_etudiant_id, 10),
+        note: parseFloat(note.note)
+      })));
+
+      if (result.saved) {
+        successCount = result.saved;
+      } else {
+        result.results
+          .filter(row => row.errors.length > 0)
+          .forEach(row => {
+            console.error(`Échec enregistrement note ${row.index + 1}:`, row.errors);
+            failedNotes.push(notes[row.index]);
+          });
       }
+    } catch (err) {
+      console.error('Échec enregistrement des notes:', err);
+      failedNotes.push(...notes);
     }
   
     setIsSaving(false);
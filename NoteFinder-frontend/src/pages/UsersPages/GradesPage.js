@@ -3,6 +3,7 @@ import { useLocation, useNavigate } from 'react-router-dom';
 import noteService from '../../services/noteService';
 import parcourService from '../../services/parcourService';
 import { fetchAnneesAcademiques } from '../../services/anneeService';
+import { fetchReleve } from '../../services/etudiantService';
 
 function GradesPage() {
   const location = useLocation();
@@ -56,6 +57,37 @@ function GradesPage() {
         setLoading(true);
         setError(null);
 
+        // Étudiant connecté : son relevé en un seul appel
+        const etudiant = JSON.parse(localStorage.getItem('etudiant') || 'null');
+        const matricule = Array.isArray(etudiant) ? etudiant[0] : etudiant?.matricule;
+        if (matricule) {
+          const releve = await fetchDataWithRetry(
+            () => fetchReleve(matricule),
+            'relevé'
+          );
+          const releveGrades = releve.annees.flatMap(annee =>
+            annee.semestres.flatMap(semestre =>
+              semestre.ues.flatMap(ue =>
+                ue.ecues.map(ecue => ({
+                  id: ecue.note_id,
+                  ecue_id: ecue.ecue_id,
+                  ecue_code: ecue.code,
+                  matricule: releve.etudiant.matricule,
+                  nom: releve.etudiant.nom,
+                  prenom: releve.etudiant.prenom,
+                  note: ecue.note ?? 0,
+                  date: new Date(ecue.date).toLocaleDateString('fr-FR'),
+                  annee_academique: annee.annee
+                }))
+              )
+            )
+          );
+          setStudentInfo(releve.etudiant);
+          setGrades(releveGrades);
+          setFilteredGrades(releveGrades);
+          return;
+        }
+
         // 1. Récupération des années académiques
         const anneesData = await fetchDataWithRetry(
           () => fetchAnneesAcademiques(),
@@ -409,7 +441,7 @@ function GradesPage() {
                     fontSize: '14px', 
                     color: '#334155'
                   }}>
-                    {grade.ecue_id}
+                    {grade.ecue_code ?? grade.ecue_id}
                   </td>
                   <td style={{ 
                     padding: '12px 16px', 
@@ -14,6 +14,7 @@ function LoginPage() {
       const response = await loginEtudiant({ matricule, code });
       if (response.etudiant) {
         localStorage.setItem('etudiant', JSON.stringify(response.etudiant));
+        localStorage.setItem('token', response.token);
         navigate('/dash');
       }
     } catch (err) {
@@ -8,6 +8,8 @@ const authService = {
       
       if (response.data && response.data.success) {
         localStorage.setItem('user', JSON.stringify(response.data.user));
+        // Jeton signé, renvoyé en Authorization: Bearer par l'intercepteur (api.js)
+        localStorage.setItem('token', response.data.token);
         return { success: true, user: response.data.user };
       } else {
         return { success: false, message: response.data?.message || 'Identifiants incorrects' };
@@ -31,6 +33,7 @@ const authService = {
       
       if (response.data && response.data.etudiant) {
         localStorage.setItem('etudiant', JSON.stringify(response.data.etudiant));
+        localStorage.setItem('token', response.data.token);
         return { success: true, etudiant: response.data.etudiant };
       } else {
         return { success: false, message: response.data?.message || 'Matricule ou code incorrect' };
@@ -112,6 +112,15 @@ export const getEtudiantByMatricule = async (matricule) => {
   }
 };
 
+export const fetchReleve = async (matricule) => {
+  try {
+    const { data } = await httpService.get(`/api/etudiants/${matricule}/releve`);
+    return data;
+  } catch (error) {
+    handleServiceError(error, 'Échec de la récupération du relevé');
+  }
+};
+
 export const updateEtudiant = async (matricule, etudiantData) => {
   try {
     const { data } = await httpService.put(`/api/etudiants/${matricule}`, etudiantData);
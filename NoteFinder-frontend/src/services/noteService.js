@@ -1,12 +1,12 @@
 import httpService from './api';
 
 const noteService = {
-  async fetchNotes() {
+  // fields : liste de champs à renvoyer (objets nommés) ; sans fields, tableaux positionnels
+  async fetchNotes({ fields } = {}) {
     try {
+      // Pas de paramètre anti-cache : le navigateur revalide avec If-None-Match (304 si inchangé)
       const response = await httpService.get('/api/note', {
-        params: {
-          _: Date.now() // Cache buster
-        },
+        params: fields ? { fields: fields.join(',') } : undefined,
         timeout: 10000 // 10 secondes timeout
       });
       
@@ -57,6 +57,26 @@ const noteService = {
     }
   },
 
+  async addNotesBulk(notesData) {
+    try {
+      const response = await httpService.post('/api/note/bulk', notesData);
+      return response.data;
+    } catch (error) {
+      if (error.response && error.response.status === 400 && error.response.data.results) {
+        // Lot refusé : le détail par ligne permet d'indiquer les notes à corriger
+        return error.response.data;
+      }
+      if (error.response) {
+        if (error.response.status === 413) {
+          throw new Error('Trop de notes dans un seul envoi');
+        } else if (error.response.status === 500) {
+          throw new Error('Erreur serveur lors de la création des notes');
+        }
+      }
+      throw new Error('Erreur lors de l\'ajout des notes');
+    }
+  },
+
   async deleteNote(id) {
     try {
       const response = await httpService.delete(`/api/note/${id}`);
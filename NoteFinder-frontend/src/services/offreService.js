@@ -89,9 +89,11 @@ const offreService = {
   },
 
   // ECUEs
-  async getEcues() {
+  async getEcues({ fields } = {}) {
     try {
-      const response = await httpService.get('/api/ecues');
+      const response = await httpService.get('/api/ecues', {
+        params: fields ? { fields: fields.join(',') } : undefined
+      });
       return response.data;
     } catch (error) {
       if (error.response) {
@@ -2,9 +2,11 @@
 import httpService from './api';
 
 const parcourService = {
-  async getParcours() {
+  async getParcours({ fields } = {}) {
     try {
-      const response = await httpService.get('/api/parcours_etudiant');
+      const response = await httpService.get('/api/parcours_etudiant', {
+        params: fields ? { fields: fields.join(',') } : undefined
+      });
       return response.data;
     } catch (error) {
       if (error.response) {